@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic import BaseSettings, Field, validator
 
 
@@ -14,6 +15,21 @@ class DatabaseSettings(BaseSettings):
 
     db_url: str = Field(default=None)
 
+    pool_size: int = Field(default=5, env="DB_POOL_SIZE")
+    max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(default=30, env="DB_POOL_TIMEOUT")
+    pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    statement_cache_size: int = Field(default=100, env="DB_STATEMENT_CACHE_SIZE")
+    plan_cache_mode: str = Field(default="force_custom_plan", env="DB_PLAN_CACHE_MODE")
+
+    replica_url: Optional[str] = Field(default=None, env="DB_REPLICA_URL")
+    replica_max_lag: float = Field(default=5, env="DB_REPLICA_MAX_LAG")
+    replica_lag_check_interval: float = Field(
+        default=2, env="DB_REPLICA_LAG_CHECK_INTERVAL"
+    )
+    read_your_writes_window: float = Field(default=5, env="DB_READ_YOUR_WRITES_WINDOW")
+
     @validator("db_url")
     def set_db_url(cls, v, values, **kwargs):
         return f"postgresql+asyncpg://{values['db_user']}:{values['db_pass']}@{values['db_host']}:{values['db_port']}/{values['db_name']}"
@@ -68,6 +84,117 @@ class TokenSettings(BaseSettings):
     )
     algorithm: str = Field(env="ALGORITHM")
     secret_key: str = Field(env="SECRET_KEY")
+    verified_cache_size: int = Field(default=10000, env="VERIFIED_TOKEN_CACHE_SIZE")
+
+    class Config:
+        env_file = ".env"
+
+
+class PasswordHashingSettings(BaseSettings):
+    """
+    Настройки пула для хеширования и проверки паролей
+    """
+
+    executor: str = Field(default="thread", env="PASSWORD_HASHING_EXECUTOR")
+    max_workers: int = Field(default=4, env="PASSWORD_HASHING_MAX_WORKERS")
+    max_queue_size: int = Field(default=128, env="PASSWORD_HASHING_MAX_QUEUE_SIZE")
+
+    @validator("executor")
+    def executor_type(cls, v, values, **kwargs):
+        if v not in ("thread", "process"):
+            raise ValueError("executor должен быть thread или process")
+        return v
+
+    class Config:
+        env_file = ".env"
+
+
+class CacheSettings(BaseSettings):
+    """
+    Настройки внутрипроцессных кешей
+    """
+
+    user_cache_size: int = Field(default=10000, env="USER_CACHE_SIZE")
+    user_cache_ttl: float = Field(default=60, env="USER_CACHE_TTL")
+    job_list_cache_size: int = Field(default=1000, env="JOB_LIST_CACHE_SIZE")
+    job_list_cache_bytes: int = Field(
+        default=64 * 1024 * 1024, env="JOB_LIST_CACHE_BYTES"
+    )
+    job_list_cache_ttl: float = Field(default=30, env="JOB_LIST_CACHE_TTL")
+    notify_enabled: bool = Field(default=True, env="CACHE_NOTIFY_ENABLED")
+
+    class Config:
+        env_file = ".env"
+
+
+class BatchSettings(BaseSettings):
+    """
+    Настройки пакетных операций
+    """
+
+    max_batch_size: int = Field(default=100, env="BATCH_MAX_SIZE")
+    import_chunk_size: int = Field(default=5000, env="BATCH_IMPORT_CHUNK_SIZE")
+    import_max_errors: int = Field(default=100, env="BATCH_IMPORT_MAX_ERRORS")
+    import_max_record_size: int = Field(
+        default=1 << 20, env="BATCH_IMPORT_MAX_RECORD_SIZE"
+    )
+
+    class Config:
+        env_file = ".env"
+
+
+class SchedulerSettings(BaseSettings):
+    """
+    Настройки фоновых задач
+    """
+
+    enabled: bool = Field(default=True, env="SCHEDULER_ENABLED")
+    interval: float = Field(default=60, env="SCHEDULER_INTERVAL")
+    lock_key: int = Field(default=7305061, env="SCHEDULER_LOCK_KEY")
+    max_batches: int = Field(default=100, env="SCHEDULER_MAX_BATCHES")
+    expiry_batch_size: int = Field(default=1000, env="SCHEDULER_EXPIRY_BATCH_SIZE")
+    archive_after_days: int = Field(default=180, env="SCHEDULER_ARCHIVE_AFTER_DAYS")
+    archive_batch_size: int = Field(default=500, env="SCHEDULER_ARCHIVE_BATCH_SIZE")
+
+    class Config:
+        env_file = ".env"
+
+
+class RecommendationSettings(BaseSettings):
+    """
+    Настройки рекомендаций вакансий. Пока индекс не построен (при старте,
+    если warm_up, иначе в фоне после первого запроса рекомендаций),
+    предлагаются самые новые вакансии
+    """
+
+    compact_after: int = Field(default=10000, env="RECOMMENDATION_COMPACT_AFTER")
+    profile_size: int = Field(default=50, env="RECOMMENDATION_PROFILE_SIZE")
+    build_chunk_size: int = Field(default=10000, env="RECOMMENDATION_BUILD_CHUNK_SIZE")
+    max_limit: int = Field(default=100, env="RECOMMENDATION_MAX_LIMIT")
+    warm_up: bool = Field(default=True, env="RECOMMENDATION_WARM_UP")
+
+    class Config:
+        env_file = ".env"
+
+
+class DuplicateSettings(BaseSettings):
+    """
+    Настройки поиска почти одинаковых вакансий компании.
+    policy: flag - вакансия создается, дубликаты отдаются в заголовке
+    ответа; reject - вакансия не создается. Проверка работает после
+    сборки индекса: при старте (warm_up) или первым запросом групп
+    дубликатов
+    """
+
+    policy: Literal["flag", "reject"] = Field(default="flag", env="DUPLICATE_POLICY")
+    threshold: float = Field(default=0.8, env="DUPLICATE_THRESHOLD")
+    num_perm: int = Field(default=32, env="DUPLICATE_NUM_PERM")
+    bands: int = Field(default=8, env="DUPLICATE_BANDS")
+    shingle_size: int = Field(default=3, env="DUPLICATE_SHINGLE_SIZE")
+    compact_after: int = Field(default=10000, env="DUPLICATE_COMPACT_AFTER")
+    build_chunk_size: int = Field(default=10000, env="DUPLICATE_BUILD_CHUNK_SIZE")
+    max_clusters: int = Field(default=1000, env="DUPLICATE_MAX_CLUSTERS")
+    warm_up: bool = Field(default=True, env="DUPLICATE_WARM_UP")
 
     class Config:
         env_file = ".env"
@@ -88,4 +215,10 @@ db_settings = DatabaseSettings()
 test_db_settings = TestDatabaseSettings()
 server_settings = UvicornSettings()
 token_settings = TokenSettings()
+password_hashing_settings = PasswordHashingSettings()
+cache_settings = CacheSettings()
+batch_settings = BatchSettings()
+scheduler_settings = SchedulerSettings()
+recommendation_settings = RecommendationSettings()
+duplicate_settings = DuplicateSettings()
 project_settings = ProjectSettings()
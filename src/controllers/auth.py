@@ -3,15 +3,17 @@ from schemas import LoginSchema, TokensOutSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from queries import user as user_queries
 from core.security import (
-    verify_password,
+    verify_password_async,
     create_token,
-    decode_token,
+    create_user_claims,
+    verify_token,
+    TOKEN_VERSION,
 )
 
 
-def __create_tokens_with_out_schema(data: str) -> TokensOutSchema:
-    access_token = create_token({"sub": data})
-    refresh_token = create_token({"sub": data})
+def __create_tokens_with_out_schema(claims: dict) -> TokensOutSchema:
+    access_token = create_token(claims)
+    refresh_token = create_token(claims)
 
     return TokensOutSchema(
         message="Login successful",
@@ -23,16 +25,48 @@ def __create_tokens_with_out_schema(data: str) -> TokensOutSchema:
 
 async def login(login: LoginSchema, db: AsyncSession) -> TokensOutSchema:
     user = await user_queries.get_by_email(db=db, email=login.email)
+    claims = (
+        create_user_claims(user.id, user.email, user.is_company, user.token_version)
+        if user is not None
+        else None
+    )
+    hashed_password = user.hashed_password if user is not None else None
+
+    # проверка пароля может ждать в очереди пула, соединение с БД ей не нужно
+    await db.commit()
 
-    if user is None or not verify_password(login.password, user.hashed_password):
+    if claims is None or not await verify_password_async(
+        login.password, hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Некорректное имя пользователя или пароль",
         )
 
-    return __create_tokens_with_out_schema(user.email)
+    return __create_tokens_with_out_schema(claims)
 
 
-async def get_new_tokens_by_refresh_token(refresh_token: str) -> TokensOutSchema:
-    token = decode_token(refresh_token)
-    return __create_tokens_with_out_schema(token.get("sub"))
+async def get_new_tokens_by_refresh_token(
+    refresh_token: str, db: AsyncSession
+) -> TokensOutSchema:
+    """
+    Выпускает новую пару токенов. Claims собираются заново по строке
+    пользователя, поэтому смена email или роли попадает в новые токены,
+    а для удаленного пользователя токены больше не выпускаются
+    """
+    cred_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="Credentials are not valid"
+    )
+    token = verify_token(refresh_token)
+    if token is None:
+        raise cred_exception
+
+    if token.get("ver") == TOKEN_VERSION:
+        user = await user_queries.get_by_id(db=db, user_id=token["uid"])
+    else:
+        user = await user_queries.get_by_email(db=db, email=token.get("sub"))
+    if user is None:
+        raise cred_exception
+    return __create_tokens_with_out_schema(
+        create_user_claims(user.id, user.email, user.is_company, user.token_version)
+    )
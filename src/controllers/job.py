@@ -1,27 +1,160 @@
-from typing import List
+import datetime
+import logging
+from typing import AsyncIterator, FrozenSet, List, Optional, Tuple
 from fastapi import HTTPException, status
-from schemas import JobSchema, JobInSchema, JobUpdateSchema
+from pydantic import ValidationError
+from schemas import (
+    JobSchema,
+    JobInSchema,
+    JobUpdateSchema,
+    JobFilterSchema,
+    JobBatchUpdateSchema,
+    JobBatchStatus,
+    JobBatchItemSchema,
+    JobImportErrorSchema,
+    JobImportReportSchema,
+    JobArchiveSchema,
+    JobDuplicateClusterSchema,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from queries import job as job_queries
-from models import User
+from queries import recommendation as recommendation_queries
+from queries import duplicate as duplicate_queries
+from core.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_keyset_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    set_next_cursor,
+)
+from core.principal import CurrentUser
+from core.csv_stream import BadRecord, iter_csv_rows
+from core.conditional import rows_etag
+from core.fields import partial_response
+from config import batch_settings, duplicate_settings
+
+logger = logging.getLogger(__name__)
+
+IMPORT_REQUIRED_COLUMNS = {"title", "description"}
 
 
 async def get_jobs_for_user_or_company(
-    limit: int, skip: int, db: AsyncSession, current_user: User
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    filters: JobFilterSchema,
+    db: AsyncSession,
+    current_user: CurrentUser,
+    fields: Optional[FrozenSet[str]] = None,
 ) -> List[JobSchema]:
+    keyset_cursor = decode_keyset_cursor(cursor)
     if current_user.is_company:
         jobs = await job_queries.get_all_available_jobs_for_company(
-            db=db, limit=limit, skip=skip, user_id=current_user.id
+            db=db,
+            limit=limit,
+            skip=skip,
+            cursor=keyset_cursor,
+            filters=filters,
+            user_id=current_user.id,
+            fields=fields,
         )
     else:
         jobs = await job_queries.get_all_available_jobs_for_user(
-            db=db, limit=limit, skip=skip
+            db=db,
+            limit=limit,
+            skip=skip,
+            cursor=keyset_cursor,
+            filters=filters,
+            fields=fields,
         )
     return jobs
 
 
+async def get_jobs_page_for_user(
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    filters: JobFilterSchema,
+    db: AsyncSession,
+    fields: FrozenSet[str],
+) -> Tuple[bytes, Optional[str], str]:
+    """
+    Возвращает сериализованную страницу вакансий для соискателя, курсор
+    следующей и ETag. Страницы одинаковы для всех соискателей, поэтому готовое
+    тело ответа кешируется до ближайшего изменения вакансий
+    """
+    key = (limit, skip, cursor, filters.json(), tuple(sorted(fields)))
+    version = job_queries.job_list_cache.version
+    page = job_queries.job_list_cache.get(key)
+    if page is None:
+        jobs = await job_queries.get_all_available_jobs_for_user(
+            db=db,
+            limit=limit,
+            skip=skip,
+            cursor=decode_keyset_cursor(cursor),
+            filters=filters,
+            fields=fields,
+        )
+        response = partial_response(JobSchema, fields, jobs)
+        set_next_cursor(response, jobs, limit)
+        page = (
+            response.body,
+            response.headers.get(NEXT_CURSOR_HEADER),
+            rows_etag(jobs, fields),
+        )
+        job_queries.job_list_cache.set(version, key, page)
+    return page
+
+
+async def search_jobs_for_user_or_company(
+    search_query: str,
+    limit: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+) -> Tuple[List[JobSchema], Optional[str]]:
+    """
+    Возвращает найденные вакансии и курсор следующей страницы
+    """
+    rows = await job_queries.search_available_jobs(
+        db=db,
+        search_query=search_query,
+        limit=limit,
+        cursor=decode_rank_cursor(cursor),
+        user_id=current_user.id if current_user.is_company else None,
+    )
+    next_cursor = None
+    if rows and len(rows) >= limit:
+        last_job, last_rank = rows[-1]
+        next_cursor = encode_cursor([last_rank, last_job.id])
+    return [job for job, _ in rows], next_cursor
+
+
+async def get_recommended_jobs_for_user(
+    limit: int,
+    db: AsyncSession,
+    current_user: CurrentUser,
+    fields: Optional[FrozenSet[str]] = None,
+) -> List[JobSchema]:
+    """
+    Вакансии, похожие на те, на которые соискатель откликался.
+    Пока откликов нет или индекс вакансий не построен, предлагаются
+    самые новые вакансии
+    """
+    job_ids = await recommendation_queries.get_recommended_job_ids(
+        db=db, user_id=current_user.id, limit=limit
+    )
+    if job_ids is None:
+        return await job_queries.get_all_available_jobs_for_user(
+            db=db, limit=limit, fields=fields
+        )
+    return await job_queries.get_available_jobs_by_ids(
+        db=db, job_ids=job_ids, fields=fields
+    )
+
+
 async def get_job_by_id_for_user_or_company(
-    job_id: int, db: AsyncSession, current_user: User
+    job_id: int, db: AsyncSession, current_user: CurrentUser
 ) -> JobSchema:
     if current_user.is_company:
         job = await job_queries.get_available_job_by_id_for_company(
@@ -37,47 +170,248 @@ async def get_job_by_id_for_user_or_company(
     return job
 
 
+async def get_archived_jobs_for_company(
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+) -> List[JobArchiveSchema]:
+    return await job_queries.get_archived_jobs_for_company(
+        db=db,
+        user_id=current_user.id,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+    )
+
+
+async def get_job_updated_at_for_user_or_company(
+    job_id: int, db: AsyncSession, current_user: CurrentUser
+) -> datetime.datetime:
+    updated_at = await job_queries.get_available_job_updated_at(
+        db=db,
+        job_id=job_id,
+        user_id=current_user.id if current_user.is_company else None,
+    )
+    if not updated_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Запись не найдена"
+        )
+    return updated_at
+
+
 async def create_job(
-    job: JobInSchema, db: AsyncSession, current_user: User
-) -> JobSchema:
+    job: JobInSchema, db: AsyncSession, current_user: CurrentUser
+) -> Tuple[JobSchema, List[int]]:
+    """
+    Создает вакансию и возвращает ее вместе с почти такими же активными
+    вакансиями компании. При политике reject дубликат не создается.
+    Пока индекс дубликатов не построен, вакансия создается без проверки
+    """
+    duplicate_ids = await duplicate_queries.find_duplicate_job_ids(
+        db=db,
+        user_id=current_user.id,
+        title=job.title,
+        description=job.description,
+    )
+    if duplicate_ids is None:
+        logger.info("Индекс дубликатов не построен, вакансия не проверена")
+        duplicate_ids = []
+    if duplicate_ids and duplicate_settings.policy == "reject":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="У компании уже есть такая вакансия: "
+            + ", ".join(map(str, duplicate_ids)),
+        )
     job = await job_queries.create_job(db=db, job_schema=job, user_id=current_user.id)
-    return JobSchema.from_orm(job)
+    duplicate_queries.add_created_job(job)
+    return JobSchema.from_orm(job), duplicate_ids
 
 
-async def update_available_job(
-    job_id: int, job: JobUpdateSchema, db: AsyncSession, current_user: User
-) -> JobSchema:
-    old_job = await job_queries.get_available_job_by_id_for_company_to_delete_or_update(
-        db=db, job_id=job_id, user_id=current_user.id
+async def get_duplicate_clusters(
+    company_id: Optional[int], limit: int, db: AsyncSession
+) -> List[JobDuplicateClusterSchema]:
+    clusters = await duplicate_queries.get_duplicate_clusters(
+        db=db, user_id=company_id, limit=limit
     )
+    return [
+        JobDuplicateClusterSchema(user_id=user_id, job_ids=job_ids)
+        for user_id, job_ids in clusters
+    ]
+
 
-    if not old_job:
+async def create_jobs(
+    jobs: List[JobInSchema], db: AsyncSession, current_user: CurrentUser
+) -> List[JobBatchItemSchema]:
+    created_jobs = await job_queries.create_jobs(
+        db=db, job_schemas=jobs, user_id=current_user.id
+    )
+    return [
+        JobBatchItemSchema(
+            job_id=job.id, status=JobBatchStatus.created, job=JobSchema.from_orm(job)
+        )
+        for job in created_jobs
+    ]
+
+
+def __batch_results(
+    job_ids: List[int], changed_jobs: List, changed_status: JobBatchStatus
+) -> List[JobBatchItemSchema]:
+    changed = {job.id: JobSchema.from_orm(job) for job in changed_jobs}
+    return [
+        JobBatchItemSchema(job_id=job_id, status=changed_status, job=changed[job_id])
+        if job_id in changed
+        else JobBatchItemSchema(job_id=job_id, status=JobBatchStatus.not_found)
+        for job_id in job_ids
+    ]
+
+
+async def update_available_jobs(
+    jobs: List[JobBatchUpdateSchema], db: AsyncSession, current_user: CurrentUser
+) -> List[JobBatchItemSchema]:
+    """
+    Обновляет вакансии компании. Чужие и несуществующие вакансии
+    получают статус not_found
+    """
+    job_ids = [job.id for job in jobs]
+    if len(set(job_ids)) != len(job_ids):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Запись не найдена"
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Вакансия не может встречаться в пакете дважды",
         )
 
-    old_job.title = job.title if job.title is not None else old_job.title
-    old_job.description = (
-        job.description if job.description is not None else old_job.description
+    updated_jobs = await job_queries.update_jobs(
+        db=db, job_schemas=jobs, user_id=current_user.id
     )
-    old_job.salary_from = job.salary_from
-    old_job.salary_to = job.salary_to
+    return __batch_results(job_ids, updated_jobs, JobBatchStatus.updated)
+
+
+async def deactivate_available_jobs(
+    job_ids: List[int], db: AsyncSession, current_user: CurrentUser
+) -> List[JobBatchItemSchema]:
+    deactivated_jobs = await job_queries.deactivate_jobs(
+        db=db, job_ids=job_ids, user_id=current_user.id
+    )
+    return __batch_results(job_ids, deactivated_jobs, JobBatchStatus.deactivated)
+
+
+def __validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def import_jobs(
+    chunks: AsyncIterator[bytes], db: AsyncSession, current_user: CurrentUser
+) -> JobImportReportSchema:
+    """
+    Импортирует вакансии из CSV с заголовком (title, description,
+    salary_from, salary_to, is_active). Строки проверяются JobInSchema
+    и загружаются через COPY пакетами по import_chunk_size, каждый пакет
+    в своей транзакции. Некорректные строки пропускаются и попадают в отчет
+    """
+    report = JobImportReportSchema()
+    header = None
+    row_number = 0
+    batch: List[JobInSchema] = []
+
+    async def flush_batch() -> None:
+        report.imported += await job_queries.copy_jobs(
+            db=db, job_schemas=batch, user_id=current_user.id
+        )
+        batch.clear()
+        logger.info(
+            "Импорт вакансий компании %s: загружено %s, отклонено %s",
+            current_user.id,
+            report.imported,
+            report.rejected,
+        )
+
+    def reject(message: str) -> None:
+        report.rejected += 1
+        if len(report.errors) < batch_settings.import_max_errors:
+            report.errors.append(JobImportErrorSchema(row=row_number, message=message))
 
-    new_job = await job_queries.update_job(db=db, job=old_job)
+    try:
+        async for row in iter_csv_rows(
+            chunks, max_record_size=batch_settings.import_max_record_size
+        ):
+            if header is None:
+                if isinstance(row, BadRecord):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Некорректный заголовок CSV: {row.message}",
+                    )
+                header = [column.strip() for column in row]
+                missing = IMPORT_REQUIRED_COLUMNS - set(header)
+                if missing:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"В CSV нет колонок: {', '.join(sorted(missing))}",
+                    )
+                continue
+
+            row_number += 1
+            if isinstance(row, BadRecord):
+                reject(row.message)
+                continue
+            # пустое значение означает отсутствие значения, как в COPY CSV
+            values = {column: value for column, value in zip(header, row) if value}
+            try:
+                batch.append(JobInSchema.parse_obj(values))
+            except ValidationError as error:
+                reject(__validation_message(error))
+
+            if len(batch) >= batch_settings.import_chunk_size:
+                await flush_batch()
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Некорректный CSV в строке {row_number + 1}, "
+            f"загружено вакансий: {report.imported}",
+        )
+
+    if header is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Пустой CSV"
+        )
+    if batch:
+        await flush_batch()
+    return report
+
+
+async def update_available_job(
+    job_id: int, job: JobUpdateSchema, db: AsyncSession, current_user: CurrentUser
+) -> JobSchema:
+    values = {"salary_from": job.salary_from, "salary_to": job.salary_to}
+    if job.title is not None:
+        values["title"] = job.title
+    if job.description is not None:
+        values["description"] = job.description
+    if job.expires_at is not None:
+        values["expires_at"] = job.expires_at
+
+    new_job = await job_queries.update_job(
+        db=db, job_id=job_id, user_id=current_user.id, values=values
+    )
+    if not new_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Запись не найдена"
+        )
 
     return JobSchema.from_orm(new_job)
 
 
 async def delete_available_job(
-    job_id: int, db: AsyncSession, current_user: User
+    job_id: int, db: AsyncSession, current_user: CurrentUser
 ) -> JobSchema:
-    job = await job_queries.get_available_job_by_id_for_company_to_delete_or_update(
+    deleted_job = await job_queries.delete_job(
         db=db, job_id=job_id, user_id=current_user.id
     )
-    if not job:
+    if not deleted_job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Запись не найдена"
         )
 
-    deleted_job = await job_queries.delete_job(db=db, job=job)
     return JobSchema.from_orm(deleted_job)
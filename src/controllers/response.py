@@ -1,24 +1,116 @@
-from typing import List
+import csv
+import io
+import json
+from typing import AsyncIterator, FrozenSet, List, Optional
 from fastapi import HTTPException, status
-from schemas import ResponseSchema, ResponseInSchema
+from schemas import (
+    ResponseSchema,
+    ResponseInSchema,
+    ResponseBatchStatus,
+    ResponseBatchItemSchema,
+    ResponseWithJobSchema,
+    ResponseArchiveSchema,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from queries import response as response_queries
 from queries import job as job_queries
-from models import User
+from core.pagination import decode_keyset_cursor
+from core.principal import CurrentUser
 
 
 async def get_responses_by_job_id(
-    job_id: int, limit: int, skip: int, db: AsyncSession, current_user: User
+    job_id: int,
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+    fields: Optional[FrozenSet[str]] = None,
 ) -> List[ResponseSchema]:
     jobs = await response_queries.get_responses_by_job_id(
-        db=db, job_id=job_id, user_id=current_user.id, limit=limit, skip=skip
+        db=db,
+        job_id=job_id,
+        user_id=current_user.id,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+        fields=fields,
     )
     return jobs
 
 
+async def get_archived_responses_by_job_id(
+    job_id: int,
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+) -> List[ResponseArchiveSchema]:
+    return await response_queries.get_archived_responses_by_job_id(
+        db=db,
+        job_id=job_id,
+        user_id=current_user.id,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+    )
+
+
+async def get_responses_for_user(
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+) -> List[ResponseWithJobSchema]:
+    responses = await response_queries.get_responses_by_user_id(
+        db=db,
+        user_id=current_user.id,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+    )
+    return responses
+
+
+async def get_responses_for_company(
+    job_id: Optional[int],
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    since: Optional[str],
+    db: AsyncSession,
+    current_user: CurrentUser,
+) -> List[ResponseWithJobSchema]:
+    if cursor is not None and since is not None:
+        # опрос продолжается курсором X-Since-Cursor, а не X-Next-Cursor
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Параметры cursor и since несовместимы",
+        )
+    responses = await response_queries.get_responses_for_company(
+        db=db,
+        user_id=current_user.id,
+        job_id=job_id,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+        since=decode_keyset_cursor(since),
+    )
+    return responses
+
+
 async def create_response(
-    job: ResponseInSchema, db: AsyncSession, current_user: User
+    job: ResponseInSchema, db: AsyncSession, current_user: CurrentUser
 ) -> ResponseSchema:
+    response = await response_queries.create_response(
+        db=db, response_schema=job, user_id=current_user.id
+    )
+    if response:
+        return ResponseSchema.from_orm(response)
+
+    # отклик не создан: вакансии нет (или она закрыта) либо отклик уже есть
     job_from_db = await job_queries.get_available_job_by_id_for_user(
         db=db, job_id=job.job_id
     )
@@ -26,18 +118,100 @@ async def create_response(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Запись работы не найдена"
         )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Вы уже откликнулись на эту вакансию",
+    )
+
 
-    user_response = await response_queries.get_responses_by_job_id(
-        db=db, job_id=job.job_id, user_id=current_user.id
+async def create_responses(
+    jobs: List[ResponseInSchema], db: AsyncSession, current_user: CurrentUser
+) -> List[ResponseBatchItemSchema]:
+    available_job_ids, responses = await response_queries.create_responses(
+        db=db, response_schemas=jobs, user_id=current_user.id
     )
+    created = {response.job_id: response for response in responses}
 
-    if user_response:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Вы уже откликнулись на эту вакансию",
+    results = []
+    for job in jobs:
+        if job.job_id not in available_job_ids:
+            results.append(
+                ResponseBatchItemSchema(
+                    job_id=job.job_id, status=ResponseBatchStatus.not_found
+                )
+            )
+        elif job.job_id in created:
+            # повтор вакансии внутри пакета считается дубликатом
+            response = created.pop(job.job_id)
+            results.append(
+                ResponseBatchItemSchema(
+                    job_id=job.job_id,
+                    status=ResponseBatchStatus.created,
+                    response=ResponseSchema.from_orm(response),
+                )
+            )
+        else:
+            results.append(
+                ResponseBatchItemSchema(
+                    job_id=job.job_id, status=ResponseBatchStatus.duplicate
+                )
+            )
+    return results
+
+
+EXPORT_COLUMNS = ["id", "user_id", "job_id", "message", "created_at"]
+
+
+def __rows_to_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(
+            {**row._asdict(), "created_at": row.created_at.isoformat()},
+            ensure_ascii=False,
         )
+        + "\n"
+        for row in rows
+    )
 
-    job = await response_queries.create_response(
-        db=db, response_schema=job, user_id=current_user.id
+
+# такие ячейки табличные редакторы считают формулами
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def __csv_cell(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def __rows_to_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([__csv_cell(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def export_responses_by_job_id(
+    job_id: int, export_format: str, db: AsyncSession, current_user: CurrentUser
+) -> AsyncIterator[str]:
+    """
+    Проверяет доступ к вакансии и возвращает генератор выгрузки откликов.
+    Проверка выполняется до начала ответа, чтобы вернуть честный 404
+    """
+    job = await job_queries.get_available_job_by_id_for_company_to_delete_or_update(
+        db=db, job_id=job_id, user_id=current_user.id
     )
-    return ResponseSchema.from_orm(job)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Запись работы не найдена"
+        )
+
+    encode = __rows_to_csv if export_format == "csv" else __rows_to_ndjson
+
+    async def export() -> AsyncIterator[str]:
+        if export_format == "csv":
+            yield __rows_to_csv([EXPORT_COLUMNS])
+        async for rows in response_queries.stream_responses_by_job_id(
+            db=db, job_id=job_id, user_id=current_user.id
+        ):
+            yield encode(rows)
+
+    return export()
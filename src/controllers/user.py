@@ -2,7 +2,16 @@ from fastapi import HTTPException, status
 from schemas import UserSchema, UserInSchema, UserUpdateSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from queries import user as user_queries
-from models import User
+from core.principal import CurrentUser
+
+
+async def get_user_by_id(user_id: int, db: AsyncSession) -> UserSchema:
+    user = await user_queries.get_by_id(db=db, user_id=user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден"
+        )
+    return UserSchema.from_orm(user)
 
 
 async def create_user(user: UserInSchema, db: AsyncSession) -> UserSchema:
@@ -11,26 +20,30 @@ async def create_user(user: UserInSchema, db: AsyncSession) -> UserSchema:
 
 
 async def update_user(
-    user_id: int, user: UserUpdateSchema, db: AsyncSession, current_user: User
+    user_id: int, user: UserUpdateSchema, db: AsyncSession, current_user: CurrentUser
 ) -> UserSchema:
-    old_user = await user_queries.get_by_id(db=db, user_id=user_id)
-    same_email_in_db = await user_queries.get_by_email(db=db, email=user.email)
-
-    if same_email_in_db:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, detail="Такой email уже существует"
-        )
-
-    if not old_user or old_user.email != current_user.email:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден"
-        )
-
-    old_user.name = user.name if user.name is not None else old_user.name
-    old_user.email = user.email if user.email is not None else old_user.email
-    old_user.is_company = (
-        user.is_company if user.is_company is not None else old_user.is_company
+    not_found_exception = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден"
     )
+    if user_id != current_user.id:
+        raise not_found_exception
+
+    values = user.dict(exclude_none=True)
+    if not values:
+        old_user = await user_queries.get_by_id(db=db, user_id=user_id)
+        if not old_user:
+            raise not_found_exception
+        return UserSchema.from_orm(old_user)
+
+    new_user = await user_queries.update_user(db=db, user_id=user_id, values=values)
+    if not new_user:
+        if "email" in values and await user_queries.get_by_email(
+            db=db, email=values["email"]
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Такой email уже существует",
+            )
+        raise not_found_exception
 
-    new_user = await user_queries.update_user(db=db, user=old_user)
     return UserSchema.from_orm(new_user)
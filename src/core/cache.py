@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Ограниченный по размеру LRU кеш с необязательным временем жизни записей.
+    Время истечения задается в секундах unix-времени, чтобы его можно было
+    брать прямо из exp токена. Если задан max_bytes, кеш ограничен еще и
+    суммарным размером значений, который считается функцией sizeof
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, expires_at: Optional[float] = None
+    ) -> None:
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                # значение, которое больше всего кеша, только вытеснило бы остальные
+                self.delete(key)
+                return
+
+        self.delete(key)
+        self._data[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._data) > self.max_size or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        stats = {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+class VersionedCache:
+    """
+    Кеш, который целиком сбрасывается сменой версии. Версию нужно
+    запомнить до вычисления значения и передать в set(): значение,
+    вычисленное до bump(), но записываемое после него, в кеш не попадет
+    """
+
+    def __init__(self, cache: LRUCache):
+        self.version = 0
+        self._cache = cache
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._cache.get((self.version, key))
+
+    def set(self, version: int, key: Hashable, value: Any) -> None:
+        if version == self.version:
+            self._cache.set((version, key), value)
+
+    def bump(self) -> None:
+        self.version += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"version": self.version, **self._cache.stats()}
@@ -0,0 +1,87 @@
+import datetime
+import hashlib
+import itertools
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+from fastapi import Request, Response, status
+
+ETAG_HEADER = "ETag"
+LAST_MODIFIED_HEADER = "Last-Modified"
+
+
+def compute_etag(parts: Iterable[Any]) -> str:
+    """
+    ETag по идентификаторам и времени изменения записей ответа
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def rows_etag(rows: Iterable[Any], fields: Iterable[str] = ()) -> str:
+    """
+    ETag строк ответа. Для разных наборов полей (параметр fields)
+    представления одних и тех же строк различаются
+    """
+    parts = ((row.id, row.updated_at) for row in rows)
+    if fields:
+        parts = itertools.chain([sorted(fields)], parts)
+    return compute_etag(parts)
+
+
+def __http_date(moment: datetime.datetime) -> str:
+    return format_datetime(moment.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime.datetime] = None,
+) -> bool:
+    """
+    Проверяет If-None-Match, а если его нет - If-Modified-Since.
+    Время изменения хранится в UTC без часового пояса
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # при сравнении для GET слабые ETag равны сильным
+        return "*" in tags or etag in [
+            tag[2:] if tag.startswith("W/") else tag for tag in tags
+        ]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime.datetime] = None,
+) -> None:
+    response.headers[ETAG_HEADER] = etag
+    if last_modified is not None:
+        response.headers[LAST_MODIFIED_HEADER] = __http_date(last_modified)
+
+
+def not_modified(
+    etag: str, last_modified: Optional[datetime.datetime] = None
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
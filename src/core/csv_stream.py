@@ -0,0 +1,119 @@
+import codecs
+import csv
+from collections import deque
+from typing import AsyncIterator, Iterator, List, NamedTuple, Union
+
+
+class BadRecord(NamedTuple):
+    """
+    Запись, которую не удалось разобрать: разбор продолжается со следующей
+    """
+
+    message: str
+
+
+class _Lines:
+    """
+    Пополняемый источник строк для одного csv.reader на весь файл.
+    Запоминает строки текущей записи, чтобы вернуть их, если запись
+    не закончилась в уже полученных данных
+    """
+
+    def __init__(self):
+        self.lines = deque()
+        self.record: List[str] = []
+        self.starved = False
+        self.eof = False
+
+    def __iter__(self) -> "_Lines":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            self.starved = True
+            raise StopIteration
+        line = self.lines.popleft()
+        self.record.append(line)
+        return line
+
+    def start_record(self) -> None:
+        self.record.clear()
+        self.starved = False
+
+    def unread(self, skip: int = 0) -> None:
+        self.lines.extendleft(reversed(self.record[skip:]))
+        self.record.clear()
+
+
+def __read_records(
+    lines: _Lines, reader, max_record_size: int
+) -> Iterator[Union[List[str], BadRecord]]:
+    """
+    Читает записи из уже полученных строк. Запись, оборванную концом
+    данных (перевод строки внутри кавычек), возвращает в очередь
+    до следующего куска. Если такая запись длиннее max_record_size,
+    отбрасывается только ее первая строка
+    """
+    while True:
+        lines.start_record()
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield BadRecord(str(error))
+            continue
+
+        if lines.starved:
+            if sum(map(len, lines.record)) > max_record_size:
+                # скорее всего, незакрытая кавычка: разбор продолжается
+                # со следующей строки после начала записи
+                lines.unread(skip=1)
+                yield BadRecord(f"запись длиннее {max_record_size} символов")
+                continue
+            if not lines.eof:
+                lines.unread()
+                return
+        if row:
+            yield row
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterator[bytes],
+    encoding: str = "utf-8-sig",
+    max_record_size: int = 1 << 20,
+) -> AsyncIterator[Union[List[str], BadRecord]]:
+    """
+    Разбирает CSV по мере поступления байтов, не читая файл целиком.
+    Записи, которые не удалось разобрать или которые длиннее
+    max_record_size символов, отдаются как BadRecord.
+    BOM в начале файла (выгрузки из Excel) пропускается
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    lines = _Lines()
+    reader = csv.reader(lines)
+    tail = ""
+    skip_line = False
+    async for chunk in chunks:
+        parts = (tail + decoder.decode(chunk)).split("\n")
+        tail = parts.pop()
+        if skip_line and parts:
+            # конец слишком длинной строки
+            parts.pop(0)
+            skip_line = False
+        lines.lines.extend(part + "\n" for part in parts)
+        for row in __read_records(lines, reader, max_record_size):
+            yield row
+        if len(tail) > max_record_size and not skip_line:
+            tail = ""
+            skip_line = True
+            yield BadRecord(f"запись длиннее {max_record_size} символов")
+        elif skip_line:
+            tail = ""
+
+    tail += decoder.decode(b"", final=True)
+    if tail and not skip_line:
+        lines.lines.append(tail)
+    lines.eof = True
+    for row in __read_records(lines, reader, max_record_size):
+        yield row
@@ -0,0 +1,88 @@
+from functools import lru_cache
+from typing import Callable, Collection, FrozenSet, Iterable, Optional, Sequence, Type
+from fastapi import HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm import load_only
+
+ALL_FIELDS = "*"
+
+# колонки, которые читаются всегда: по ним строятся курсор и ETag страницы
+SERVICE_FIELDS = ("id", "created_at", "updated_at")
+
+
+def parse_fields(
+    fields: Optional[str], schema: Type[BaseModel], default: Collection[str]
+) -> FrozenSet[str]:
+    """
+    Разбирает параметр fields: имена полей схемы через запятую,
+    "*" - все поля. Без параметра возвращает набор полей по умолчанию
+    """
+    if fields is None:
+        return frozenset(default)
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    if ALL_FIELDS in names:
+        return frozenset(schema.__fields__)
+    unknown = names - schema.__fields__.keys()
+    if unknown or not names:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Неизвестные поля: {', '.join(sorted(unknown)) or fields}",
+        )
+    return frozenset(names)
+
+
+def fields_dependency(
+    schema: Type[BaseModel], deferred: Iterable[str] = ()
+) -> Callable[..., FrozenSet[str]]:
+    """
+    Зависимость для параметра fields списка. Поля из deferred (большие
+    текстовые колонки) отдаются, только если их запросили явно
+    """
+    default = frozenset(schema.__fields__) - frozenset(deferred)
+    description = (
+        "Поля в ответе через запятую, * - все поля. По умолчанию все, кроме: "
+        + (", ".join(deferred) or "-")
+    )
+
+    async def get_fields(
+        fields: Optional[str] = Query(default=None, description=description)
+    ) -> FrozenSet[str]:
+        return parse_fields(fields, schema, default)
+
+    return get_fields
+
+
+@lru_cache(maxsize=None)
+def partial_schema(schema: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    Схема ответа только с выбранными полями, создается один раз на набор
+    """
+    definitions = {
+        name: (
+            field.outer_type_ if field.required else Optional[field.outer_type_],
+            field.field_info,
+        )
+        for name, field in schema.__fields__.items()
+        if name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields", __config__=schema.__config__, **definitions
+    )
+
+
+def partial_response(
+    schema: Type[BaseModel], fields: FrozenSet[str], rows: Sequence
+) -> Response:
+    partial = partial_schema(schema, fields)
+    return JSONResponse(jsonable_encoder([partial.from_orm(row) for row in rows]))
+
+
+def load_fields(model, fields: Collection[str]):
+    """
+    Опция запроса, читающая из строки только колонки выбранных полей
+    и служебные колонки. Остальные колонки в SELECT не попадают
+    """
+    names = set(fields).union(name for name in SERVICE_FIELDS if hasattr(model, name))
+    return load_only(*(getattr(model, name) for name in sorted(names)))
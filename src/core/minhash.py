@@ -0,0 +1,354 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import numpy as np
+
+# сколько документов переставляется за раз: (шинглы пачки x num_perm) uint64
+SIGNATURE_BATCH = 1024
+
+Document = Tuple[int, int, str]
+
+
+class Signatures(NamedTuple):
+    """
+    Сигнатуры пачки документов: строки без шинглов в нее не попадают
+    """
+
+    ids: np.ndarray
+    owners: np.ndarray
+    signatures: np.ndarray
+
+
+class Segment(NamedTuple):
+    """
+    Основная часть индекса: идентификаторы по возрастанию, владельцы,
+    сигнатуры и признак живой строки, а также отсортированные ключи
+    полос всех строк с номерами строк, которым они принадлежат
+    """
+
+    ids: np.ndarray
+    owners: np.ndarray
+    signatures: np.ndarray
+    alive: np.ndarray
+    keys: np.ndarray
+    rows: np.ndarray
+
+
+class MinHashIndex:
+    """
+    MinHash/LSH индекс документов в памяти для поиска почти одинаковых
+    текстов одного владельца.
+
+    Текст разбивается на шинглы - последовательности из shingle_size слов.
+    Сигнатура - минимумы хешей шинглов по num_perm независимым хеш-функциям,
+    доля совпавших минимумов двух сигнатур оценивает коэффициент Жаккара
+    их множеств шинглов. Сигнатура делится на bands полос, у каждой полосы
+    есть ключ - хеш ее значений и владельца. Кандидаты в дубликаты - строки
+    хотя бы с одним общим ключом, дубликатами считаются кандидаты с оценкой
+    сходства не ниже threshold.
+
+    Ключи основной части хранятся отсортированным массивом и ищутся
+    бинарным поиском, удаленные строки только помечаются. Новые документы
+    копятся в словаре до уплотнения, которое вызывающий код запускает,
+    когда needs_compaction. Хеши шинглов - встроенный hash() строк,
+    поэтому сигнатуры сравнимы только внутри одного процесса.
+    Изменять индекс и искать в нем нужно из одного потока; signatures
+    и build_segment состояние не меняют и могут работать в другом
+    """
+
+    def __init__(
+        self,
+        num_perm: int,
+        bands: int,
+        threshold: float,
+        shingle_size: int,
+        compact_after: int,
+        seed: int = 0,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm должно делиться на bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.compact_after = compact_after
+
+        # хеш-функции вида (a * x + b) >> 32 по модулю 2**64 с нечетными a
+        random = np.random.default_rng(seed)
+        self._a = random.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = random.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self._mix = random.integers(1, 2**63, num_perm // bands + 2, dtype=np.uint64)
+        self._mix |= np.uint64(1)
+
+        self._main = self.build_segment([])
+        self._pending: Dict[int, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self._buckets: Dict[int, Set[int]] = {}
+        self._dead = 0
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return int(self._main.alive.sum()) + len(self._pending)
+
+    @property
+    def changes(self) -> int:
+        """
+        Сколько изменений накоплено с последней сборки основной части
+        """
+        return len(self._pending) + self._dead
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.changes > self.compact_after
+
+    def shingles(self, text: str) -> Set[int]:
+        # слова делятся по пробелам: регулярное выражение втрое медленнее,
+        # а знаки препинания у слов на оценку сходства почти не влияют
+        words = text.lower().split()
+        if len(words) <= self.shingle_size:
+            # короткий текст - один шингл из всех его слов
+            return {hash(tuple(words))} if words else set()
+        return set(map(hash, zip(*(words[i:] for i in range(self.shingle_size)))))
+
+    def signatures(self, documents: Iterable[Document]) -> Signatures:
+        """
+        Считает сигнатуры пачки документов (идентификатор, владелец, текст)
+        """
+        ids, owners, lengths, hashes = [], [], [], []
+        for id, owner, text in documents:
+            shingles = self.shingles(text)
+            if shingles:
+                ids.append(id)
+                owners.append(owner)
+                lengths.append(len(shingles))
+                hashes.extend(shingles)
+
+        signatures = np.empty((len(ids), self.num_perm), dtype=np.uint32)
+        hashes = np.array(hashes, dtype=np.int64).view(np.uint64)
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        for start in range(0, len(ids), SIGNATURE_BATCH):
+            end = min(start + SIGNATURE_BATCH, len(ids))
+            permuted = hashes[offsets[start] : offsets[end], None] * self._a + self._b
+            permuted >>= np.uint64(32)
+            signatures[start:end] = np.minimum.reduceat(
+                permuted, offsets[start:end] - offsets[start], axis=0
+            )
+        return Signatures(
+            ids=np.array(ids, dtype=np.int64),
+            owners=np.array(owners, dtype=np.int64),
+            signatures=signatures,
+        )
+
+    def band_keys(self, owners: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+        """
+        Ключи полос строк: массив (строки x bands). Владелец входит в ключ,
+        поэтому тексты разных владельцев кандидатами не становятся
+        """
+        values = signatures.reshape(
+            len(signatures), self.bands, self.num_perm // self.bands
+        )
+        values = values.astype(np.uint64)
+        keys = owners.astype(np.uint64)[:, None] * self._mix[0] + np.arange(
+            self.bands, dtype=np.uint64
+        )
+        keys = keys * self._mix[1]
+        for row in range(values.shape[2]):
+            keys = (keys ^ values[:, :, row]) * self._mix[row + 2]
+        return keys ^ (keys >> np.uint64(29))
+
+    def build_segment(self, parts: Sequence[Signatures]) -> Segment:
+        """
+        Собирает основную часть из пачек сигнатур
+        """
+        if parts:
+            ids = np.concatenate([part.ids for part in parts])
+            owners = np.concatenate([part.owners for part in parts])
+            signatures = np.concatenate([part.signatures for part in parts])
+        else:
+            ids = np.zeros(0, dtype=np.int64)
+            owners = np.zeros(0, dtype=np.int64)
+            signatures = np.zeros((0, self.num_perm), dtype=np.uint32)
+        order = np.argsort(ids, kind="stable")
+        ids, owners, signatures = ids[order], owners[order], signatures[order]
+
+        keys = self.band_keys(owners, signatures).ravel()
+        rows = np.repeat(np.arange(len(ids), dtype=np.int32), self.bands)
+        order = np.argsort(keys)
+        return Segment(
+            ids=ids,
+            owners=owners,
+            signatures=signatures,
+            alive=np.ones(len(ids), dtype=bool),
+            keys=keys[order],
+            rows=rows[order],
+        )
+
+    def replace(self, segment: Segment) -> None:
+        """
+        Делает segment основной частью, отбрасывая накопленные изменения
+        """
+        self._main = segment
+        self._pending.clear()
+        self._buckets.clear()
+        self._dead = 0
+        self.builds += 1
+
+    def build(self, parts: Sequence[Signatures]) -> None:
+        self.replace(self.build_segment(parts))
+
+    def live_part(self) -> Signatures:
+        """
+        Все живые строки индекса одной пачкой - для уплотнения
+        """
+        main = self._main
+        pending_ids = sorted(self._pending)
+        rows = [self._pending[id] for id in pending_ids]
+        return Signatures(
+            ids=np.concatenate([main.ids[main.alive], np.array(pending_ids, np.int64)]),
+            owners=np.concatenate(
+                [
+                    main.owners[main.alive],
+                    np.array([owner for owner, _, _ in rows], np.int64),
+                ]
+            ),
+            signatures=np.concatenate(
+                [main.signatures[main.alive]]
+                + [signature[None, :] for _, signature, _ in rows]
+            ),
+        )
+
+    def compact(self) -> None:
+        self.replace(self.build_segment([self.live_part()]))
+
+    def add(self, part: Signatures) -> None:
+        """
+        Добавляет строки, заменяя прежние версии документов
+        """
+        keys = self.band_keys(part.owners, part.signatures)
+        for row, (id, owner) in enumerate(zip(part.ids.tolist(), part.owners.tolist())):
+            self._discard(id)
+            self._pending[id] = (owner, part.signatures[row], keys[row])
+            for key in keys[row].tolist():
+                self._buckets.setdefault(key, set()).add(id)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        for id in ids:
+            self._discard(id)
+
+    def _discard(self, id: int) -> None:
+        main = self._main
+        row = np.searchsorted(main.ids, id)
+        if row < len(main.ids) and main.ids[row] == id and main.alive[row]:
+            main.alive[row] = False
+            self._dead += 1
+        pending = self._pending.pop(id, None)
+        if pending is None:
+            return
+        for key in pending[2].tolist():
+            bucket = self._buckets[key]
+            bucket.discard(id)
+            if not bucket:
+                del self._buckets[key]
+
+    def find(self, owner: int, signature: np.ndarray) -> List[Tuple[int, float]]:
+        """
+        Возвращает документы владельца, похожие на сигнатуру, как пары
+        (идентификатор, оценка сходства) по убыванию сходства
+        """
+        keys = self.band_keys(np.array([owner]), signature[None, :])[0]
+        main = self._main
+        starts = np.searchsorted(main.keys, keys, side="left").tolist()
+        ends = np.searchsorted(main.keys, keys, side="right").tolist()
+        matches = []
+        buckets = [
+            main.rows[start:end] for start, end in zip(starts, ends) if end > start
+        ]
+        if buckets:
+            rows = np.unique(np.concatenate(buckets))
+            rows = rows[main.alive[rows] & (main.owners[rows] == owner)]
+            similarity = (main.signatures[rows] == signature).mean(axis=1)
+            found = similarity >= self.threshold
+            matches.extend(
+                zip(main.ids[rows[found]].tolist(), similarity[found].tolist())
+            )
+
+        candidates = set().union(*(self._buckets.get(key, ()) for key in keys.tolist()))
+        for id in candidates:
+            candidate_owner, candidate_signature, _ = self._pending[id]
+            similarity = float((candidate_signature == signature).mean())
+            if candidate_owner == owner and similarity >= self.threshold:
+                matches.append((id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def find_text(self, owner: int, text: str) -> List[Tuple[int, float]]:
+        part = self.signatures([(0, owner, text)])
+        if not len(part.ids):
+            return []
+        return self.find(owner, part.signatures[0])
+
+    def clusters(self, owner: Optional[int] = None) -> List[Tuple[int, List[int]]]:
+        """
+        Группы почти одинаковых документов основной части как пары
+        (владелец, идентификаторы), от больших групп к меньшим. Строки
+        с общим ключом полосы сравниваются с первой строкой ключа,
+        группа - компонента связности найденных пар. Накопленные
+        изменения не учитываются: перед вызовом индекс уплотняют
+        """
+        main = self._main
+        parent = np.arange(len(main.ids))
+
+        def root(row: int) -> int:
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        boundaries = np.flatnonzero(main.keys[1:] != main.keys[:-1]) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [len(main.keys)]])
+        shared = ends - starts > 1
+        for start, end in zip(starts[shared].tolist(), ends[shared].tolist()):
+            rows = main.rows[start:end]
+            rows = rows[main.alive[rows]]
+            if owner is not None:
+                rows = rows[main.owners[rows] == owner]
+            if len(rows) < 2:
+                continue
+            first, others = rows[0], rows[1:]
+            others = others[
+                (main.owners[others] == main.owners[first])
+                & (
+                    (main.signatures[others] == main.signatures[first]).mean(axis=1)
+                    >= self.threshold
+                )
+            ]
+            first_root = root(first)
+            for row in others.tolist():
+                parent[root(row)] = first_root
+
+        grouped: Dict[int, List[int]] = {}
+        for row in np.flatnonzero(parent != np.arange(len(parent))).tolist():
+            grouped.setdefault(root(row), []).append(row)
+        clusters = [
+            (
+                int(main.owners[first]),
+                sorted(main.ids[[first] + rows].tolist()),
+            )
+            for first, rows in grouped.items()
+        ]
+        clusters.sort(key=lambda cluster: (-len(cluster[1]), cluster[1][0]))
+        return clusters
+
+    def memory_bytes(self) -> int:
+        main = self._main
+        total = sum(array.nbytes for array in main)
+        # строка накопленной части: сигнатура и ключи полос
+        return total + len(self._pending) * (self.num_perm * 4 + self.bands * 8)
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self),
+            "pending": len(self._pending),
+            "dead": self._dead,
+            "builds": self.builds,
+            "bytes": self.memory_bytes(),
+        }
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Set
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+NotificationCallback = Callable[[Optional[str]], None]
+
+
+class NotificationHub:
+    """
+    Рассылка событий между воркерами через Postgres LISTEN/NOTIFY.
+    Подписчик получает payload уведомления, а при переподключении - None,
+    так как пропущенные за это время уведомления уже не восстановить.
+    Пока хаб не запущен, publish ничего не отправляет
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.reconnect_delay = reconnect_delay
+
+        self._subscribers: Dict[str, List[NotificationCallback]] = {}
+        self._dsn: Optional[str] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+
+    def subscribe(self, channel: str, callback: NotificationCallback) -> None:
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    @property
+    def is_running(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self, dsn: str) -> None:
+        self._dsn = dsn
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._dsn = None
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def publish(self, channel: str, payload: str) -> None:
+        if not self.is_running:
+            return
+        task = asyncio.create_task(self._send(channel, payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, channel: str, payload: str) -> None:
+        try:
+            await self._connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+            self.published += 1
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError):
+            logger.exception("Не удалось отправить уведомление в канал %s", channel)
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        for channel in self._subscribers:
+            await connection.add_listener(channel, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        self.received += 1
+        self._dispatch(channel, payload)
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        for callback in self._subscribers.get(channel, []):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Ошибка обработчика уведомлений канала %s", channel)
+
+    def _on_termination(self, connection) -> None:
+        self._connection = None
+        if self._dsn is not None and self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while self._dsn is not None:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._connect()
+            except (asyncpg.PostgresError, OSError):
+                logger.warning("Переподключение LISTEN не удалось, повтор")
+                continue
+            self.reconnects += 1
+            for channel in self._subscribers:
+                self._dispatch(channel, None)
+            break
+        self._reconnect_task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "channels": sorted(self._subscribers),
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+notification_hub = NotificationHub()
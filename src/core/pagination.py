@@ -0,0 +1,156 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from config import token_settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+SINCE_CURSOR_HEADER = "X-Since-Cursor"
+
+KeysetCursor = Tuple[datetime.datetime, int]
+
+# created_at ставится при вставке, а видна запись становится только после
+# фиксации транзакции: курсор опроса не заходит в последние SINCE_OVERLAP,
+# и записи из этого окна могут прийти повторно
+SINCE_OVERLAP = datetime.timedelta(minutes=1)
+RankCursor = Tuple[float, int]
+
+
+def __b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def __b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def __sign(payload: bytes) -> bytes:
+    key = token_settings.secret_key.encode()
+    return hmac.new(key, payload, hashlib.sha256).digest()[:16]
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Упаковывает значения ключа сортировки в непрозрачный подписанный курсор
+    """
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return f"{__b64encode(payload)}.{__b64encode(__sign(payload))}"
+
+
+def decode_cursor(cursor: str) -> List:
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор"
+    )
+    try:
+        payload, signature = (__b64decode(part) for part in cursor.split("."))
+        if not hmac.compare_digest(signature, __sign(payload)):
+            raise invalid_cursor
+        values = json.loads(payload)
+    except (ValueError, TypeError):
+        raise invalid_cursor
+    if not isinstance(values, list):
+        raise invalid_cursor
+    return values
+
+
+def encode_keyset_cursor(created_at: datetime.datetime, id: int) -> str:
+    return encode_cursor([created_at.isoformat(), id])
+
+
+def decode_keyset_cursor(cursor: Optional[str]) -> Optional[KeysetCursor]:
+    if cursor is None:
+        return None
+    values = decode_cursor(cursor)
+    try:
+        created_at, id = values
+        return datetime.datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор"
+        )
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[RankCursor]:
+    if cursor is None:
+        return None
+    values = decode_cursor(cursor)
+    try:
+        rank, id = values
+        return float(rank), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор"
+        )
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int) -> None:
+    """
+    Если страница заполнена целиком, отдает в заголовке курсор следующей
+    """
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_keyset_cursor(
+            last.created_at, last.id
+        )
+
+
+def set_since_cursor(
+    response: Response,
+    items: Sequence,
+    limit: int,
+    since: Optional[str],
+    cursor: Optional[str],
+) -> None:
+    """
+    Отдает в заголовке курсор для следующего опроса. Курсор не заходит
+    дальше прочитанного и дальше SINCE_OVERLAP до текущего момента:
+    запись, зафиксированная позже более новой, придет следующим опросом.
+    Повторы клиент отбрасывает по идентификатору
+    """
+    if cursor is not None:
+        return
+    horizon = (datetime.datetime.utcnow() - SINCE_OVERLAP, 0)
+    previous = decode_keyset_cursor(since)
+    if previous is None:
+        # первая страница от новых к старым
+        if not items:
+            return
+        key = min((items[0].created_at, items[0].id), horizon)
+    elif len(items) < limit:
+        # прочитано все, что было видно после since
+        key = max(previous, horizon)
+    else:
+        key = max(previous, min((items[-1].created_at, items[-1].id), horizon))
+    response.headers[SINCE_CURSOR_HEADER] = encode_keyset_cursor(*key)
+
+
+def paginate(
+    query: Select,
+    model,
+    limit: int,
+    skip: int,
+    cursor: Optional[KeysetCursor],
+    since: Optional[KeysetCursor] = None,
+) -> Select:
+    """
+    Сортирует выборку по (created_at, id) от новых к старым, в том числе
+    без курсора: страницы по смещению идут в том же порядке, что и по курсору.
+    С курсором продолжает после него по индексу, без курсора - по смещению.
+    since выбирает записи новее заданной от старых к новым, чтобы
+    курсор опроса продвигался только по прочитанному
+    """
+    if since is not None:
+        return (
+            query.where(tuple_(model.created_at, model.id) > tuple_(*since))
+            .order_by(model.created_at, model.id)
+            .limit(limit)
+        )
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+    if cursor is not None:
+        return query.where(tuple_(model.created_at, model.id) < tuple_(*cursor))
+    return query.offset(skip)
@@ -0,0 +1,40 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User
+
+
+class CurrentUser:
+    """
+    Текущий пользователь запроса. Для проверки прав хватает id и роли.
+    Если ORM-модель не передана, она загружается только по требованию
+    через load()
+    """
+
+    __slots__ = ("id", "email", "is_company", "_db", "_user")
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        is_company: bool,
+        db: AsyncSession,
+        user: Optional[User] = None,
+    ):
+        self.id = id
+        self.email = email
+        self.is_company = is_company
+        self._db = db
+        self._user = user
+
+    @classmethod
+    def from_user(cls, user: User, db: AsyncSession) -> "CurrentUser":
+        return cls(
+            id=user.id, email=user.email, is_company=user.is_company, db=db, user=user
+        )
+
+    async def load(self) -> Optional[User]:
+        if self._user is None:
+            from queries import user as user_queries
+
+            self._user = await user_queries.get_by_id(db=self._db, user_id=self.id)
+        return self._user
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# на простаивающей реплике время последней проигранной транзакции стареет,
+# поэтому отставание считается нулевым, если весь полученный WAL уже проигран
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Решает, можно ли отправить читающий запрос на реплику.
+    Реплика не используется, если она отстает больше max_lag секунд
+    или недоступна, а также для пользователя, который писал в БД
+    меньше sticky_window секунд назад (read-your-writes)
+    """
+
+    def __init__(self, max_lag: float, sticky_window: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self._recent_writers = LRUCache(max_size=100000, ttl=sticky_window)
+        self._monitor_task: Optional[asyncio.Task] = None
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def record_write(self, user_id: Optional[int]) -> None:
+        if user_id is not None:
+            self._recent_writers.set(user_id, True)
+
+    def use_replica(self, user_id: Optional[int]) -> bool:
+        use_replica = self.healthy and (
+            user_id is None or self._recent_writers.get(user_id) is None
+        )
+        if use_replica:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        return use_replica
+
+    async def check_lag(self, replica_engine: AsyncEngine) -> None:
+        try:
+            async with replica_engine.connect() as connection:
+                self.lag = float((await connection.execute(REPLICA_LAG_SQL)).scalar())
+        except Exception:
+            logger.warning("Реплика недоступна, чтение идет с основной БД")
+            self.lag = None
+            self.healthy = False
+            return
+        self.healthy = self.lag <= self.max_lag
+
+    async def _monitor(self, replica_engine: AsyncEngine) -> None:
+        while True:
+            await self.check_lag(replica_engine)
+            await asyncio.sleep(self.check_interval)
+
+    def start(self, replica_engine: AsyncEngine) -> None:
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor(replica_engine))
+
+    async def stop(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+        self.healthy = False
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+        }
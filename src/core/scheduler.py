@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# один шаг задачи обрабатывает ограниченную пачку строк и возвращает их число
+TaskStep = Callable[[], Awaitable[int]]
+
+
+class TaskStats:
+    __slots__ = ("runs", "batches", "rows", "errors", "last_batch_ms", "max_batch_ms")
+
+    def __init__(self):
+        self.runs = 0
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.last_batch_ms: Optional[float] = None
+        self.max_batch_ms = 0.0
+
+    def record_batch(self, rows: int, duration_ms: float) -> None:
+        self.batches += 1
+        self.rows += rows
+        self.last_batch_ms = duration_ms
+        self.max_batch_ms = max(self.max_batch_ms, duration_ms)
+
+    def as_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Scheduler:
+    """
+    Периодические фоновые задачи, которые из всех воркеров выполняет только
+    лидер. Лидерство - сессионная advisory-блокировка Postgres на отдельном
+    соединении: если воркер падает, соединение закрывается, блокировка
+    снимается, и на следующем такте ее забирает другой воркер.
+    Задача выполняется шагами, пока шаг обрабатывает строки, но не больше
+    max_batches шагов за такт
+    """
+
+    def __init__(self, lock_key: int, interval: float, max_batches: int):
+        self.lock_key = lock_key
+        self.interval = interval
+        self.max_batches = max_batches
+
+        self._tasks: Dict[str, TaskStep] = {}
+        self._stats: Dict[str, TaskStats] = {}
+        self._dsn: Optional[str] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        # проверку лидерства из цикла и извне нельзя выполнять параллельно:
+        # иначе каждая откроет свое соединение
+        self._leadership_lock = asyncio.Lock()
+
+        self.is_leader = False
+        self.ticks = 0
+
+    def add(self, name: str, step: TaskStep) -> None:
+        self._tasks[name] = step
+        self._stats[name] = TaskStats()
+
+    def start(self, dsn: str) -> None:
+        self._dsn = dsn
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        await self._release()
+
+    async def _release(self) -> None:
+        self.is_leader = False
+        if self._connection is not None:
+            # закрытие соединения снимает и сессионную блокировку
+            await self._connection.close()
+            self._connection = None
+
+    async def ensure_leadership(self) -> bool:
+        async with self._leadership_lock:
+            return await self._ensure_leadership()
+
+    async def _ensure_leadership(self) -> bool:
+        try:
+            if self._connection is None or self._connection.is_closed():
+                self.is_leader = False
+                self._connection = await asyncpg.connect(self._dsn)
+            if self.is_leader:
+                # проверка, что соединение, а значит и блокировка, еще живо
+                await self._connection.execute("SELECT 1")
+            else:
+                self.is_leader = await self._connection.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", self.lock_key
+                )
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError):
+            logger.warning("Нет соединения для блокировки планировщика, повтор")
+            self.is_leader = False
+            if self._connection is not None:
+                self._connection.terminate()
+                self._connection = None
+        return self.is_leader
+
+    async def run_task(self, name: str) -> int:
+        """
+        Выполняет задачу шагами и возвращает число обработанных строк
+        """
+        step, stats = self._tasks[name], self._stats[name]
+        stats.runs += 1
+        processed = 0
+        for _ in range(self.max_batches):
+            started = time.perf_counter()
+            try:
+                rows = await step()
+            except Exception:
+                stats.errors += 1
+                logger.exception("Ошибка фоновой задачи %s", name)
+                break
+            stats.record_batch(rows, (time.perf_counter() - started) * 1000)
+            processed += rows
+            if not rows:
+                break
+        return processed
+
+    async def _loop(self) -> None:
+        while True:
+            self.ticks += 1
+            if await self.ensure_leadership():
+                for name in self._tasks:
+                    await self.run_task(name)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.is_leader,
+            "ticks": self.ticks,
+            "tasks": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
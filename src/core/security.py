@@ -1,12 +1,22 @@
+import asyncio
 import datetime
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer
 from passlib.context import CryptContext
-from jose import jwt
-from config import token_settings
+from jose import jwt, JWTError
+from config import token_settings, password_hashing_settings
+from core.cache import LRUCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# версия набора claims в токене; для токенов других версий (выпущенных
+# до появления uid, role и tv) пользователь по-прежнему ищется в БД по email
+TOKEN_VERSION = 2
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,6 +26,125 @@ def verify_password(password: str, hash: str) -> bool:
     return pwd_context.verify(password, hash)
 
 
+class PasswordHashingPool:
+    """
+    Пул для bcrypt, чтобы хеширование не блокировало event loop.
+    Одновременно выполняется не больше max_workers операций,
+    в очереди ждут не больше max_queue_size, остальные получают 503
+    """
+
+    def __init__(self, executor: str, max_workers: int, max_queue_size: int):
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._queued = 0
+        self._in_progress = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # семафор привязан к event loop, а в тестах loop у каждого теста свой
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable, *args):
+        if self._queued >= self.max_queue_size:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис перегружен, повторите попытку позже",
+            )
+
+        semaphore = self._get_semaphore()
+        self._queued += 1
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        waited = time.perf_counter() - started
+        self._wait_time_total += waited
+        self._wait_time_max = max(self._wait_time_max, waited)
+        self._in_progress += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_progress -= 1
+            self._completed += 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queued,
+            "in_progress": self._in_progress,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_time_avg_ms": (
+                self._wait_time_total / self._completed * 1000
+                if self._completed
+                else 0.0
+            ),
+            "wait_time_max_ms": self._wait_time_max * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    executor=password_hashing_settings.executor,
+    max_workers=password_hashing_settings.max_workers,
+    max_queue_size=password_hashing_settings.max_queue_size,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hashing_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hash: str) -> bool:
+    return await password_hashing_pool.run(verify_password, password, hash)
+
+
+def create_user_claims(
+    user_id: int, email: str, is_company: bool, token_version: int
+) -> dict:
+    return {
+        "sub": email,
+        "uid": user_id,
+        "role": "company" if is_company else "applicant",
+        "tv": token_version,
+        "ver": TOKEN_VERSION,
+    }
+
+
 def create_token(data: dict) -> str:
     to_encode = data.copy()
     to_encode.update(
@@ -39,19 +168,44 @@ def decode_token(token: str):
     return encoded_jwt
 
 
+verified_token_cache = LRUCache(max_size=token_settings.verified_cache_size)
+
+
+def verify_token(token: str) -> Optional[dict]:
+    """
+    Проверяет подпись токена и возвращает его claims.
+    Уже проверенные токены берутся из кеша до наступления их exp
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = verified_token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = decode_token(token)
+    except JWTError:
+        return None
+    if claims is None:
+        return None
+
+    verified_token_cache.set(digest, claims, expires_at=claims.get("exp"))
+    return claims
+
+
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
 
-    async def __call__(self, request: Request):
+    async def __call__(self, request: Request) -> dict:
         credentials = await super(JWTBearer, self).__call__(request)
         exp = HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid auth token"
         )
         if credentials:
-            token = decode_token(credentials.credentials)
-            if token is None:
+            claims = verify_token(credentials.credentials)
+            if claims is None:
                 raise exp
-            return credentials.credentials
+            request.state.token_claims = claims
+            return claims
         else:
             raise exp
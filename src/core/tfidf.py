@@ -0,0 +1,297 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"\w\w+")
+
+Document = Tuple[int, str]
+
+
+class Segment(NamedTuple):
+    """
+    Часть индекса: логарифмированные частоты термов по строкам,
+    идентификаторы строк по возрастанию, признак живой строки
+    и норма TF-IDF вектора строки
+    """
+
+    counts: sparse.csr_matrix
+    ids: np.ndarray
+    alive: np.ndarray
+    norms: np.ndarray
+
+
+class Snapshot(NamedTuple):
+    segments: Tuple[Segment, ...]
+    idf: np.ndarray
+
+
+def _empty_segment() -> Segment:
+    return Segment(
+        counts=sparse.csr_matrix((0, 0), dtype=np.float32),
+        ids=np.zeros(0, dtype=np.int64),
+        alive=np.zeros(0, dtype=bool),
+        norms=np.zeros(0, dtype=np.float32),
+    )
+
+
+class TfidfIndex:
+    """
+    TF-IDF индекс документов в памяти для поиска похожих по косинусу.
+
+    Основная часть - разреженная CSR-матрица частот, IDF и нормы строк
+    пересчитываются только при ее пересборке. Новые и измененные документы
+    копятся в небольшой отдельной части и сливаются с основной, когда
+    изменений набирается compact_after; до этого IDF их новых термов
+    считается максимальным. Удаленные строки основной части только
+    помечаются. Каждое изменение публикует новый снимок (snapshot), поэтому
+    поиск, идущий параллельно в другом потоке, видит согласованное состояние.
+    Изменять индекс одновременно из нескольких потоков нельзя
+    """
+
+    def __init__(self, compact_after: int):
+        self.compact_after = compact_after
+        self.vocabulary: Dict[str, int] = {}
+
+        self._main = _empty_segment()
+        self._main_idf = np.zeros(0, dtype=np.float32)
+        self._pending: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dead = 0
+
+        self.snapshot = Snapshot(segments=(), idf=self._main_idf)
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return int(self._main.alive.sum()) + len(self._pending)
+
+    def count_terms(
+        self, documents: Sequence[Document]
+    ) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        """
+        Переводит пачку документов в матрицу частот 1 + log(tf),
+        пополняя словарь. Повторы слов считает Counter, поэтому
+        через словарь проходит только по одному экземпляру терма
+        """
+        vocabulary = self.vocabulary
+        indices: List[int] = []
+        frequencies: List[int] = []
+        indptr = [0]
+        for _, text in documents:
+            counter = Counter(TOKEN_PATTERN.findall(text.lower()))
+            indices.extend(
+                [vocabulary.setdefault(token, len(vocabulary)) for token in counter]
+            )
+            frequencies.extend(counter.values())
+            indptr.append(len(indices))
+
+        data = np.log(np.array(frequencies, dtype=np.float32))
+        data += 1
+        counts = sparse.csr_matrix(
+            (data, np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(documents), len(vocabulary)),
+        )
+        ids = np.fromiter((id for id, _ in documents), dtype=np.int64)
+        return ids, counts
+
+    def build(self, parts: Iterable[Tuple[np.ndarray, sparse.csr_matrix]]) -> None:
+        """
+        Собирает основную часть заново из пачек count_terms
+        """
+        parts = list(parts)
+        self._pending.clear()
+        if parts:
+            ids = np.concatenate([ids for ids, _ in parts])
+            counts = sparse.vstack(
+                [self._widen(counts) for _, counts in parts], format="csr"
+            )
+        else:
+            ids, counts = _empty_segment().ids, self._widen(_empty_segment().counts)
+        self._compact(ids, counts)
+        self.builds += 1
+
+    def upsert(self, ids: np.ndarray, counts: sparse.csr_matrix) -> None:
+        alive = self._main.alive.copy()
+        for row, id in enumerate(ids.tolist()):
+            self._kill(alive, id)
+            start, end = counts.indptr[row], counts.indptr[row + 1]
+            self._pending[id] = (counts.indices[start:end], counts.data[start:end])
+        self._publish(alive)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        alive = self._main.alive.copy()
+        for id in ids:
+            self._kill(alive, id)
+            self._pending.pop(id, None)
+        self._publish(alive)
+
+    def _kill(self, alive: np.ndarray, id: int) -> None:
+        row = np.searchsorted(self._main.ids, id)
+        if row < len(alive) and self._main.ids[row] == id and alive[row]:
+            alive[row] = False
+            self._dead += 1
+
+    def _widen(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Дополняет матрицу колонками термов, появившихся позже нее
+        """
+        return sparse.csr_matrix(
+            (counts.data, counts.indices, counts.indptr),
+            shape=(counts.shape[0], len(self.vocabulary)),
+        )
+
+    def _pending_matrix(self) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        ids = np.array(sorted(self._pending), dtype=np.int64)
+        rows = [self._pending[id] for id in ids.tolist()]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+        counts = sparse.csr_matrix(
+            (
+                np.concatenate(
+                    [data for _, data in rows] or [np.zeros(0, dtype=np.float32)]
+                ),
+                np.concatenate(
+                    [indices for indices, _ in rows] or [np.zeros(0, dtype=np.int32)]
+                ),
+                indptr,
+            ),
+            shape=(len(rows), len(self.vocabulary)),
+            dtype=np.float32,
+        )
+        return ids, counts
+
+    def _idf(self) -> np.ndarray:
+        # новые термы встречались не больше чем в нескольких документах:
+        # их IDF до пересборки берется максимальным
+        idf = np.empty(len(self.vocabulary), dtype=np.float32)
+        known = len(self._main_idf)
+        idf[:known] = self._main_idf
+        idf[known:] = np.log(1 + len(self._main.ids)) + 1
+        return idf
+
+    @staticmethod
+    def _norms(counts: sparse.csr_matrix, idf: np.ndarray) -> np.ndarray:
+        squared = counts.multiply(counts) @ (idf[: counts.shape[1]] ** 2)
+        norms = np.sqrt(np.asarray(squared, dtype=np.float32)).ravel()
+        # у пустого документа нулевой вектор: его сходство всегда 0
+        norms[norms == 0] = 1
+        return norms
+
+    def _compact(self, ids: np.ndarray, counts: sparse.csr_matrix) -> None:
+        order = np.argsort(ids, kind="stable")
+        ids, counts = ids[order], counts[order]
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+        self._main_idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(
+            np.float32
+        )
+        self._main = Segment(
+            counts=counts,
+            ids=ids,
+            alive=np.ones(len(ids), dtype=bool),
+            norms=self._norms(counts, self._main_idf),
+        )
+        self._dead = 0
+        self._pending.clear()
+        self.snapshot = Snapshot(segments=(self._main,), idf=self._main_idf)
+
+    def _publish(self, alive: np.ndarray) -> None:
+        if len(self._pending) + self._dead > self.compact_after:
+            pending_ids, pending_counts = self._pending_matrix()
+            self._compact(
+                np.concatenate([self._main.ids[alive], pending_ids]),
+                sparse.vstack(
+                    [self._widen(self._main.counts[alive]), pending_counts],
+                    format="csr",
+                ),
+            )
+            return
+
+        self._main = self._main._replace(alive=alive)
+        idf = self._idf()
+        pending_ids, pending_counts = self._pending_matrix()
+        pending = Segment(
+            counts=pending_counts,
+            ids=pending_ids,
+            alive=np.ones(len(pending_ids), dtype=bool),
+            norms=self._norms(pending_counts, idf),
+        )
+        self.snapshot = Snapshot(segments=(self._main, pending), idf=idf)
+
+    def vectorize(self, texts: Iterable[str], snapshot: Snapshot) -> np.ndarray:
+        """
+        Профиль: нормированная сумма TF-IDF векторов текстов.
+        Термы вне словаря снимка ни с чем не совпадут и пропускаются
+        """
+        profile = np.zeros(len(snapshot.idf), dtype=np.float32)
+        for text in texts:
+            terms, counts = np.unique(
+                [
+                    term
+                    for term in map(
+                        self.vocabulary.get, TOKEN_PATTERN.findall(text.lower())
+                    )
+                    if term is not None and term < len(profile)
+                ],
+                return_counts=True,
+            )
+            if not len(terms):
+                continue
+            weights = (1 + np.log(counts)) * snapshot.idf[terms]
+            profile[terms] += weights / np.linalg.norm(weights)
+        norm = np.linalg.norm(profile)
+        return profile / norm if norm else profile
+
+    def similar(
+        self, texts: Iterable[str], limit: int, exclude: Iterable[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """
+        Возвращает до limit документов, самых похожих на тексты профиля,
+        как пары (идентификатор, косинусное сходство) по убыванию сходства.
+        Каждая часть индекса оценивается одним умножением матрицы на вектор
+        """
+        snapshot = self.snapshot
+        profile = self.vectorize(texts, snapshot)
+        if not profile.any():
+            return []
+        weights = profile * snapshot.idf
+        exclude = np.fromiter(exclude, dtype=np.int64)
+
+        candidate_ids, candidate_scores = [], []
+        for segment in snapshot.segments:
+            if not len(segment.ids):
+                continue
+            scores = segment.counts @ weights[: segment.counts.shape[1]]
+            scores /= segment.norms
+            scores[~segment.alive] = 0
+            if len(exclude):
+                scores[np.isin(segment.ids, exclude)] = 0
+            top = min(limit, len(scores))
+            rows = np.argpartition(scores, -top)[-top:]
+            rows = rows[scores[rows] > 0]
+            candidate_ids.append(segment.ids[rows])
+            candidate_scores.append(scores[rows])
+        if not candidate_ids:
+            return []
+
+        ids = np.concatenate(candidate_ids)
+        scores = np.concatenate(candidate_scores)
+        order = np.lexsort((ids, -scores))[:limit]
+        return list(zip(ids[order].tolist(), scores[order].tolist()))
+
+    def memory_bytes(self) -> int:
+        total = 0
+        for segment in self.snapshot.segments:
+            counts = segment.counts
+            total += counts.data.nbytes + counts.indices.nbytes + counts.indptr.nbytes
+            total += segment.ids.nbytes + segment.alive.nbytes + segment.norms.nbytes
+        return total + self.snapshot.idf.nbytes
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self),
+            "pending": len(self._pending),
+            "dead": self._dead,
+            "terms": len(self.vocabulary),
+            "builds": self.builds,
+            "bytes": self.memory_bytes(),
+        }
@@ -1,7 +1,13 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+from typing import Optional
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.query import FromStatement
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import db_settings, test_db_settings, project_settings
+from core.replica import ReplicaRouter
 
 
 if project_settings.stage == "test":
@@ -9,10 +15,137 @@ if project_settings.stage == "test":
 else:
     SQLALCHEMY_DATABASE_URL = db_settings.db_url
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
 
-SessionLocal = scoped_session(
-    sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает время ожидания свободного соединения
+    """
+
+    checkouts = 0
+    timeouts = 0
+    wait_time_total = 0.0
+    wait_time_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time_avg_ms": (
+                self.wait_time_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_time_max_ms": self.wait_time_max * 1000,
+        }
+
+
+def __create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=db_settings.pool_size,
+        max_overflow=db_settings.max_overflow,
+        pool_timeout=db_settings.pool_timeout,
+        pool_recycle=db_settings.pool_recycle,
+        pool_pre_ping=db_settings.pool_pre_ping,
+        connect_args={
+            # кеш prepared statements SQLAlchemy и самого asyncpg;
+            # за pgbouncer в режиме transaction оба нужно выставить в 0
+            "prepared_statement_cache_size": db_settings.statement_cache_size,
+            "statement_cache_size": db_settings.statement_cache_size,
+            # у фильтров списка вакансий лучший план зависит от значений
+            # параметров: общий план для prepared statement после пятого
+            # выполнения застревает на одной избирательности
+            "server_settings": {"plan_cache_mode": db_settings.plan_cache_mode},
+        },
+    )
+
+
+engine = __create_engine(SQLALCHEMY_DATABASE_URL)
+
+if db_settings.replica_url and project_settings.stage != "test":
+    replica_engine: Optional[AsyncEngine] = __create_engine(db_settings.replica_url)
+else:
+    replica_engine = None
+
+replica_router = ReplicaRouter(
+    max_lag=db_settings.replica_max_lag,
+    sticky_window=db_settings.read_your_writes_window,
+    check_interval=db_settings.replica_lag_check_interval,
+)
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая отправляет запросы с execution_options(read_replica=True)
+    на реплику, а все остальное - на основную БД.
+    Id текущего пользователя берется из session.info["user_id"]
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        # INSERT/UPDATE ... RETURNING приходят обернутыми в select().from_statement()
+        if isinstance(clause, FromStatement):
+            clause = clause.element
+        is_read = (
+            clause is not None
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+        )
+        if not is_read:
+            self.info["wrote"] = True
+            return engine.sync_engine
+
+        if (
+            replica_engine is not None
+            and clause.get_execution_options().get("read_replica")
+            and not self.info.get("wrote")
+            and replica_router.use_replica(self.info.get("user_id"))
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def __remember_writer(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        replica_router.record_write(session.info.get("user_id"))
+
+
+# DSN для прямых подключений asyncpg в обход SQLAlchemy (LISTEN/NOTIFY)
+ASYNCPG_DSN = engine.url.set(drivername="postgresql").render_as_string(
+    hide_password=False
+)
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
 )
 
 Base = declarative_base()
+
+
+def get_pool_stats() -> dict:
+    stats = {"primary": engine.pool.stats()}
+    if replica_engine is not None:
+        stats["replica"] = replica_engine.pool.stats()
+    return stats
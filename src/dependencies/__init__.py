@@ -1,3 +1,9 @@
-from .user import get_current_user
+from .user import get_current_user, get_user_fields
 from .db import get_db
-from .common import access_verification_for_company, access_verification_for_user
+from .common import (
+    access_verification_for_company,
+    access_verification_for_user,
+    access_verification_for_admin,
+)
+from .job import get_job_filters, get_job_fields
+from .response import get_response_fields
@@ -2,8 +2,5 @@ from db_connection import SessionLocal
 
 
 async def get_db():
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        await db.close()
@@ -0,0 +1,36 @@
+import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from schemas import JobFilterSchema, JobSchema
+from core.fields import fields_dependency
+
+# описание вакансии в списках по умолчанию не читается и не отдается
+get_job_fields = fields_dependency(JobSchema, deferred=("description",))
+
+
+async def get_job_filters(
+    salary_min: Optional[float] = Query(default=None, ge=0),
+    salary_max: Optional[float] = Query(default=None, ge=0),
+    posted_since: Optional[datetime.datetime] = Query(default=None),
+    company_id: Optional[int] = Query(default=None),
+) -> JobFilterSchema:
+    """
+    Собирает фильтры списка вакансий из параметров запроса.
+    Вакансия подходит по зарплате, если ее вилка пересекается с заданной
+    """
+    if salary_min is not None and salary_max is not None and salary_min > salary_max:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="salary_min, должна быть меньше salary_max!",
+        )
+    if posted_since is not None and posted_since.tzinfo is not None:
+        # даты создания хранятся в UTC без часового пояса
+        posted_since = posted_since.astimezone(datetime.timezone.utc).replace(
+            tzinfo=None
+        )
+    return JobFilterSchema(
+        salary_min=salary_min,
+        salary_max=salary_max,
+        posted_since=posted_since,
+        company_id=company_id,
+    )
@@ -0,0 +1,5 @@
+from schemas import ResponseSchema
+from core.fields import fields_dependency
+
+# сопроводительное письмо в списках по умолчанию не читается и не отдается
+get_response_fields = fields_dependency(ResponseSchema, deferred=("message",))
@@ -1,24 +1,34 @@
 from fastapi import Depends, HTTPException, status
-from core.security import JWTBearer, decode_token
+from core.principal import CurrentUser
+from core.security import JWTBearer, TOKEN_VERSION
+from core.fields import fields_dependency
 from queries import user as user_queries
 from sqlalchemy.ext.asyncio import AsyncSession
 from dependencies.db import get_db
-from models import User
+from schemas import UserSchema
+
+get_user_fields = fields_dependency(UserSchema)
 
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(JWTBearer())
-) -> User:
+    db: AsyncSession = Depends(get_db), payload: dict = Depends(JWTBearer())
+) -> CurrentUser:
     cred_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, detail="Credentials are not valid"
     )
-    payload = decode_token(token)
-    if payload is None:
-        raise cred_exception
     email: str = payload.get("sub")
     if email is None:
         raise cred_exception
-    user = await user_queries.get_by_email(db=db, email=email)
-    if user is None:
-        raise cred_exception
-    return user
+
+    if payload.get("ver") == TOKEN_VERSION:
+        # строка берется из кеша пользователей: после смены роли или email
+        # и после удаления пользователя прежние токены перестают действовать
+        user = await user_queries.get_by_id(db=db, user_id=payload["uid"])
+        if user is None or user.token_version != payload.get("tv"):
+            raise cred_exception
+    else:
+        user = await user_queries.get_by_email(db=db, email=email)
+        if user is None:
+            raise cred_exception
+    db.info["user_id"] = user.id
+    return CurrentUser.from_user(user, db)
@@ -1,5 +1,6 @@
 import factory
 from models import Response
+from datetime import datetime
 from factory_boy_extra.async_sqlalchemy_factory import AsyncSQLAlchemyModelFactory
 
 
@@ -11,3 +12,4 @@ class ResponseFactory(AsyncSQLAlchemyModelFactory):
     user_id = factory.Faker("pyint")
     job_id = factory.Faker("pyint")
     message = factory.Faker("pystr")
+    created_at = factory.LazyFunction(datetime.utcnow)
@@ -1,13 +1,66 @@
+import asyncio
 from fastapi import FastAPI
-from routers import auth_router, user_router, job_router, response_router
+from routers import (
+    auth_router,
+    user_router,
+    job_router,
+    response_router,
+    metrics_router,
+    admin_router,
+)
 import uvicorn
-from config import server_settings
+from config import (
+    server_settings,
+    cache_settings,
+    scheduler_settings,
+    recommendation_settings,
+    duplicate_settings,
+)
+from core.notifications import notification_hub
+from core.security import password_hashing_pool
+from db_connection import ASYNCPG_DSN, replica_engine, replica_router
+from tasks import scheduler, build_job_index, build_duplicate_index
 
 app = FastAPI()
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(job_router)
 app.include_router(response_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+
+background_tasks = set()
+
+
+def start_background_task(coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+@app.on_event("startup")
+async def startup():
+    if cache_settings.notify_enabled:
+        await notification_hub.start(ASYNCPG_DSN)
+    if replica_engine is not None:
+        replica_router.start(replica_engine)
+    if scheduler_settings.enabled:
+        scheduler.start(ASYNCPG_DSN)
+    # индексы вакансий строятся в фоне, чтобы не задерживать старт
+    if recommendation_settings.warm_up:
+        start_background_task(build_job_index())
+    if duplicate_settings.warm_up:
+        start_background_task(build_duplicate_index())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    await scheduler.stop()
+    await notification_hub.stop()
+    await replica_router.stop()
+    password_hashing_pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""индексы для частых запросов
+
+Revision ID: 3c9d0f4a7b21
+Revises: a30520654c63
+Create Date: 2026-10-18 10:12:41.530215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c9d0f4a7b21"
+down_revision = "a30520654c63"
+branch_labels = None
+depends_on = None
+
+
+DEDUPLICATE_RESPONSES_SQL = """
+    DELETE FROM responses r
+    USING responses d
+    WHERE r.user_id = d.user_id AND r.job_id = d.job_id AND r.id > d.id
+"""
+
+
+def upgrade() -> None:
+    # повторные отклики не дадут построить уникальный индекс, оставляем первый
+    op.execute(DEDUPLICATE_RESPONSES_SQL)
+
+    # CREATE INDEX CONCURRENTLY не работает внутри транзакции
+    # и не блокирует запись в таблицу на время построения.
+    # Если построение прервалось (например, повторный отклик успел
+    # появиться до построения уникального индекса), индекс остается
+    # в состоянии INVALID. Миграцию тогда достаточно запустить еще раз:
+    # недостроенные индексы удаляются, дубликаты удаляются повторно
+    with op.get_context().autocommit_block():
+        for index_name in [
+            "ix_jobs_active_created_at",
+            "ix_jobs_user_id",
+            "ix_responses_job_id_id",
+            "uq_responses_user_id_job_id",
+        ]:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        op.create_index(
+            "ix_jobs_active_created_at",
+            "jobs",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_jobs_user_id",
+            "jobs",
+            ["user_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_responses_job_id_id",
+            "responses",
+            ["job_id", "id"],
+            postgresql_concurrently=True,
+        )
+        # дубликаты, появившиеся после удаления в транзакции миграции
+        op.execute(DEDUPLICATE_RESPONSES_SQL)
+        op.create_index(
+            "uq_responses_user_id_job_id",
+            "responses",
+            ["user_id", "job_id"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+    op.execute(
+        "ALTER TABLE responses ADD CONSTRAINT uq_responses_user_id_job_id "
+        "UNIQUE USING INDEX uq_responses_user_id_job_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_responses_user_id_job_id", "responses", type_="unique")
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_responses_job_id_id",
+            table_name="responses",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_jobs_user_id", table_name="jobs", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_jobs_active_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,54 @@
+"""полнотекстовый поиск вакансий
+
+Revision ID: 5b7a4e19c3d2
+Revises: 8f1e2d6c5a90
+Create Date: 2026-10-18 13:05:47.502916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "5b7a4e19c3d2"
+down_revision = "8f1e2d6c5a90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # хранимая генерируемая колонка переписывает таблицу jobs целиком,
+    # на большой базе миграцию нужно запускать в окно обслуживания
+    op.add_column(
+        "jobs",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            comment="Поисковый вектор по названию и описанию",
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_search_vector",
+            "jobs",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_search_vector",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("jobs", "search_vector")
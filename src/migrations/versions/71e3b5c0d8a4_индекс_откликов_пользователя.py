@@ -0,0 +1,35 @@
+"""индекс откликов пользователя
+
+Revision ID: 71e3b5c0d8a4
+Revises: d41c7e2a9f63
+Create Date: 2026-10-18 16:02:44.915530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "71e3b5c0d8a4"
+down_revision = "d41c7e2a9f63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_responses_user_id_created_at_id",
+            "responses",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_responses_user_id_created_at_id",
+            table_name="responses",
+            postgresql_concurrently=True,
+        )
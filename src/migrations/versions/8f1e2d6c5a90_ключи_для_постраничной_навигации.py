@@ -0,0 +1,76 @@
+"""ключи для постраничной навигации
+
+Revision ID: 8f1e2d6c5a90
+Revises: 3c9d0f4a7b21
+Create Date: 2026-10-18 11:40:02.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8f1e2d6c5a90"
+down_revision = "3c9d0f4a7b21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # курсор строится по (created_at, id), пустых дат быть не должно
+    op.add_column(
+        "responses",
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=True,
+            comment="Дата создания записи",
+        ),
+    )
+    op.alter_column("jobs", "created_at", server_default=sa.text("now()"))
+    op.alter_column("users", "created_at", server_default=sa.text("now()"))
+    op.execute("UPDATE jobs SET created_at = now() WHERE created_at IS NULL")
+    op.execute("UPDATE users SET created_at = now() WHERE created_at IS NULL")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_responses_job_id_created_at_id",
+            "responses",
+            ["job_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_responses_job_id_id",
+            table_name="responses",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_responses_job_id_id",
+            "responses",
+            ["job_id", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_responses_job_id_created_at_id",
+            table_name="responses",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+    op.alter_column("users", "created_at", server_default=None)
+    op.alter_column("jobs", "created_at", server_default=None)
+    op.drop_column("responses", "created_at")
@@ -0,0 +1,33 @@
+"""версия токенов
+
+Revision ID: a7c2e95b1f48
+Revises: f3a8c61d2e07
+Create Date: 2026-10-18 23:12:07.402915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c2e95b1f48"
+down_revision = "f3a8c61d2e07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "token_version",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Версия выданных токенов, растет при смене роли или email",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,37 @@
+"""время изменения вакансий и пользователей
+
+Revision ID: b8e4f27a1c35
+Revises: 71e3b5c0d8a4
+Create Date: 2026-10-18 18:21:07.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e4f27a1c35"
+down_revision = "71e3b5c0d8a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # значение по умолчанию не volatile, поэтому таблицы не перезаписываются:
+    # у существующих строк временем изменения становится время миграции
+    for table in ("jobs", "users"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(),
+                server_default=sa.text("timezone('utc', now())"),
+                nullable=False,
+                comment="Время последнего изменения записи",
+            ),
+        )
+
+
+def downgrade() -> None:
+    for table in ("users", "jobs"):
+        op.drop_column(table, "updated_at")
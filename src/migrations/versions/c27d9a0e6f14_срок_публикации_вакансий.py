@@ -0,0 +1,46 @@
+"""срок публикации вакансий
+
+Revision ID: c27d9a0e6f14
+Revises: b8e4f27a1c35
+Create Date: 2026-10-18 19:05:33.218406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c27d9a0e6f14"
+down_revision = "b8e4f27a1c35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column(
+            "expires_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время снятия вакансии с публикации",
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_active_expires_at",
+            "jobs",
+            ["expires_at"],
+            postgresql_where=sa.text("is_active AND expires_at IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_active_expires_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("jobs", "expires_at")
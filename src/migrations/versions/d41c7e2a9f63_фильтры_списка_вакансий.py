@@ -0,0 +1,87 @@
+"""фильтры списка вакансий
+
+Revision ID: d41c7e2a9f63
+Revises: 5b7a4e19c3d2
+Create Date: 2026-10-18 14:21:09.377105
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d41c7e2a9f63"
+down_revision = "5b7a4e19c3d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # numrange не строится из перевернутой вилки, поэтому новые такие строки
+    # запрещаются ограничением. Существующие миграция не исправляет:
+    # их нужно разобрать вручную, прежде чем повторить миграцию
+    inverted_ids = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT id FROM jobs WHERE salary_from > salary_to ORDER BY id LIMIT 20"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if inverted_ids:
+        raise RuntimeError(
+            "В вакансиях salary_from больше salary_to, например id: "
+            + ", ".join(map(str, inverted_ids))
+        )
+    op.create_check_constraint(
+        "ck_jobs_salary_from_le_salary_to",
+        "jobs",
+        "salary_from <= salary_to",
+        postgresql_not_valid=True,
+    )
+
+    with op.get_context().autocommit_block():
+        # проверка существующих строк идет отдельной транзакцией: под
+        # блокировкой ACCESS EXCLUSIVE от ADD CONSTRAINT она не сканирует таблицу
+        op.execute(
+            "ALTER TABLE jobs VALIDATE CONSTRAINT ck_jobs_salary_from_le_salary_to"
+        )
+        # индекс намеренно не частичный: только по выражению обычного индекса
+        # ANALYZE собирает статистику, без нее оценка && всегда 1% строк
+        op.create_index(
+            "ix_jobs_salary_range",
+            "jobs",
+            [sa.text("numrange(salary_from, salary_to, '[]')")],
+            postgresql_using="gist",
+            postgresql_concurrently=True,
+        )
+        # индекс по компании заодно отдает ее вакансии в порядке списка
+        op.create_index(
+            "ix_jobs_user_id_created_at",
+            "jobs",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_jobs_user_id", table_name="jobs", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_user_id", "jobs", ["user_id"], postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_jobs_user_id_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_jobs_salary_range",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint("ck_jobs_salary_from_le_salary_to", "jobs", type_="check")
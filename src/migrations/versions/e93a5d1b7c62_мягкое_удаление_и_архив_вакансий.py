@@ -0,0 +1,131 @@
+"""мягкое удаление и архив вакансий
+
+Revision ID: e93a5d1b7c62
+Revises: c27d9a0e6f14
+Create Date: 2026-10-18 19:48:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e93a5d1b7c62"
+down_revision = "c27d9a0e6f14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время удаления вакансии компанией",
+        ),
+    )
+    op.create_table(
+        "jobs_archive",
+        sa.Column("id", sa.Integer(), nullable=False, comment="Идентификатор вакансии"),
+        sa.Column(
+            "user_id", sa.Integer(), nullable=True, comment="Идентификатор пользователя"
+        ),
+        sa.Column("title", sa.String(), nullable=False, comment="Название вакансии"),
+        sa.Column(
+            "description", sa.String(), nullable=False, comment="Описание вакансии"
+        ),
+        sa.Column("salary_from", sa.DECIMAL(), nullable=True, comment="Зарплата от"),
+        sa.Column("salary_to", sa.DECIMAL(), nullable=True, comment="Зарплата до"),
+        sa.Column(
+            "is_active", sa.Boolean(), nullable=True, comment="Активна ли вакансия"
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=True, comment="Дата создания записи"
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время последнего изменения записи",
+        ),
+        sa.Column(
+            "expires_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время снятия вакансии с публикации",
+        ),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время удаления вакансии компанией",
+        ),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+            comment="Время переноса в архив",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_jobs_archive_user_id_created_at",
+        "jobs_archive",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_table(
+        "responses_archive",
+        sa.Column("id", sa.Integer(), nullable=False, comment="Идентификатор отклика"),
+        sa.Column(
+            "user_id", sa.Integer(), nullable=True, comment="Идентификатор пользователя"
+        ),
+        sa.Column(
+            "job_id", sa.Integer(), nullable=True, comment="Идентификатор вакансии"
+        ),
+        sa.Column(
+            "message", sa.String(), nullable=True, comment="Сопроводительное письмо"
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=True, comment="Дата создания записи"
+        ),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+            comment="Время переноса в архив",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_responses_archive_job_id_created_at_id",
+        "responses_archive",
+        ["job_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_inactive_updated_at",
+            "jobs",
+            ["updated_at"],
+            postgresql_where=sa.text("NOT is_active"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_jobs_inactive_updated_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+    op.drop_index(
+        "ix_responses_archive_job_id_created_at_id", table_name="responses_archive"
+    )
+    op.drop_table("responses_archive")
+    op.drop_index("ix_jobs_archive_user_id_created_at", table_name="jobs_archive")
+    op.drop_table("jobs_archive")
+    op.drop_column("jobs", "deleted_at")
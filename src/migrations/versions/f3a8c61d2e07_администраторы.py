@@ -0,0 +1,33 @@
+"""администраторы
+
+Revision ID: f3a8c61d2e07
+Revises: e93a5d1b7c62
+Create Date: 2026-10-18 21:05:41.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3a8c61d2e07"
+down_revision = "e93a5d1b7c62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "is_admin",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+            comment="Флаг администратора",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "is_admin")
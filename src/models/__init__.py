@@ -1,3 +1,4 @@
 from .users import User
 from .jobs import Job
 from .responses import Response
+from .archive import JobArchive, ResponseArchive
@@ -0,0 +1,80 @@
+import datetime
+
+from db_connection import Base
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DECIMAL,
+    Boolean,
+    DateTime,
+    Index,
+    text,
+)
+
+
+class JobArchive(Base):
+    """
+    Вакансии, давно снятые с публикации. Строки переносятся из jobs
+    фоновой задачей вместе с откликами, внешних ключей у архива нет
+    """
+
+    __tablename__ = "jobs_archive"
+    __table_args__ = (
+        Index(
+            "ix_jobs_archive_user_id_created_at",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, comment="Идентификатор вакансии")
+    user_id = Column(Integer, comment="Идентификатор пользователя")
+
+    title = Column(String, nullable=False, comment="Название вакансии")
+    description = Column(String, nullable=False, comment="Описание вакансии")
+    salary_from = Column(DECIMAL, comment="Зарплата от")
+    salary_to = Column(DECIMAL, comment="Зарплата до")
+    is_active = Column(Boolean, comment="Активна ли вакансия")
+    created_at = Column(DateTime, comment="Дата создания записи")
+    updated_at = Column(DateTime, comment="Время последнего изменения записи")
+    expires_at = Column(DateTime, comment="Время снятия вакансии с публикации")
+    deleted_at = Column(DateTime, comment="Время удаления вакансии компанией")
+    archived_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+        comment="Время переноса в архив",
+    )
+
+
+class ResponseArchive(Base):
+    """
+    Отклики на вакансии из jobs_archive
+    """
+
+    __tablename__ = "responses_archive"
+    __table_args__ = (
+        Index(
+            "ix_responses_archive_job_id_created_at_id",
+            "job_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, comment="Идентификатор отклика")
+    user_id = Column(Integer, comment="Идентификатор пользователя")
+    job_id = Column(Integer, comment="Идентификатор вакансии")
+
+    message = Column(String, comment="Сопроводительное письмо")
+    created_at = Column(DateTime, comment="Дата создания записи")
+    archived_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+        comment="Время переноса в архив",
+    )
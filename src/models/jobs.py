@@ -1,18 +1,69 @@
 import datetime
 
 from db_connection import Base
-from sqlalchemy import Column, Integer, String, DECIMAL, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DECIMAL,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Computed,
+    CheckConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+
+TEXT_SEARCH_CONFIG = "russian"
 
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index(
+            "ix_jobs_active_created_at",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_jobs_active_expires_at",
+            "expires_at",
+            postgresql_where=text("is_active AND expires_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_jobs_inactive_updated_at",
+            "updated_at",
+            postgresql_where=text("NOT is_active"),
+        ),
+        Index(
+            "ix_jobs_user_id_created_at",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_jobs_salary_range",
+            text("numrange(salary_from, salary_to, '[]')"),
+            postgresql_using="gist",
+        ),
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        CheckConstraint(
+            "salary_from <= salary_to", name="ck_jobs_salary_from_le_salary_to"
+        ),
+    )
 
     id = Column(
         Integer, primary_key=True, autoincrement=True, comment="Идентификатор вакансии"
     )
     user_id = Column(
-        Integer, ForeignKey("users.id"), comment="Идентификатор пользователя"
+        Integer,
+        ForeignKey("users.id"),
+        comment="Идентификатор пользователя",
     )
 
     title = Column(String, nullable=False, comment="Название вакансии")
@@ -21,7 +72,36 @@ class Job(Base):
     salary_to = Column(DECIMAL, comment="Зарплата до")
     is_active = Column(Boolean, default=True, comment="Активна ли вакансия")
     created_at = Column(
-        DateTime, default=datetime.datetime.utcnow, comment="Дата создания записи"
+        DateTime,
+        default=datetime.datetime.utcnow,
+        server_default=func.now(),
+        comment="Дата создания записи",
+    )
+    expires_at = Column(
+        DateTime, nullable=True, comment="Время снятия вакансии с публикации"
+    )
+    deleted_at = Column(
+        DateTime, nullable=True, comment="Время удаления вакансии компанией"
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+        comment="Время последнего изменения записи",
+    )
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A')"
+                f" || setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', "
+                "coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            comment="Поисковый вектор по названию и описанию",
+        )
     )
 
     user = relationship("User", back_populates="jobs")
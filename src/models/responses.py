@@ -1,10 +1,37 @@
+import datetime
+
 from db_connection import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 
 class Response(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="uq_responses_user_id_job_id"),
+        Index(
+            "ix_responses_job_id_created_at_id",
+            "job_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_responses_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
 
     id = Column(
         Integer, primary_key=True, autoincrement=True, comment="Идентификатор отклика"
@@ -15,6 +42,12 @@ class Response(Base):
     job_id = Column(Integer, ForeignKey("jobs.id"), comment="Идентификатор вакансии")
 
     message = Column(String, comment="Сопроводительное письмо")
+    created_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        server_default=func.now(),
+        comment="Дата создания записи",
+    )
 
     user = relationship("User", back_populates="responses")
     job = relationship("Job", back_populates="responses")
@@ -3,11 +3,24 @@ import datetime
 from sqlalchemy.orm import relationship
 
 from db_connection import Base
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    Index,
+    false,
+    func,
+    text,
+)
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", text("created_at DESC"), text("id DESC")),
+    )
 
     id = Column(
         Integer,
@@ -20,8 +33,35 @@ class User(Base):
     name = Column(String, comment="Имя пользователя")
     hashed_password = Column(String, comment="Зашифрованный пароль")
     is_company = Column(Boolean, comment="Флаг компании")
+    # назначается только через scripts.set_admin, не через API
+    is_admin = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+        comment="Флаг администратора",
+    )
+    # растет при смене роли или email: токены с прежней версией отклоняются
+    token_version = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Версия выданных токенов, растет при смене роли или email",
+    )
     created_at = Column(
-        DateTime, comment="Время создания записи", default=datetime.datetime.utcnow
+        DateTime,
+        comment="Время создания записи",
+        default=datetime.datetime.utcnow,
+        server_default=func.now(),
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+        comment="Время последнего изменения записи",
     )
 
     jobs = relationship("Job", back_populates="user")
@@ -0,0 +1,160 @@
+import asyncio
+from typing import List, Optional, Sequence, Set, Tuple
+import anyio
+from models import Job
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.minhash import MinHashIndex
+from queries.job_index import JobIndexState, sync_job_index
+from config import duplicate_settings
+
+# MinHash/LSH индекс текстов активных вакансий этого воркера,
+# владелец документа - компания
+duplicate_index = MinHashIndex(
+    num_perm=duplicate_settings.num_perm,
+    bands=duplicate_settings.bands,
+    threshold=duplicate_settings.threshold,
+    shingle_size=duplicate_settings.shingle_size,
+    compact_after=duplicate_settings.compact_after,
+)
+
+duplicate_index_state = JobIndexState()
+
+
+def job_text(title: str, description: str) -> str:
+    return f"{title} {description}"
+
+
+# фоновые уплотнения: ссылки на задачи держатся, пока они не завершатся
+compaction_tasks: Set[asyncio.Task] = set()
+
+
+async def __compact() -> None:
+    # вызывается под блокировкой состояния: индекс не меняется,
+    # пока новая основная часть собирается в отдельном потоке
+    part = duplicate_index.live_part()
+    segment = await anyio.to_thread.run_sync(duplicate_index.build_segment, [part])
+    duplicate_index.replace(segment)
+
+
+async def __compact_under_lock() -> None:
+    async with duplicate_index_state.lock:
+        if duplicate_index.needs_compaction:
+            await __compact()
+
+
+def __schedule_compaction() -> None:
+    """
+    Уплотняет индекс в фоне, а не в запросе, накопившем изменения:
+    при миллионе вакансий сборка основной части занимает секунды
+    """
+    if not duplicate_index.needs_compaction or compaction_tasks:
+        return
+    task = asyncio.create_task(__compact_under_lock())
+    compaction_tasks.add(task)
+    task.add_done_callback(compaction_tasks.discard)
+
+
+# индекс читает основную базу: с отстающей реплики можно прочитать
+# вакансию до изменения, о котором уже пришло уведомление
+async def __build(db: AsyncSession) -> None:
+    chunk_size = duplicate_settings.build_chunk_size
+    result = await db.stream(
+        select(Job.id, Job.user_id, Job.title, Job.description)
+        .where(Job.is_active)
+        .execution_options(yield_per=chunk_size)
+    )
+    parts = []
+    async for rows in result.partitions(chunk_size):
+        documents = [
+            (row.id, row.user_id, job_text(row.title, row.description)) for row in rows
+        ]
+        parts.append(
+            await anyio.to_thread.run_sync(duplicate_index.signatures, documents)
+        )
+    segment = await anyio.to_thread.run_sync(duplicate_index.build_segment, parts)
+    duplicate_index.replace(segment)
+
+
+async def __reindex(db: AsyncSession, condition, job_ids: Sequence[int] = ()) -> None:
+    """
+    Переиндексирует вакансии, подходящие под condition: активные заново
+    добавляются, остальные и не найденные из job_ids удаляются из индекса
+    """
+    res = await db.execute(
+        select(Job.id, Job.user_id, Job.title, Job.description, Job.is_active).where(
+            condition
+        )
+    )
+    rows = res.all()
+    documents = [
+        (row.id, row.user_id, job_text(row.title, row.description))
+        for row in rows
+        if row.is_active
+    ]
+    part = await anyio.to_thread.run_sync(duplicate_index.signatures, documents)
+    duplicate_index.remove([row.id for row in rows])
+    duplicate_index.remove(job_ids)
+    duplicate_index.add(part)
+    __schedule_compaction()
+
+
+async def refresh_duplicate_index(db: AsyncSession) -> None:
+    """
+    Приводит индекс в соответствие с базой. Сигнатуры и сборка основной
+    части считаются в отдельном потоке
+    """
+    await sync_job_index(db, duplicate_index_state, __build, __reindex)
+
+
+async def find_duplicate_job_ids(
+    db: AsyncSession, user_id: int, title: str, description: str
+) -> Optional[List[int]]:
+    """
+    Находит активные вакансии компании с почти таким же текстом,
+    от более похожих к менее. Сборки индекса проверка не ждет: пока
+    индекс не построен, возвращает None. Если индекс занят переиндексацией
+    или уплотнением, ищет по его текущему состоянию без последних изменений
+    """
+    state = duplicate_index_state
+    if not state.built:
+        return None
+    if not state.lock.locked():
+        await refresh_duplicate_index(db)
+    matches = duplicate_index.find_text(user_id, job_text(title, description))
+    return [job_id for job_id, _ in matches]
+
+
+def add_created_job(job: Job) -> None:
+    """
+    Добавляет только что созданную вакансию в индекс без чтения из базы,
+    чтобы следующая проверка не переиндексировала ее. Пока индекс
+    собирается или уплотняется, вакансия остается отмеченной
+    для переиндексации
+    """
+    state = duplicate_index_state
+    if not state.built or state.lock.locked() or not job.is_active:
+        return
+    state.stale_ids.discard(job.id)
+    duplicate_index.remove([job.id])
+    duplicate_index.add(
+        duplicate_index.signatures(
+            [(job.id, job.user_id, job_text(job.title, job.description))]
+        )
+    )
+    __schedule_compaction()
+
+
+async def get_duplicate_clusters(
+    db: AsyncSession, user_id: Optional[int], limit: int
+) -> List[Tuple[int, List[int]]]:
+    """
+    Группы почти одинаковых активных вакансий как пары (компания,
+    идентификаторы вакансий), от больших групп к меньшим
+    """
+    await refresh_duplicate_index(db)
+    async with duplicate_index_state.lock:
+        if duplicate_index.changes:
+            await __compact()
+        clusters = await anyio.to_thread.run_sync(duplicate_index.clusters, user_id)
+    return clusters[:limit]
@@ -1,18 +1,184 @@
-from models import Job
-from schemas import JobInSchema
-from typing import List, Optional
+import datetime
+from models import Job, JobArchive
+from models.jobs import TEXT_SEARCH_CONFIG
+from schemas import JobInSchema, JobFilterSchema, JobBatchUpdateSchema
+from typing import Collection, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import (
+    ARRAY,
+    REAL,
+    Boolean,
+    DateTime,
+    Integer,
+    Numeric,
+    String,
+    select,
+    and_,
+    or_,
+    insert,
+    update,
+    func,
+    cast,
+    literal_column,
+    tuple_,
+    text,
+)
 from sqlalchemy.orm.query import Query
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from core.pagination import KeysetCursor, RankCursor, paginate
+from core.fields import load_fields
+from core.cache import LRUCache, VersionedCache
+from core.notifications import notification_hub
+from queries.job_index import mark_jobs_changed
+from config import cache_settings
 
+JOB_LIST_CACHE_CHANNEL = "job_list_cache"
 
-async def __save_instance_db(db: AsyncSession, job: Job) -> Job:
-    db.add(job)
+# сериализованные страницы GET /jobs для соискателей: (тело, курсор).
+# Любое изменение вакансий меняет версию, TTL ограничивает устаревание
+# страниц, прочитанных с отстающей реплики сразу после изменения
+job_list_cache = VersionedCache(
+    LRUCache(
+        max_size=cache_settings.job_list_cache_size,
+        ttl=cache_settings.job_list_cache_ttl,
+        max_bytes=cache_settings.job_list_cache_bytes,
+        sizeof=lambda page: len(page[0]),
+    )
+)
+
+
+def invalidate_job_list_cache(payload: Optional[str]) -> None:
+    job_list_cache.bump()
+
+
+def __invalidate_job_list() -> None:
+    invalidate_job_list_cache(None)
+    notification_hub.publish(JOB_LIST_CACHE_CHANNEL, "")
+
+
+notification_hub.subscribe(JOB_LIST_CACHE_CHANNEL, invalidate_job_list_cache)
+
+
+def __jobs_changed(job_ids: List[int]) -> None:
+    """
+    Сбрасывает кеш списка и отмечает вакансии для переиндексации
+    в индексах рекомендаций и поиска дубликатов
+    """
+    __invalidate_job_list()
+    mark_jobs_changed(job_ids)
+
+
+# поисковый вектор читается только в WHERE, в ответах он не нужен
+RETURNING_COLUMNS = [
+    column for column in Job.__table__.c if column.key != "search_vector"
+]
+
+IMPORT_TABLE = "jobs_import"
+IMPORT_COLUMNS = [
+    "title",
+    "description",
+    "salary_from",
+    "salary_to",
+    "is_active",
+    "expires_at",
+]
+
+# временная таблица живет до конца соединения, строки - до конца транзакции
+CREATE_IMPORT_TABLE_SQL = text(
+    f"""
+    CREATE TEMP TABLE IF NOT EXISTS {IMPORT_TABLE} (
+        title varchar NOT NULL,
+        description varchar NOT NULL,
+        salary_from numeric,
+        salary_to numeric,
+        is_active boolean,
+        expires_at timestamp
+    ) ON COMMIT DELETE ROWS
+    """
+)
+
+MERGE_IMPORT_SQL = text(
+    f"""
+    WITH batch AS (DELETE FROM {IMPORT_TABLE} RETURNING *)
+    INSERT INTO jobs (
+        user_id, title, description, salary_from, salary_to, is_active, expires_at,
+        created_at
+    )
+    SELECT
+        :user_id, title, description, salary_from, salary_to,
+        coalesce(is_active, true), expires_at, timezone('utc', now())
+    FROM batch
+    RETURNING id
+    """
+)
+
+# пачка переносится одним запросом: внешний ключ откликов на вакансии
+# проверяется в конце запроса, когда удалены и отклики, и сами вакансии
+ARCHIVE_JOBS_SQL = text(
+    """
+    WITH batch AS (
+        SELECT id FROM jobs
+        WHERE NOT is_active AND updated_at < :cutoff
+        ORDER BY updated_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved_responses AS (
+        DELETE FROM responses USING batch
+        WHERE responses.job_id = batch.id
+        RETURNING responses.*
+    ), archived_responses AS (
+        INSERT INTO responses_archive (id, user_id, job_id, message, created_at)
+        SELECT id, user_id, job_id, message, created_at FROM moved_responses
+    ), moved_jobs AS (
+        DELETE FROM jobs USING batch
+        WHERE jobs.id = batch.id
+        RETURNING jobs.*
+    )
+    INSERT INTO jobs_archive (
+        id, user_id, title, description, salary_from, salary_to, is_active,
+        created_at, updated_at, expires_at, deleted_at
+    )
+    SELECT
+        id, user_id, title, description, salary_from, salary_to, is_active,
+        created_at, updated_at, expires_at, deleted_at
+    FROM moved_jobs
+    """
+)
+
+
+async def __execute_returning_and_commit(
+    db: AsyncSession, statement: UpdateBase
+) -> Optional[Job]:
+    query = (
+        select(Job)
+        .from_statement(statement.returning(*RETURNING_COLUMNS))
+        .execution_options(populate_existing=True)
+    )
+    res = await db.execute(query)
+    job = res.scalars().first()
     await db.commit()
-    await db.refresh(job)
+    if job is not None:
+        __jobs_changed([job.id])
     return job
 
 
+async def __execute_returning_many_and_commit(
+    db: AsyncSession, statement: UpdateBase
+) -> List[Job]:
+    query = (
+        select(Job)
+        .from_statement(statement.returning(*RETURNING_COLUMNS))
+        .execution_options(populate_existing=True)
+    )
+    res = await db.execute(query)
+    jobs = res.scalars().all()
+    await db.commit()
+    if jobs:
+        __jobs_changed([job.id for job in jobs])
+    return jobs
+
+
 async def __execute_sql_with_many_results(db: AsyncSession, query: Query) -> List[Job]:
     res = await db.execute(query)
     return res.scalars().all()
@@ -24,64 +190,391 @@ async def __execute_sql_with_one_result(db: AsyncSession, query: Query) -> Job:
 
 
 async def create_job(db: AsyncSession, job_schema: JobInSchema, user_id: int) -> Job:
-    job = Job(
+    values = dict(
         user_id=user_id,
         title=job_schema.title,
         description=job_schema.description,
         salary_from=job_schema.salary_from,
         salary_to=job_schema.salary_to,
-        is_active=job_schema.is_active,
+        expires_at=job_schema.expires_at,
     )
-    return await __save_instance_db(db, job)
+    if job_schema.is_active is not None:
+        values["is_active"] = job_schema.is_active
+    return await __execute_returning_and_commit(db, insert(Job).values(**values))
 
 
-async def update_job(db: AsyncSession, job: Job) -> Job:
-    return await __save_instance_db(db, job)
+async def update_job(
+    db: AsyncSession, job_id: int, user_id: int, values: dict
+) -> Optional[Job]:
+    statement = update(Job).where(Job.id == job_id, owned_by(user_id)).values(**values)
+    return await __execute_returning_and_commit(db, statement)
+
+
+async def create_jobs(
+    db: AsyncSession, job_schemas: List[JobInSchema], user_id: int
+) -> List[Job]:
+    """
+    Создает пакет вакансий одним многострочным INSERT.
+    Вакансии возвращаются в порядке job_schemas
+    """
+    values = [
+        dict(
+            user_id=user_id,
+            title=job_schema.title,
+            description=job_schema.description,
+            salary_from=job_schema.salary_from,
+            salary_to=job_schema.salary_to,
+            expires_at=job_schema.expires_at,
+            # в многострочном INSERT у всех строк одинаковый набор колонок,
+            # поэтому значение по умолчанию колонки подставляется явно
+            is_active=True if job_schema.is_active is None else job_schema.is_active,
+        )
+        for job_schema in job_schemas
+    ]
+    jobs = await __execute_returning_many_and_commit(db, insert(Job).values(values))
+    # идентификаторы выдаются последовательностью в порядке строк VALUES
+    return sorted(jobs, key=lambda job: job.id)
 
 
-async def delete_job(db: AsyncSession, job: Job) -> Job:
-    await db.delete(job)
+async def copy_jobs(
+    db: AsyncSession, job_schemas: List[JobInSchema], user_id: int
+) -> int:
+    """
+    Загружает пакет вакансий через COPY во временную таблицу и переносит
+    их в jobs одним INSERT ... SELECT. Возвращает число добавленных вакансий
+    """
+    # первый запрос открывает транзакцию, в которой затем выполняется COPY
+    await db.execute(CREATE_IMPORT_TABLE_SQL)
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        IMPORT_TABLE,
+        records=[
+            tuple(getattr(job_schema, column) for column in IMPORT_COLUMNS)
+            for job_schema in job_schemas
+        ],
+        columns=IMPORT_COLUMNS,
+    )
+    res = await db.execute(MERGE_IMPORT_SQL, {"user_id": user_id})
+    job_ids = res.scalars().all()
     await db.commit()
-    return job
+    if job_ids:
+        __jobs_changed(job_ids)
+    return len(job_ids)
 
 
-async def get_all_available_jobs_for_user(
-    db: AsyncSession, limit: int = 100, skip: int = 0
+async def update_jobs(
+    db: AsyncSession, job_schemas: List[JobBatchUpdateSchema], user_id: int
+) -> List[Job]:
+    """
+    Обновляет пакет вакансий компании одним UPDATE ... FROM unnest(...).
+    Строки пакета передаются массивами по колонкам, поэтому текст запроса
+    не зависит от размера пакета. Чужие и несуществующие вакансии
+    отсекаются тем же запросом и в результат не попадают
+    """
+    rows = (
+        func.unnest(
+            cast([job.id for job in job_schemas], ARRAY(Integer)),
+            cast([job.title for job in job_schemas], ARRAY(String)),
+            cast([job.description for job in job_schemas], ARRAY(String)),
+            cast([job.salary_from for job in job_schemas], ARRAY(Numeric)),
+            cast([job.salary_to for job in job_schemas], ARRAY(Numeric)),
+            cast([job.is_active for job in job_schemas], ARRAY(Boolean)),
+            cast([job.expires_at for job in job_schemas], ARRAY(DateTime)),
+        )
+        .table_valued(
+            "id",
+            "title",
+            "description",
+            "salary_from",
+            "salary_to",
+            "is_active",
+            "expires_at",
+        )
+        .render_derived(name="batch")
+    )
+    statement = (
+        update(Job)
+        .where(Job.id == rows.c.id, owned_by(user_id))
+        .values(
+            title=func.coalesce(rows.c.title, Job.title),
+            description=func.coalesce(rows.c.description, Job.description),
+            salary_from=rows.c.salary_from,
+            salary_to=rows.c.salary_to,
+            is_active=func.coalesce(rows.c.is_active, Job.is_active),
+            expires_at=func.coalesce(rows.c.expires_at, Job.expires_at),
+        )
+    )
+    return await __execute_returning_many_and_commit(db, statement)
+
+
+async def deactivate_jobs(
+    db: AsyncSession, job_ids: List[int], user_id: int
 ) -> List[Job]:
-    query = select(Job).where(Job.is_active.is_(True)).limit(limit).offset(skip)
+    """
+    Снимает с публикации пакет вакансий компании одним UPDATE
+    """
+    statement = (
+        update(Job)
+        .where(Job.id.in_(job_ids), owned_by(user_id))
+        .values(is_active=False)
+    )
+    return await __execute_returning_many_and_commit(db, statement)
+
+
+async def expire_jobs(db: AsyncSession, batch_size: int) -> int:
+    """
+    Снимает с публикации пачку вакансий с истекшим сроком. Строки,
+    заблокированные другими транзакциями, пропускаются (SKIP LOCKED),
+    чтобы задача не ждала правок компаний и не мешала им.
+    Возвращает число снятых вакансий
+    """
+    expired_ids = (
+        select(Job.id)
+        .where(Job.is_active, Job.expires_at <= datetime.datetime.utcnow())
+        .order_by(Job.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        update(Job)
+        .where(Job.id.in_(expired_ids.scalar_subquery()))
+        .values(is_active=False)
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    )
+    res = await db.execute(statement)
+    job_ids = res.scalars().all()
+    await db.commit()
+    if job_ids:
+        __jobs_changed(job_ids)
+    return len(job_ids)
+
+
+async def archive_jobs(
+    db: AsyncSession, inactive_for: datetime.timedelta, batch_size: int
+) -> int:
+    """
+    Переносит пачку вакансий, неактивных дольше inactive_for, вместе
+    с откликами в jobs_archive и responses_archive. Неактивные вакансии
+    не попадают в кеш списка, поэтому сбрасывать его не нужно.
+    Возвращает число перенесенных вакансий
+    """
+    res = await db.execute(
+        ARCHIVE_JOBS_SQL,
+        {
+            "cutoff": datetime.datetime.utcnow() - inactive_for,
+            "batch_size": batch_size,
+        },
+    )
+    await db.commit()
+    return res.rowcount
+
+
+async def get_archived_jobs_for_company(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+) -> List[JobArchive]:
+    query = paginate(
+        select(JobArchive).where(JobArchive.user_id == user_id),
+        JobArchive,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
     return await __execute_sql_with_many_results(db, query)
 
 
+async def delete_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[Job]:
+    """
+    Мягко удаляет вакансию: она снимается с публикации и больше не видна
+    даже компании, а отклики на нее остаются на месте до переноса в архив
+    """
+    statement = (
+        update(Job)
+        .where(Job.id == job_id, owned_by(user_id))
+        .values(is_active=False, deleted_at=datetime.datetime.utcnow())
+    )
+    return await __execute_returning_and_commit(db, statement)
+
+
+def owned_by(user_id: int):
+    """
+    Вакансия принадлежит компании и не удалена ею
+    """
+    return and_(Job.user_id == user_id, Job.deleted_at.is_(None))
+
+
+def visible_for(user_id: Optional[int] = None):
+    """
+    Соискатели (user_id не задан) видят только активные вакансии, компании -
+    также свои неактивные. Удаленные вакансии неактивны, поэтому для
+    соискателей отдельный фильтр по deleted_at не нужен
+    """
+    if user_id is None:
+        return Job.is_active
+    return or_(Job.is_active, owned_by(user_id))
+
+
+def salary_range(salary_from, salary_to):
+    """
+    Вилка зарплаты как numrange с включенными границами, NULL - без границы
+    """
+    return func.numrange(salary_from, salary_to, literal_column("'[]'"))
+
+
+def __apply_filters(query: Select, filters: Optional[JobFilterSchema]) -> Select:
+    if filters is None:
+        return query
+    if filters.salary_min is not None or filters.salary_max is not None:
+        # выражение совпадает с индексом ix_jobs_salary_range. Пустая граница
+        # вилки - открытая ("от" или "до"), но вакансия совсем без зарплаты
+        # под фильтр по зарплате не попадает
+        query = query.where(
+            salary_range(Job.salary_from, Job.salary_to).op("&&")(
+                salary_range(
+                    cast(filters.salary_min, Numeric),
+                    cast(filters.salary_max, Numeric),
+                )
+            ),
+            or_(Job.salary_from.isnot(None), Job.salary_to.isnot(None)),
+        )
+    if filters.posted_since is not None:
+        query = query.where(Job.created_at >= filters.posted_since)
+    if filters.company_id is not None:
+        query = query.where(Job.user_id == filters.company_id)
+    return query
+
+
+def __load_fields(query: Select, fields: Optional[Collection[str]]) -> Select:
+    """
+    Читает только колонки выбранных полей: без описания строки списка
+    не тянут из TOAST большие тексты. None - все колонки
+    """
+    if fields is None:
+        return query
+    return query.options(load_fields(Job, fields))
+
+
+# фильтр по активности пишется просто как Job.is_active, а не IS TRUE:
+# только так планировщик использует частичный индекс WHERE is_active
+async def get_all_available_jobs_for_user(
+    db: AsyncSession,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+    filters: Optional[JobFilterSchema] = None,
+    fields: Optional[Collection[str]] = None,
+) -> List[Job]:
+    query = paginate(
+        __apply_filters(select(Job).where(Job.is_active), filters),
+        Job,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
+    return await __execute_sql_with_many_results(db, __load_fields(query, fields))
+
+
 async def get_all_available_jobs_for_company(
-    db: AsyncSession, user_id: int, limit: int = 100, skip: int = 0
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+    filters: Optional[JobFilterSchema] = None,
+    fields: Optional[Collection[str]] = None,
 ) -> List[Job]:
+    query = paginate(
+        __apply_filters(select(Job).where(visible_for(user_id)), filters),
+        Job,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
+    return await __execute_sql_with_many_results(db, __load_fields(query, fields))
+
+
+def build_ts_query(search_query: str):
+    return func.websearch_to_tsquery(
+        literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), search_query
+    )
+
+
+async def search_available_jobs(
+    db: AsyncSession,
+    search_query: str,
+    limit: int = 100,
+    cursor: Optional[RankCursor] = None,
+    user_id: Optional[int] = None,
+) -> List[Tuple[Job, float]]:
+    """
+    Ищет вакансии по названию и описанию, от более релевантных к менее.
+    Компании (user_id задан) видят также свои неактивные вакансии
+    """
+    ts_query = build_ts_query(search_query)
+    rank = func.ts_rank(Job.search_vector, ts_query, type_=REAL).label("rank")
     query = (
-        select(Job)
-        .where(or_(Job.is_active.is_(True), Job.user_id == user_id))
+        select(Job, rank)
+        .where(Job.search_vector.op("@@")(ts_query), visible_for(user_id))
+        .order_by(rank.desc(), Job.id.desc())
         .limit(limit)
-        .offset(skip)
     )
-    return await __execute_sql_with_many_results(db, query)
+    if cursor is not None:
+        query = query.where(
+            tuple_(rank, Job.id) < tuple_(cast(cursor[0], REAL), cursor[1])
+        )
+    res = await db.execute(query.execution_options(read_replica=True))
+    return res.all()
 
 
 async def get_available_job_by_id_for_user(
     db: AsyncSession, job_id: int
 ) -> Optional[Job]:
-    query = select(Job).where(Job.id == job_id, Job.is_active.is_(True))
+    query = select(Job).where(Job.id == job_id, Job.is_active)
     return await __execute_sql_with_one_result(db, query)
 
 
+async def get_available_jobs_by_ids(
+    db: AsyncSession, job_ids: List[int], fields: Optional[Collection[str]] = None
+) -> List[Job]:
+    """
+    Активные вакансии в порядке job_ids. Снятые с публикации пропускаются
+    """
+    query = select(Job).where(Job.id.in_(job_ids), Job.is_active)
+    jobs = {
+        job.id: job
+        for job in await __execute_sql_with_many_results(
+            db, __load_fields(query, fields)
+        )
+    }
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+
 async def get_available_job_by_id_for_company(
     db: AsyncSession, job_id: int, user_id: int
 ) -> Optional[Job]:
-    query = select(Job).where(
-        Job.id == job_id, or_(Job.is_active.is_(True), Job.user_id == user_id)
-    )
+    query = select(Job).where(Job.id == job_id, visible_for(user_id))
     return await __execute_sql_with_one_result(db, query)
 
 
+async def get_available_job_updated_at(
+    db: AsyncSession, job_id: int, user_id: Optional[int] = None
+) -> Optional[datetime.datetime]:
+    """
+    Читает только время изменения вакансии для условных запросов.
+    Компании (user_id задан) видят также свои неактивные вакансии
+    """
+    query = select(Job.updated_at).where(Job.id == job_id, visible_for(user_id))
+    res = await db.execute(query)
+    return res.scalar()
+
+
 async def get_available_job_by_id_for_company_to_delete_or_update(
     db: AsyncSession, job_id: int, user_id: int
 ) -> Optional[Job]:
-    query = select(Job).where(Job.id == job_id, Job.user_id == user_id)
+    query = select(Job).where(Job.id == job_id, owned_by(user_id))
     return await __execute_sql_with_one_result(db, query)
@@ -0,0 +1,99 @@
+import asyncio
+import datetime
+import json
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Set
+from models import Job
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import ARRAY, Integer, any_, cast
+from core.notifications import notification_hub
+
+JOB_INDEX_CHANNEL = "job_index"
+
+# payload pg_notify ограничен 8000 байтами
+NOTIFY_IDS_PER_MESSAGE = 500
+
+# updated_at ставится при изменении строки, а видно оно становится только
+# после фиксации транзакции: при досинхронизации по updated_at берется запас
+RESYNC_MARGIN = datetime.timedelta(minutes=5)
+
+BuildIndex = Callable[[AsyncSession], Awaitable[None]]
+ReindexJobs = Callable[[AsyncSession, object, Sequence[int]], Awaitable[None]]
+
+job_index_states: List["JobIndexState"] = []
+
+
+class JobIndexState:
+    """
+    Что нужно сделать с индексом вакансий в памяти перед следующим
+    обращением к нему. Состояние при создании подписывается на изменения
+    вакансий этого и остальных воркеров
+    """
+
+    def __init__(self):
+        self.built = False
+        self.resync = False
+        self.synced_at: Optional[datetime.datetime] = None
+        self.stale_ids: Set[int] = set()
+        self.lock = asyncio.Lock()
+        job_index_states.append(self)
+        notification_hub.subscribe(JOB_INDEX_CHANNEL, self.invalidate)
+
+    def reset(self) -> None:
+        """
+        Следующее обращение к индексу построит его заново
+        """
+        self.built = False
+        self.resync = False
+        self.stale_ids.clear()
+
+    def invalidate(self, payload: Optional[str]) -> None:
+        if payload is None:
+            # уведомления могли потеряться: изменения ищутся по updated_at
+            self.resync = True
+            return
+        self.stale_ids.update(json.loads(payload))
+
+
+def mark_jobs_changed(job_ids: Iterable[int]) -> None:
+    """
+    Отмечает вакансии для переиндексации в этом и остальных воркерах
+    """
+    job_ids = list(job_ids)
+    for state in job_index_states:
+        state.stale_ids.update(job_ids)
+    for start in range(0, len(job_ids), NOTIFY_IDS_PER_MESSAGE):
+        notification_hub.publish(
+            JOB_INDEX_CHANNEL,
+            json.dumps(job_ids[start : start + NOTIFY_IDS_PER_MESSAGE]),
+        )
+
+
+async def sync_job_index(
+    db: AsyncSession, state: JobIndexState, build: BuildIndex, reindex: ReindexJobs
+) -> None:
+    """
+    Приводит индекс в соответствие с базой. Первый вызов строит индекс
+    целиком, следующие переиндексируют только вакансии, изменения которых
+    пришли уведомлениями. reindex получает условие на вакансии и
+    идентификаторы, которые нужно удалить из индекса, если их нет в базе
+    """
+    async with state.lock:
+        if not state.built:
+            # изменения, пришедшие во время сборки, будут применены после нее
+            state.stale_ids.clear()
+            state.resync = False
+            state.synced_at = datetime.datetime.utcnow()
+            await build(db)
+            state.built = True
+            return
+
+        if state.resync:
+            state.resync = False
+            state.stale_ids.clear()
+            synced_at, state.synced_at = state.synced_at, datetime.datetime.utcnow()
+            await reindex(db, Job.updated_at > synced_at - RESYNC_MARGIN, ())
+
+        if state.stale_ids:
+            job_ids = list(state.stale_ids)
+            state.stale_ids.clear()
+            await reindex(db, Job.id == any_(cast(job_ids, ARRAY(Integer))), job_ids)
@@ -0,0 +1,125 @@
+import asyncio
+from typing import List, Optional, Sequence, Set
+import anyio
+from models import Job, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from db_connection import SessionLocal
+from core.tfidf import TfidfIndex
+from queries.job_index import JobIndexState, sync_job_index
+from config import recommendation_settings
+
+# TF-IDF индекс активных вакансий этого воркера
+job_index = TfidfIndex(compact_after=recommendation_settings.compact_after)
+
+job_index_state = JobIndexState()
+
+# фоновые сборки: ссылки на задачи держатся, пока они не завершатся
+build_tasks: Set[asyncio.Task] = set()
+
+
+def job_text(title: str, description: str) -> str:
+    # название повторяется, чтобы его слова весили больше слов описания
+    return f"{title} {title} {description}"
+
+
+# индекс читает основную базу: с отстающей реплики можно прочитать
+# вакансию до изменения, о котором уже пришло уведомление
+async def __build(db: AsyncSession) -> None:
+    chunk_size = recommendation_settings.build_chunk_size
+    result = await db.stream(
+        select(Job.id, Job.title, Job.description)
+        .where(Job.is_active)
+        .execution_options(yield_per=chunk_size)
+    )
+    parts = []
+    async for rows in result.partitions(chunk_size):
+        documents = [(row.id, job_text(row.title, row.description)) for row in rows]
+        parts.append(await anyio.to_thread.run_sync(job_index.count_terms, documents))
+    await anyio.to_thread.run_sync(job_index.build, parts)
+
+
+async def __reindex(db: AsyncSession, condition, job_ids: Sequence[int] = ()) -> None:
+    """
+    Переиндексирует вакансии, подходящие под condition: активные заново
+    добавляются, остальные и не найденные из job_ids удаляются из индекса
+    """
+    res = await db.execute(
+        select(Job.id, Job.title, Job.description, Job.is_active).where(condition)
+    )
+    rows = res.all()
+    active = [
+        (row.id, job_text(row.title, row.description)) for row in rows if row.is_active
+    ]
+    found = {row.id for row in rows}
+    removed = [row.id for row in rows if not row.is_active]
+    removed += [id for id in job_ids if id not in found]
+
+    def apply() -> None:
+        if active:
+            job_index.upsert(*job_index.count_terms(active))
+        if removed:
+            job_index.remove(removed)
+
+    await anyio.to_thread.run_sync(apply)
+
+
+async def refresh_job_index(db: AsyncSession) -> None:
+    """
+    Приводит индекс в соответствие с базой. Тяжелые вычисления идут
+    в отдельном потоке
+    """
+    await sync_job_index(db, job_index_state, __build, __reindex)
+
+
+async def __build_in_background() -> None:
+    async with SessionLocal() as db:
+        await refresh_job_index(db)
+
+
+def __schedule_build() -> None:
+    """
+    Строит индекс в фоне, если его не построил прогрев при старте
+    (отключен или завершился ошибкой): при миллионе вакансий сборка
+    занимает десятки секунд и не должна идти в запросе
+    """
+    if job_index_state.lock.locked() or build_tasks:
+        return
+    task = asyncio.create_task(__build_in_background())
+    build_tasks.add(task)
+    task.add_done_callback(build_tasks.discard)
+
+
+async def get_recommended_job_ids(
+    db: AsyncSession, user_id: int, limit: int
+) -> Optional[List[int]]:
+    """
+    Подбирает активные вакансии, похожие на те, на которые соискатель
+    откликался последними, от более похожих к менее. Вакансии с откликами
+    не предлагаются. Без откликов профиль не построить - возвращает None.
+    Сборки индекса запрос не ждет: пока индекс не построен, тоже
+    возвращает None. Если индекс занят переиндексацией, ищет по его
+    текущему состоянию без последних изменений
+    """
+    state = job_index_state
+    if not state.built:
+        __schedule_build()
+        return None
+    if not state.lock.locked():
+        await refresh_job_index(db)
+
+    res = await db.execute(
+        select(Job.title, Job.description)
+        .join(Response, Response.job_id == Job.id)
+        .where(Response.user_id == user_id)
+        .order_by(Response.created_at.desc())
+        .limit(recommendation_settings.profile_size)
+    )
+    texts = [job_text(row.title, row.description) for row in res.all()]
+    if not texts:
+        return None
+
+    res = await db.execute(select(Response.job_id).where(Response.user_id == user_id))
+    responded = set(res.scalars().all())
+    scored = await anyio.to_thread.run_sync(job_index.similar, texts, limit, responded)
+    return [job_id for job_id, _ in scored]
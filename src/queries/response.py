@@ -1,33 +1,224 @@
-from models import Response, Job
+import anyio
+from models import Response, Job, ResponseArchive, JobArchive
 from schemas import ResponseInSchema
-from typing import List
+from typing import AsyncIterator, Collection, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import String, select, literal
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import joinedload, contains_eager
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from core.pagination import KeysetCursor, paginate
+from core.fields import load_fields
+from queries.job import owned_by
 
 
 async def create_response(
     db: AsyncSession, response_schema: ResponseInSchema, user_id: int
-) -> Response:
-    response = Response(
-        user_id=user_id, job_id=response_schema.job_id, message=response_schema.message
+) -> Optional[Response]:
+    """
+    Создает отклик одним запросом, только если вакансия активна и
+    пользователь еще на нее не откликался. Иначе возвращает None
+    """
+    statement = (
+        pg_insert(Response)
+        .from_select(
+            ["user_id", "job_id", "message"],
+            select(
+                literal(user_id), Job.id, literal(response_schema.message, String)
+            ).where(Job.id == response_schema.job_id, Job.is_active),
+        )
+        .on_conflict_do_nothing(constraint="uq_responses_user_id_job_id")
     )
-    db.add(response)
+    query = select(Response).from_statement(statement.returning(*Response.__table__.c))
+    res = await db.execute(query)
+    response = res.scalars().first()
     await db.commit()
-    await db.refresh(response)
     return response
 
 
+async def create_responses(
+    db: AsyncSession, response_schemas: List[ResponseInSchema], user_id: int
+) -> Tuple[Set[int], List[Response]]:
+    """
+    Создает пакет откликов: одним запросом проверяет, какие вакансии
+    активны, и одним многострочным INSERT добавляет отклики на них.
+    Возвращает идентификаторы активных вакансий и созданные отклики
+    """
+    job_ids = {response_schema.job_id for response_schema in response_schemas}
+    res = await db.execute(select(Job.id).where(Job.id.in_(job_ids), Job.is_active))
+    available_job_ids = set(res.scalars().all())
+
+    values = [
+        {
+            "user_id": user_id,
+            "job_id": response_schema.job_id,
+            "message": response_schema.message,
+        }
+        for response_schema in response_schemas
+        if response_schema.job_id in available_job_ids
+    ]
+    if not values:
+        await db.commit()
+        return available_job_ids, []
+
+    statement = (
+        pg_insert(Response)
+        .values(values)
+        .on_conflict_do_nothing(constraint="uq_responses_user_id_job_id")
+    )
+    query = select(Response).from_statement(statement.returning(*Response.__table__.c))
+    res = await db.execute(query)
+    responses = res.scalars().all()
+    await db.commit()
+    return available_job_ids, responses
+
+
 async def get_responses_by_job_id(
-    db: AsyncSession, job_id: int, user_id: int, limit: int = 100, skip: int = 0
+    db: AsyncSession,
+    job_id: int,
+    user_id: int,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+    fields: Optional[Collection[str]] = None,
+) -> List[Response]:
+    """
+    fields ограничивает читаемые колонки, None - все колонки
+    """
+    query = paginate(
+        select(Response).where(
+            Response.job_id == job_id,
+            Response.job_id.in_(select(Job.id).where(owned_by(user_id))),
+        ),
+        Response,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
+    if fields is not None:
+        query = query.options(load_fields(Response, fields))
+    res = await db.execute(query)
+    return res.scalars().all()
+
+
+async def get_archived_responses_by_job_id(
+    db: AsyncSession,
+    job_id: int,
+    user_id: int,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+) -> List[ResponseArchive]:
+    query = paginate(
+        select(ResponseArchive).where(
+            ResponseArchive.job_id == job_id,
+            ResponseArchive.job_id.in_(
+                select(JobArchive.id).where(JobArchive.user_id == user_id)
+            ),
+        ),
+        ResponseArchive,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
+    res = await db.execute(query)
+    return res.scalars().all()
+
+
+async def get_responses_by_user_id(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
 ) -> List[Response]:
+    """
+    Отклики пользователя вместе с вакансиями одним запросом (JOIN),
+    без отдельной загрузки вакансии на каждый отклик
+    """
+    query = paginate(
+        select(Response)
+        .options(joinedload(Response.job, innerjoin=True))
+        .where(Response.user_id == user_id),
+        Response,
+        limit,
+        skip,
+        cursor,
+    ).execution_options(read_replica=True)
+    res = await db.execute(query)
+    return res.scalars().all()
+
+
+async def get_responses_for_company(
+    db: AsyncSession,
+    user_id: int,
+    job_id: Optional[int] = None,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+    since: Optional[KeysetCursor] = None,
+) -> List[Response]:
+    """
+    Новые отклики на все вакансии компании одним запросом с JOIN.
+    С since - отклики новее него от старых к новым
+    """
     query = (
         select(Response)
+        .join(Response.job)
+        .options(contains_eager(Response.job))
+        .where(owned_by(user_id))
+    )
+    if job_id is not None:
+        query = query.where(Response.job_id == job_id)
+    query = paginate(query, Response, limit, skip, cursor, since)
+    if since is None:
+        # опрос по since читает основную базу: отстающая реплика
+        # отдала бы курсор дальше еще не дошедших до нее откликов
+        query = query.execution_options(read_replica=True)
+    res = await db.execute(query)
+    return res.scalars().all()
+
+
+async def stream_responses_by_job_id(
+    db: AsyncSession, job_id: int, user_id: int, chunk_size: int = 1000
+) -> AsyncIterator[List[Row]]:
+    """
+    Отдает все отклики на вакансию пачками через серверный курсор,
+    не загружая результат в память целиком
+    """
+    query = (
+        select(
+            Response.id,
+            Response.user_id,
+            Response.job_id,
+            Response.message,
+            Response.created_at,
+        )
         .where(
             Response.job_id == job_id,
-            Response.job_id.in_(select(Job.id).where(Job.user_id == user_id)),
+            Response.job_id.in_(select(Job.id).where(owned_by(user_id))),
         )
-        .limit(limit)
-        .offset(skip)
+        .order_by(Response.created_at.desc(), Response.id.desc())
+        .execution_options(yield_per=chunk_size, read_replica=True)
     )
-    res = await db.execute(query)
-    return res.scalars().all()
+    # соединение берется для самого запроса: сессия отправит его на реплику,
+    # и при обрыве закрыть нужно именно то соединение, где открыт курсор
+    connection = await db.connection(bind_arguments={"clause": query})
+    result = await connection.stream(query)
+    try:
+        while True:
+            try:
+                rows = await result.fetchmany(chunk_size)
+            except BaseException:
+                # выборка прервана на полпути, например отменой при разрыве
+                # соединения клиентом. Такое соединение нельзя вернуть в пул,
+                # оно закрывается, а сервер при этом прерывает запрос
+                with anyio.CancelScope(shield=True):
+                    await connection.invalidate()
+                raise
+            if not rows:
+                break
+            yield rows
+    finally:
+        with anyio.CancelScope(shield=True):
+            await result.close()
@@ -1,46 +1,168 @@
+import json
 from models import User
 from schemas import UserInSchema
-from typing import List, Optional
+from typing import Collection, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from core.security import hash_password
+from sqlalchemy import select, insert, update, exists, and_, or_, case
+from sqlalchemy.orm import aliased, make_transient_to_detached
+from sqlalchemy.sql.dml import UpdateBase
+from config import cache_settings
+from core.cache import LRUCache
+from core.pagination import KeysetCursor, paginate
+from core.fields import load_fields
+from core.notifications import notification_hub
+from core.security import hash_password_async
 
+USER_CACHE_CHANNEL = "user_cache"
 
-async def __save_instance_db(db: AsyncSession, user: User) -> User:
-    db.add(user)
+# строки пользователей хранятся по id, а email только указывает на id,
+# поэтому для инвалидации достаточно id, даже если email успел смениться
+user_cache = LRUCache(
+    max_size=cache_settings.user_cache_size, ttl=cache_settings.user_cache_ttl
+)
+user_email_index = LRUCache(
+    max_size=cache_settings.user_cache_size, ttl=cache_settings.user_cache_ttl
+)
+
+# номер последней инвалидации: его запоминают до чтения строки из базы,
+# и строка, прочитанная до инвалидации, но записываемая после нее,
+# в кеш не попадет (как в VersionedCache)
+user_cache_epoch = 0
+
+
+def __cache_user(user: Optional[User], epoch: int) -> None:
+    if user is None or epoch != user_cache_epoch:
+        return
+    user_cache.set(
+        user.id, {column.key: getattr(user, column.key) for column in User.__table__.c}
+    )
+    user_email_index.set(user.email, user.id)
+
+
+async def __get_cached_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    values = user_cache.get(user_id)
+    if values is None:
+        return None
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_user_cache(payload: Optional[str]) -> None:
+    global user_cache_epoch
+    user_cache_epoch += 1
+    if payload is None:
+        user_cache.clear()
+        user_email_index.clear()
+        return
+    user_cache.delete(json.loads(payload)["id"])
+
+
+def __invalidate_user(user_id: int) -> None:
+    payload = json.dumps({"id": user_id})
+    invalidate_user_cache(payload)
+    notification_hub.publish(USER_CACHE_CHANNEL, payload)
+
+
+notification_hub.subscribe(USER_CACHE_CHANNEL, invalidate_user_cache)
+
+
+async def __execute_returning_and_commit(
+    db: AsyncSession, statement: UpdateBase
+) -> Optional[User]:
+    query = (
+        select(User)
+        .from_statement(statement.returning(*User.__table__.c))
+        .execution_options(populate_existing=True)
+    )
+    res = await db.execute(query)
+    user = res.scalars().first()
     await db.commit()
-    await db.refresh(user)
+    if user is not None:
+        __invalidate_user(user.id)
     return user
 
 
-async def get_all(db: AsyncSession, limit: int = 100, skip: int = 0) -> List[User]:
-    query = select(User).limit(limit).offset(skip)
+async def get_all(
+    db: AsyncSession,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[KeysetCursor] = None,
+    fields: Optional[Collection[str]] = None,
+) -> List[User]:
+    """
+    fields ограничивает читаемые колонки, None - все колонки
+    """
+    query = paginate(select(User), User, limit, skip, cursor).execution_options(
+        read_replica=True
+    )
+    if fields is not None:
+        query = query.options(load_fields(User, fields))
     res = await db.execute(query)
     return res.scalars().all()
 
 
 async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    user = await __get_cached_user(db, user_id)
+    if user is not None:
+        return user
+
+    epoch = user_cache_epoch
     query = select(User).where(User.id == user_id)
     res = await db.execute(query)
-    return res.scalars().first()
+    user = res.scalars().first()
+    __cache_user(user, epoch)
+    return user
 
 
 async def create_user(db: AsyncSession, user_schema: UserInSchema) -> User:
-    user = User(
+    statement = insert(User).values(
         name=user_schema.name,
         email=user_schema.email,
-        hashed_password=hash_password(user_schema.password),
+        hashed_password=await hash_password_async(user_schema.password),
         is_company=user_schema.is_company,
     )
-    return await __save_instance_db(db, user)
+    return await __execute_returning_and_commit(db, statement)
 
 
-async def update_user(db: AsyncSession, user: User) -> User:
-    return await __save_instance_db(db, user)
+async def update_user(db: AsyncSession, user_id: int, values: dict) -> Optional[User]:
+    """
+    Обновляет пользователя одним запросом.
+    Если email занят другим пользователем, строка не обновляется
+    и возвращается None. Смена роли или email увеличивает token_version,
+    и выданные раньше токены перестают действовать
+    """
+    changes = [
+        getattr(User, key) != values[key]
+        for key in ("is_company", "email")
+        if key in values
+    ]
+    if changes:
+        values = {
+            **values,
+            "token_version": User.token_version + case((or_(*changes), 1), else_=0),
+        }
+    statement = update(User).where(User.id == user_id).values(**values)
+    if "email" in values:
+        other_user = aliased(User)
+        statement = statement.where(
+            ~exists().where(
+                and_(other_user.email == values["email"], other_user.id != user_id)
+            )
+        )
+    return await __execute_returning_and_commit(db, statement)
 
 
 async def get_by_email(db: AsyncSession, email: str) -> User:
+    user_id = user_email_index.get(email)
+    if user_id is not None:
+        user = await __get_cached_user(db, user_id)
+        if user is not None and user.email == email:
+            return user
+
+    epoch = user_cache_epoch
     query = select(User).where(User.email == email)
     res = await db.execute(query)
     user = res.scalars().first()
+    __cache_user(user, epoch)
     return user
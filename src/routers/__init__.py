@@ -2,3 +2,5 @@ from .auth import router as auth_router
 from .user import router as user_router
 from .job import router as job_router
 from .response import router as response_router
+from .metrics import router as metrics_router
+from .admin import router as admin_router
@@ -0,0 +1,28 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas import JobDuplicateClusterSchema
+from dependencies import get_db, access_verification_for_admin
+from controllers import job as job_controller
+from config import duplicate_settings
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(access_verification_for_admin)],
+)
+
+
+@router.get("/jobs/duplicates", response_model=List[JobDuplicateClusterSchema])
+async def get_duplicate_jobs(
+    company_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=duplicate_settings.max_clusters),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получает группы почти одинаковых активных вакансий компаний,
+    от больших групп к меньшим
+    """
+    return await job_controller.get_duplicate_clusters(
+        company_id=company_id, limit=limit, db=db
+    )
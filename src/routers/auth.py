@@ -17,10 +17,12 @@ async def login(login: LoginSchema = Body(...), db: AsyncSession = Depends(get_d
 
 
 @router.post("/refresh_token", response_model=TokensOutSchema)
-async def get_new_tokens(refresh_token: str = Query(...)):
+async def get_new_tokens(
+    refresh_token: str = Query(...), db: AsyncSession = Depends(get_db)
+):
     """
     Генерирует новую пару access и refresh токенов
     """
     return await auth_controller.get_new_tokens_by_refresh_token(
-        refresh_token=refresh_token
+        refresh_token=refresh_token, db=db
     )
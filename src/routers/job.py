@@ -1,41 +1,186 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, Body
-from schemas import JobSchema, JobInSchema, JobUpdateSchema
-from dependencies import get_db, get_current_user, access_verification_for_company
+from typing import FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, Query, Body, Request, Response
+from schemas import (
+    JobSchema,
+    JobInSchema,
+    JobUpdateSchema,
+    JobFilterSchema,
+    JobBatchUpdateSchema,
+    JobBatchItemSchema,
+    JobImportReportSchema,
+    JobArchiveSchema,
+)
+from dependencies import (
+    get_db,
+    get_current_user,
+    get_job_filters,
+    get_job_fields,
+    access_verification_for_company,
+    access_verification_for_user,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from models import User
+from core.principal import CurrentUser
 from controllers import job as job_controller
+from core.pagination import NEXT_CURSOR_HEADER, set_next_cursor
+from core.fields import partial_response
+from core.conditional import (
+    compute_etag,
+    is_conditional,
+    is_not_modified,
+    not_modified,
+    rows_etag,
+    set_validators,
+)
+from config import batch_settings, recommendation_settings
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+DUPLICATE_OF_HEADER = "X-Duplicate-Of"
+
 
 @router.get("", response_model=List[JobSchema])
 async def get_jobs(
+    request: Request,
+    response: Response,
     limit: int = Query(default=100),
     skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    filters: JobFilterSchema = Depends(get_job_filters),
+    fields: FrozenSet[str] = Depends(get_job_fields),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Получает вакансии по заданным лимитам
+    Получает вакансии по заданным лимитам и фильтрам, от новых к старым.
+    Описание отдается, только если оно запрошено в параметре fields.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Поддерживает If-None-Match: неизменившаяся страница отдается как 304
     """
-    return await job_controller.get_jobs_for_user_or_company(
-        limit=limit, skip=skip, db=db, current_user=current_user
+    if not current_user.is_company:
+        body, next_cursor, etag = await job_controller.get_jobs_page_for_user(
+            limit=limit, skip=skip, cursor=cursor, filters=filters, db=db, fields=fields
+        )
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        page = Response(content=body, media_type="application/json")
+        set_validators(page, etag)
+        if next_cursor:
+            page.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return page
+
+    jobs = await job_controller.get_jobs_for_user_or_company(
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        filters=filters,
+        db=db,
+        current_user=current_user,
+        fields=fields,
     )
+    etag = rows_etag(jobs, fields)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    page = partial_response(JobSchema, fields, jobs)
+    set_validators(page, etag)
+    set_next_cursor(page, jobs, limit)
+    return page
+
+
+@router.get("/search", response_model=List[JobSchema])
+async def search_jobs(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(default=100),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Ищет вакансии по названию и описанию, от более релевантных к менее.
+    Поддерживает синтаксис веб-поиска: "точная фраза", or, -исключение.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+    jobs, next_cursor = await job_controller.search_jobs_for_user_or_company(
+        search_query=q, limit=limit, cursor=cursor, db=db, current_user=current_user
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return jobs
+
+
+@router.get(
+    "/recommended",
+    response_model=List[JobSchema],
+    dependencies=[Depends(access_verification_for_user)],
+)
+async def get_recommended_jobs(
+    limit: int = Query(default=20, ge=1, le=recommendation_settings.max_limit),
+    fields: FrozenSet[str] = Depends(get_job_fields),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Подбирает соискателю вакансии, похожие по названию и описанию на те,
+    на которые он откликался, от более подходящих к менее. Вакансии,
+    на которые отклик уже есть, не предлагаются. Пока откликов нет
+    или индекс вакансий не построен, отдаются самые новые вакансии
+    """
+    jobs = await job_controller.get_recommended_jobs_for_user(
+        limit=limit, db=db, current_user=current_user, fields=fields
+    )
+    return partial_response(JobSchema, fields, jobs)
+
+
+@router.get(
+    "/archive",
+    response_model=List[JobArchiveSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def get_archived_jobs(
+    response: Response,
+    limit: int = Query(default=100),
+    skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Получает вакансии компании, перенесенные в архив, от новых к старым.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+    jobs = await job_controller.get_archived_jobs_for_company(
+        limit=limit, skip=skip, cursor=cursor, db=db, current_user=current_user
+    )
+    set_next_cursor(response, jobs, limit)
+    return jobs
 
 
 @router.get("/by_id", response_model=JobSchema)
 async def get_job_by_id(
+    request: Request,
+    response: Response,
     job_id: int = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Получает вакансию по ее идентификатору
+    Получает вакансию по ее идентификатору.
+    Поддерживает If-None-Match и If-Modified-Since: для проверки
+    читается только время изменения вакансии, а не вся строка
     """
-    return await job_controller.get_job_by_id_for_user_or_company(
+    if is_conditional(request):
+        updated_at = await job_controller.get_job_updated_at_for_user_or_company(
+            job_id=job_id, db=db, current_user=current_user
+        )
+        etag = compute_etag([(job_id, updated_at)])
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
+
+    job = await job_controller.get_job_by_id_for_user_or_company(
         job_id=job_id, db=db, current_user=current_user
     )
+    set_validators(response, rows_etag([job]), job.updated_at)
+    return job
 
 
 @router.post(
@@ -44,14 +189,109 @@ async def get_job_by_id(
     dependencies=[Depends(access_verification_for_company)],
 )
 async def create_job(
+    response: Response,
     job: JobInSchema = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Создает вакансию
+    Создает вакансию. Почти такие же активные вакансии компании
+    перечисляются через запятую в заголовке X-Duplicate-Of, а если
+    дубликаты запрещены настройками, вакансия не создается и
+    возвращается 409
     """
-    return await job_controller.create_job(job=job, db=db, current_user=current_user)
+    job, duplicate_ids = await job_controller.create_job(
+        job=job, db=db, current_user=current_user
+    )
+    if duplicate_ids:
+        response.headers[DUPLICATE_OF_HEADER] = ",".join(map(str, duplicate_ids))
+    return job
+
+
+@router.post(
+    "/batch",
+    response_model=List[JobBatchItemSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def create_jobs(
+    jobs: List[JobInSchema] = Body(
+        ..., min_items=1, max_items=batch_settings.max_batch_size
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Создает несколько вакансий в одной транзакции.
+    Результаты возвращаются в порядке вакансий в запросе
+    """
+    return await job_controller.create_jobs(jobs=jobs, db=db, current_user=current_user)
+
+
+@router.put(
+    "/batch",
+    response_model=List[JobBatchItemSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def update_jobs(
+    jobs: List[JobBatchUpdateSchema] = Body(
+        ..., min_items=1, max_items=batch_settings.max_batch_size
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Обновляет несколько вакансий в одной транзакции.
+    Для каждой вакансии возвращает результат: updated или not_found
+    """
+    return await job_controller.update_available_jobs(
+        jobs=jobs, db=db, current_user=current_user
+    )
+
+
+@router.post(
+    "/batch/deactivate",
+    response_model=List[JobBatchItemSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def deactivate_jobs(
+    job_ids: List[int] = Body(
+        ..., min_items=1, max_items=batch_settings.max_batch_size
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Снимает с публикации несколько вакансий в одной транзакции.
+    Для каждой вакансии возвращает результат: deactivated или not_found
+    """
+    return await job_controller.deactivate_available_jobs(
+        job_ids=job_ids, db=db, current_user=current_user
+    )
+
+
+@router.post(
+    "/import",
+    response_model=JobImportReportSchema,
+    dependencies=[Depends(access_verification_for_company)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_jobs(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Импортирует вакансии из CSV в теле запроса. Файл разбирается потоком,
+    некорректные строки пропускаются и перечисляются в отчете
+    """
+    return await job_controller.import_jobs(
+        chunks=request.stream(), db=db, current_user=current_user
+    )
 
 
 @router.put(
@@ -63,7 +303,7 @@ async def update_job(
     job_id: int = Query(...),
     job: JobUpdateSchema = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Обновляет данные о вакансии
@@ -81,10 +321,11 @@ async def update_job(
 async def delete_job(
     job_id: int = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Удаляет вакансию
+    Удаляет вакансию. Удаление мягкое: вакансия снимается с публикации,
+    а вместе с откликами переносится в архив фоновой задачей
     """
     return await job_controller.delete_available_job(
         job_id=job_id, db=db, current_user=current_user
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from core.notifications import notification_hub
+from dependencies import access_verification_for_admin
+from core.security import password_hashing_pool, verified_token_cache
+from db_connection import get_pool_stats, replica_router
+from queries.user import user_cache, user_email_index
+from queries.job import job_list_cache
+from queries.recommendation import job_index
+from queries.duplicate import duplicate_index
+from tasks import scheduler
+
+# метрики раскрывают состояние пулов, реплики и планировщика: только администраторам
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(access_verification_for_admin)],
+)
+
+
+@router.get("")
+async def get_metrics():
+    """
+    Получает внутренние метрики сервиса. Доступно только администраторам
+    """
+    return {
+        "database_pool": get_pool_stats(),
+        "replica": replica_router.stats(),
+        "password_hashing": password_hashing_pool.stats(),
+        "verified_tokens": verified_token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "user_email_index": user_email_index.stats(),
+        "job_list_cache": job_list_cache.stats(),
+        "job_index": job_index.stats(),
+        "duplicate_index": duplicate_index.stats(),
+        "notifications": notification_hub.stats(),
+        "scheduler": scheduler.stats(),
+    }
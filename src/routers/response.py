@@ -1,15 +1,26 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, Body
-from schemas import ResponseSchema, ResponseInSchema
+from typing import FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, Query, Body, Response
+from fastapi.responses import StreamingResponse
+from schemas import (
+    ResponseSchema,
+    ResponseInSchema,
+    ResponseBatchItemSchema,
+    ResponseWithJobSchema,
+    ResponseArchiveSchema,
+)
 from dependencies import (
     get_db,
     get_current_user,
+    get_response_fields,
     access_verification_for_company,
     access_verification_for_user,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from models import User
+from core.principal import CurrentUser
 from controllers import response as response_controller
+from core.pagination import set_next_cursor, set_since_cursor
+from core.fields import partial_response
+from config import batch_settings
 
 router = APIRouter(prefix="/responses", tags=["responses"])
 
@@ -23,14 +34,149 @@ async def get_responses_by_job_id(
     job_id: int = Query(...),
     limit: int = Query(default=100),
     skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    fields: FrozenSet[str] = Depends(get_response_fields),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Получает все отклики на вакансию по ее идентификатору, от новых к старым.
+    Сопроводительное письмо отдается, только если оно запрошено в параметре
+    fields. Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+    responses = await response_controller.get_responses_by_job_id(
+        job_id=job_id,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        db=db,
+        current_user=current_user,
+        fields=fields,
+    )
+    page = partial_response(ResponseSchema, fields, responses)
+    set_next_cursor(page, responses, limit)
+    return page
+
+
+@router.get(
+    "/archive",
+    response_model=List[ResponseArchiveSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def get_archived_responses_by_job_id(
+    response: Response,
+    job_id: int = Query(...),
+    limit: int = Query(default=100),
+    skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Получает отклики на вакансию из архива, от новых к старым.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+    responses = await response_controller.get_archived_responses_by_job_id(
+        job_id=job_id,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        db=db,
+        current_user=current_user,
+    )
+    set_next_cursor(response, responses, limit)
+    return responses
+
+
+@router.get(
+    "/company",
+    response_model=List[ResponseWithJobSchema],
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def get_company_responses(
+    response: Response,
+    job_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=100),
+    skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    since: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Получает отклики на все вакансии компании, от новых к старым.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor,
+    курсор для следующего опроса (параметр since) - в заголовке X-Since-Cursor.
+    Опрос по since отдает отклики от старых к новым, отклики последней
+    минуты могут прийти повторно
+    """
+    responses = await response_controller.get_responses_for_company(
+        job_id=job_id,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        since=since,
+        db=db,
+        current_user=current_user,
+    )
+    if since is None:
+        set_next_cursor(response, responses, limit)
+    set_since_cursor(response, responses, limit, since, cursor)
+    return responses
+
+
+@router.get(
+    "/mine",
+    response_model=List[ResponseWithJobSchema],
+    dependencies=[Depends(access_verification_for_user)],
+)
+async def get_my_responses(
+    response: Response,
+    limit: int = Query(default=100),
+    skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Получает все отклики на вакансию по ее идентификатору
+    Получает отклики текущего соискателя вместе с вакансиями, от новых к старым.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
     """
-    return await response_controller.get_responses_by_job_id(
-        job_id=job_id, limit=limit, skip=skip, db=db, current_user=current_user
+    responses = await response_controller.get_responses_for_user(
+        limit=limit, skip=skip, cursor=cursor, db=db, current_user=current_user
+    )
+    set_next_cursor(response, responses, limit)
+    return responses
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(access_verification_for_company)],
+)
+async def export_responses_by_job_id(
+    job_id: int = Query(...),
+    format: str = Query(default="ndjson", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Выгружает все отклики на вакансию потоком в формате NDJSON или CSV.
+    Строки читаются серверным курсором, память не растет с размером выгрузки;
+    при разрыве соединения клиентом запрос к базе прерывается
+    """
+    content = await response_controller.export_responses_by_job_id(
+        job_id=job_id, export_format=format, db=db, current_user=current_user
+    )
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="responses_{job_id}.{format}"'
+        },
     )
 
 
@@ -42,7 +188,7 @@ async def get_responses_by_job_id(
 async def create_response(
     job: ResponseInSchema = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Создает отклик на вакансию
@@ -50,3 +196,24 @@ async def create_response(
     return await response_controller.create_response(
         job=job, db=db, current_user=current_user
     )
+
+
+@router.post(
+    "/batch",
+    response_model=List[ResponseBatchItemSchema],
+    dependencies=[Depends(access_verification_for_user)],
+)
+async def create_responses(
+    jobs: List[ResponseInSchema] = Body(
+        ..., min_items=1, max_items=batch_settings.max_batch_size
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Создает отклики сразу на несколько вакансий.
+    Для каждой вакансии возвращает результат: created, duplicate или not_found
+    """
+    return await response_controller.create_responses(
+        jobs=jobs, db=db, current_user=current_user
+    )
@@ -1,25 +1,66 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, Body
+from typing import FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, Query, Body, Request, Response
 from schemas import UserSchema, UserInSchema, UserUpdateSchema
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, get_user_fields
 from sqlalchemy.ext.asyncio import AsyncSession
 from queries import user as user_queries
-from models import User
+from core.principal import CurrentUser
 from controllers import user as user_controller
+from core.pagination import decode_keyset_cursor, set_next_cursor
+from core.conditional import is_not_modified, not_modified, rows_etag, set_validators
+from core.fields import partial_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("", response_model=List[UserSchema])
 async def get_users(
+    request: Request,
     limit: int = Query(default=100),
     skip: int = Query(default=0),
+    cursor: Optional[str] = Query(default=None),
+    fields: FrozenSet[str] = Depends(get_user_fields),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Получает всех пользователей
+    Получает всех пользователей, от новых к старым. Параметр fields
+    ограничивает поля в ответе.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Поддерживает If-None-Match: неизменившаяся страница отдается как 304
     """
-    return await user_queries.get_all(db=db, limit=limit, skip=skip)
+    users = await user_queries.get_all(
+        db=db,
+        limit=limit,
+        skip=skip,
+        cursor=decode_keyset_cursor(cursor),
+        fields=fields,
+    )
+    etag = rows_etag(users, fields)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    page = partial_response(UserSchema, fields, users)
+    set_validators(page, etag)
+    set_next_cursor(page, users, limit)
+    return page
+
+
+@router.get("/by_id", response_model=UserSchema)
+async def get_user_by_id(
+    request: Request,
+    response: Response,
+    user_id: int = Query(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получает пользователя по его идентификатору.
+    Поддерживает If-None-Match и If-Modified-Since
+    """
+    user = await user_controller.get_user_by_id(user_id=user_id, db=db)
+    etag = rows_etag([user])
+    if is_not_modified(request, etag, user.updated_at):
+        return not_modified(etag, user.updated_at)
+    set_validators(response, etag, user.updated_at)
+    return user
 
 
 @router.post("", response_model=UserSchema)
@@ -37,7 +78,7 @@ async def update_user(
     user_id: int = Query(...),
     user: UserUpdateSchema = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Обновляет пользователя
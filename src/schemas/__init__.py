@@ -1,4 +1,24 @@
 from .user import UserInSchema, UserSchema, UserUpdateSchema
 from .auth import LoginSchema, AccessTokenSchema, TokensOutSchema
-from .job import JobInSchema, JobSchema, JobUpdateSchema
-from .response import ResponseSchema, ResponseInSchema
+from .job import (
+    JobInSchema,
+    JobSchema,
+    JobUpdateSchema,
+    JobFilterSchema,
+    JobSummarySchema,
+    JobBatchUpdateSchema,
+    JobBatchStatus,
+    JobBatchItemSchema,
+    JobImportErrorSchema,
+    JobImportReportSchema,
+    JobArchiveSchema,
+    JobDuplicateClusterSchema,
+)
+from .response import (
+    ResponseSchema,
+    ResponseInSchema,
+    ResponseWithJobSchema,
+    ResponseBatchStatus,
+    ResponseBatchItemSchema,
+    ResponseArchiveSchema,
+)
@@ -1,5 +1,6 @@
 import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 from pydantic import BaseModel, validator, Field
 
 
@@ -16,6 +17,8 @@ class JobSchema(BaseModel):
     salary_to: Optional[float] = Field(default=None)
     is_active: bool = Field(...)
     created_at: datetime.datetime = Field(...)
+    updated_at: datetime.datetime = Field(...)
+    expires_at: Optional[datetime.datetime] = Field(default=None)
 
     class Config:
         orm_mode = True
@@ -30,10 +33,37 @@ class JobSchema(BaseModel):
                 "salary_to": 100000,
                 "is_active": True,
                 "created_at": "2024-01-17T16:43:25.814Z",
+                "updated_at": "2024-01-18T09:12:40.102Z",
+                "expires_at": "2024-02-17T00:00:00Z",
             }
         }
 
 
+class JobArchiveSchema(JobSchema):
+    """
+    Класс схемы на вывод job из архива
+    """
+
+    deleted_at: Optional[datetime.datetime] = Field(default=None)
+    archived_at: datetime.datetime = Field(...)
+
+
+class JobSummarySchema(BaseModel):
+    """
+    Класс схемы на вывод краткой информации о job
+    """
+
+    id: int = Field(...)
+    user_id: int = Field(...)
+    title: str = Field(...)
+    salary_from: Optional[float] = Field(default=None)
+    salary_to: Optional[float] = Field(default=None)
+    is_active: bool = Field(...)
+
+    class Config:
+        orm_mode = True
+
+
 class SalaryValidator(BaseModel):
     """
     Класс для валидации диапазона зарплаты
@@ -44,11 +74,27 @@ class SalaryValidator(BaseModel):
 
     @validator("salary_to")
     def salary_comparison(cls, v, values, **kwargs):
-        if values["salary_from"] > v:
+        salary_from = values.get("salary_from")
+        if salary_from is not None and v is not None and salary_from > v:
             raise ValueError("salary_from, должна быть меньше salary_to!")
         return v
 
 
+class ExpiryValidator(BaseModel):
+    """
+    Класс для приведения срока публикации к UTC без часового пояса,
+    в котором даты хранятся в БД
+    """
+
+    expires_at: Optional[datetime.datetime] = Field(default=None)
+
+    @validator("expires_at")
+    def expires_at_to_utc(cls, v, **kwargs):
+        if v is not None and v.tzinfo is not None:
+            v = v.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return v
+
+
 class InSchemaExampleConfig(BaseModel):
     """
     Класс для имплементации показательной схемы
@@ -63,11 +109,12 @@ class InSchemaExampleConfig(BaseModel):
                 "salary_to": 220000,
                 "is_active": True,
                 "created_at": "2024-01-17T17:28:15.814Z",
+                "expires_at": "2024-02-17T00:00:00Z",
             }
         }
 
 
-class JobUpdateSchema(SalaryValidator, InSchemaExampleConfig):
+class JobUpdateSchema(SalaryValidator, ExpiryValidator, InSchemaExampleConfig):
     """
     Класс схемы на обновление job
     """
@@ -77,7 +124,15 @@ class JobUpdateSchema(SalaryValidator, InSchemaExampleConfig):
     is_active: Optional[bool] = Field(default=None)
 
 
-class JobInSchema(SalaryValidator, InSchemaExampleConfig):
+class JobBatchUpdateSchema(JobUpdateSchema):
+    """
+    Класс схемы на обновление job в пакете
+    """
+
+    id: int = Field(...)
+
+
+class JobInSchema(SalaryValidator, ExpiryValidator, InSchemaExampleConfig):
     """
     Класс схемы на прием данных для создания job
     """
@@ -85,3 +140,87 @@ class JobInSchema(SalaryValidator, InSchemaExampleConfig):
     title: str = Field(...)
     description: str = Field(...)
     is_active: Optional[bool] = Field(default=None)
+
+
+class JobFilterSchema(BaseModel):
+    """
+    Класс схемы фильтров списка вакансий
+    """
+
+    salary_min: Optional[float] = Field(default=None, ge=0)
+    salary_max: Optional[float] = Field(default=None, ge=0)
+    posted_since: Optional[datetime.datetime] = Field(default=None)
+    company_id: Optional[int] = Field(default=None)
+
+
+class JobBatchStatus(str, Enum):
+    """
+    Результат обработки вакансии в пакете
+    """
+
+    created = "created"
+    updated = "updated"
+    deactivated = "deactivated"
+    not_found = "not_found"
+
+
+class JobBatchItemSchema(BaseModel):
+    """
+    Класс схемы на вывод результата по одной вакансии из пакета
+    """
+
+    job_id: int = Field(...)
+    status: JobBatchStatus = Field(...)
+    job: Optional[JobSchema] = Field(default=None)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "job_id": 7,
+                "status": "not_found",
+                "job": None,
+            }
+        }
+
+
+class JobImportErrorSchema(BaseModel):
+    """
+    Класс схемы на вывод отклоненной строки импорта
+    """
+
+    row: int = Field(...)
+    message: str = Field(...)
+
+
+class JobImportReportSchema(BaseModel):
+    """
+    Класс схемы на вывод результата импорта вакансий из CSV
+    """
+
+    imported: int = Field(default=0)
+    rejected: int = Field(default=0)
+    errors: List[JobImportErrorSchema] = Field(default=[])
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "imported": 9998,
+                "rejected": 2,
+                "errors": [
+                    {"row": 17, "message": "title: field required"},
+                    {
+                        "row": 4021,
+                        "message": "salary_to: salary_from, должна быть меньше salary_to!",
+                    },
+                ],
+            }
+        }
+
+
+class JobDuplicateClusterSchema(BaseModel):
+    """
+    Класс схемы на вывод группы почти одинаковых вакансий компании
+    """
+
+    user_id: int = Field(...)
+    job_ids: List[int] = Field(...)
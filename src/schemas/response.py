@@ -1,5 +1,8 @@
+import datetime
+from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, Field
+from .job import JobSummarySchema
 
 
 class ResponseSchema(BaseModel):
@@ -11,6 +14,7 @@ class ResponseSchema(BaseModel):
     user_id: int = Field(...)
     job_id: int = Field(...)
     message: Optional[str] = Field(defaut=None)
+    created_at: datetime.datetime = Field(...)
 
     class Config:
         orm_mode = True
@@ -21,10 +25,46 @@ class ResponseSchema(BaseModel):
                 "user_id": 36,
                 "job_id": 9,
                 "message": "Хочу тут работать",
+                "created_at": "2024-01-17T16:43:25.814Z",
             }
         }
 
 
+class ResponseWithJobSchema(ResponseSchema):
+    """
+    Класс схемы на вывод отклика вместе с краткой информацией о вакансии
+    """
+
+    job: JobSummarySchema = Field(...)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "id": 4,
+                "user_id": 36,
+                "job_id": 9,
+                "message": "Хочу тут работать",
+                "created_at": "2024-01-17T16:43:25.814Z",
+                "job": {
+                    "id": 9,
+                    "user_id": 15,
+                    "title": "Python Developer",
+                    "salary_from": 75000,
+                    "salary_to": 100000,
+                    "is_active": True,
+                },
+            }
+        }
+
+
+class ResponseArchiveSchema(ResponseSchema):
+    """
+    Класс схемы на вывод отклика из архива
+    """
+
+    archived_at: datetime.datetime = Field(...)
+
+
 class ResponseInSchema(BaseModel):
     """
     Класс схемы на прием данных для создания job
@@ -40,3 +80,32 @@ class ResponseInSchema(BaseModel):
                 "message": "Хочу тут работать",
             }
         }
+
+
+class ResponseBatchStatus(str, Enum):
+    """
+    Результат создания отклика в пакете
+    """
+
+    created = "created"
+    duplicate = "duplicate"
+    not_found = "not_found"
+
+
+class ResponseBatchItemSchema(BaseModel):
+    """
+    Класс схемы на вывод результата по одному отклику из пакета
+    """
+
+    job_id: int = Field(...)
+    status: ResponseBatchStatus = Field(...)
+    response: Optional[ResponseSchema] = Field(default=None)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "job_id": 9,
+                "status": "duplicate",
+                "response": None,
+            }
+        }
@@ -9,6 +9,7 @@ class UserSchema(BaseModel):
     email: EmailStr = Field(...)
     is_company: bool = Field(...)
     created_at: datetime.datetime = Field(...)
+    updated_at: datetime.datetime = Field(...)
 
     class Config:
         orm_mode = True
@@ -20,6 +21,7 @@ class UserSchema(BaseModel):
                 "email": "petrov@mail.ru",
                 "is_company": False,
                 "created_at": "2024-01-17T17:26:15.814Z",
+                "updated_at": "2024-01-17T17:26:15.814Z",
             }
         }
 
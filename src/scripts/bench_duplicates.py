@@ -0,0 +1,141 @@
+"""
+Бенчмарк MinHash/LSH индекса дубликатов вакансий (POST /jobs,
+GET /admin/jobs/duplicates).
+
+Индекс строится из первых N активных вакансий базы так же, как при
+старте сервиса: пачками через серверный курсор. Замеряются время сборки,
+память на вакансию, время проверки текста новой вакансии, уплотнения
+и поиска групп дубликатов. Проверяются тексты существующих вакансий
+с измененным последним словом - это почти дубликаты.
+
+Запуск из каталога src:
+    python -m scripts.bench_duplicates --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+from config import duplicate_settings
+from core.minhash import MinHashIndex
+from db_connection import engine
+from models import Job
+from queries.duplicate import job_text
+from scripts.bench_login_storm import percentile
+from sqlalchemy import select
+
+
+def new_index() -> MinHashIndex:
+    return MinHashIndex(
+        num_perm=duplicate_settings.num_perm,
+        bands=duplicate_settings.bands,
+        threshold=duplicate_settings.threshold,
+        shingle_size=duplicate_settings.shingle_size,
+        compact_after=duplicate_settings.compact_after,
+    )
+
+
+async def load_index(
+    size: int,
+) -> Tuple[MinHashIndex, List[Tuple[int, str]], float, float]:
+    """
+    Возвращает индекс, пары (компания, текст) для проверок, время чтения
+    из базы и время вычислений (сигнатуры и сборка основной части)
+    """
+    chunk_size = duplicate_settings.build_chunk_size
+    index = new_index()
+    parts, samples = [], []
+    fetch_seconds = compute_seconds = 0.0
+    async with engine.connect() as connection:
+        result = await connection.stream(
+            select(Job.id, Job.user_id, Job.title, Job.description)
+            .where(Job.is_active)
+            .order_by(Job.id)
+            .limit(size)
+            .execution_options(yield_per=chunk_size)
+        )
+        started = time.perf_counter()
+        async for rows in result.partitions(chunk_size):
+            fetched = time.perf_counter()
+            fetch_seconds += fetched - started
+            documents = [
+                (row.id, row.user_id, job_text(row.title, row.description))
+                for row in rows
+            ]
+            samples.extend(
+                (owner, text) for _, owner, text in random.sample(documents, 10)
+            )
+            parts.append(index.signatures(documents))
+            started = time.perf_counter()
+            compute_seconds += started - fetched
+    started = time.perf_counter()
+    index.build(parts)
+    compute_seconds += time.perf_counter() - started
+    return index, samples, fetch_seconds, compute_seconds
+
+
+def measure_checks(
+    index: MinHashIndex, samples: List[Tuple[int, str]], repeat: int
+) -> Tuple[List[float], int]:
+    latencies, flagged = [], 0
+    for _ in range(repeat):
+        owner, text = random.choice(samples)
+        text = text.rsplit(" ", 1)[0] + " обновлено"
+        started = time.perf_counter()
+        flagged += bool(index.find_text(owner, text))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, flagged
+
+
+def measure_compaction(index: MinHashIndex, samples, batch: int) -> float:
+    index.add(
+        index.signatures(
+            (-id, owner, text)
+            for id, (owner, text) in enumerate(random.choices(samples, k=batch), 1)
+        )
+    )
+    started = time.perf_counter()
+    index.compact()
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    for size in args.sizes:
+        index, samples, fetch_seconds, compute_seconds = await load_index(size)
+        stats = index.stats()
+        latencies, flagged = measure_checks(index, samples, args.repeat)
+        print(
+            f"{stats['documents']} jobs:"
+            f" build {compute_seconds:.1f} s (+{fetch_seconds:.1f} s reading),"
+            f" {stats['bytes'] / stats['documents']:.0f} bytes/job"
+            f" ({stats['bytes'] / 2**20:.0f} MiB)"
+        )
+        print(
+            f"  check    p50={statistics.median(latencies):8.3f} ms"
+            f"  p99={percentile(latencies, 99):8.3f} ms"
+            f"  flagged {flagged}/{args.repeat}"
+        )
+        started = time.perf_counter()
+        clusters = index.clusters()
+        print(
+            f"  clusters {time.perf_counter() - started:.2f} s:"
+            f" {len(clusters)} groups,"
+            f" {sum(len(ids) for _, ids in clusters)} jobs"
+        )
+        print(
+            f"  compaction after {args.compact_batch} changes:"
+            f" {measure_compaction(index, samples, args.compact_batch):.2f} s"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument(
+        "--compact-batch", type=int, default=duplicate_settings.compact_after
+    )
+    asyncio.run(main(parser.parse_args()))
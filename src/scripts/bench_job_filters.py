@@ -0,0 +1,92 @@
+"""
+Бенчмарк фильтров списка вакансий (GET /jobs) при разной избирательности.
+
+Параметры фильтров подбираются по квантилям данных так, чтобы под фильтр
+попадала заданная доля активных вакансий (от 0.1% до 50%), после чего
+замеряется первая страница queries.job.get_all_available_jobs_for_user.
+
+Запуск из каталога src (база должна быть наполнена, см. scripts.seed):
+    python -m scripts.bench_job_filters --repeat 50
+"""
+import argparse
+import asyncio
+import statistics
+from typing import List, Tuple
+
+from sqlalchemy import func, select, text
+
+from db_connection import engine
+from models import Job
+from queries import job as job_queries
+from schemas import JobFilterSchema
+from scripts.bench_login_storm import percentile
+from scripts.bench_search import measure
+
+SELECTIVITIES = [0.001, 0.01, 0.1, 0.5]
+
+QUANTILES_SQL = text(
+    """
+    SELECT
+        percentile_disc(1 - CAST(:share AS float8))
+            WITHIN GROUP (ORDER BY salary_to),
+        percentile_disc(1 - CAST(:share AS float8))
+            WITHIN GROUP (ORDER BY created_at)
+    FROM jobs
+    WHERE is_active
+    """
+)
+
+BUSIEST_COMPANY_SQL = text(
+    "SELECT user_id FROM jobs WHERE is_active "
+    "GROUP BY user_id ORDER BY count(*) DESC LIMIT 1"
+)
+
+
+async def build_filters(share: float) -> List[Tuple[str, JobFilterSchema]]:
+    async with engine.connect() as connection:
+        salary_to, created_at = (
+            await connection.execute(QUANTILES_SQL, {"share": share})
+        ).one()
+        company_id = (await connection.execute(BUSIEST_COMPANY_SQL)).scalar()
+    return [
+        ("salary", JobFilterSchema(salary_min=float(salary_to))),
+        ("posted_since", JobFilterSchema(posted_since=created_at)),
+        (
+            "salary+since",
+            JobFilterSchema(salary_min=float(salary_to), posted_since=created_at),
+        ),
+        (
+            "company+salary",
+            JobFilterSchema(company_id=company_id, salary_min=float(salary_to)),
+        ),
+    ]
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.connect() as connection:
+        total = (
+            await connection.execute(select(func.count(Job.id)).where(Job.is_active))
+        ).scalar()
+    print(f"{total} active jobs, first page of {args.limit}")
+
+    for share in SELECTIVITIES:
+        for name, filters in await build_filters(share):
+            latencies = await measure(
+                lambda db: job_queries.get_all_available_jobs_for_user(
+                    db=db, limit=args.limit, filters=filters
+                ),
+                args.repeat,
+            )
+            print(
+                f"  {name:<15} share={share:7.2%}"
+                f"  p50={statistics.median(latencies):8.2f} ms"
+                f"  p99={percentile(latencies, 99):8.2f} ms"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
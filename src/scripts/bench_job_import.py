@@ -0,0 +1,109 @@
+"""
+Бенчмарк импорта вакансий: строк в секунду через COPY (POST /jobs/import)
+против создания по одной вакансии через queries.job.create_job.
+
+Для замера создается отдельная компания, после замера ее вакансии
+и она сама удаляются.
+
+Запуск из каталога src:
+    python -m scripts.bench_job_import --rows 50000 --orm-rows 2000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import random
+import time
+import uuid
+from typing import AsyncIterator, List
+
+from sqlalchemy import delete
+
+from controllers import job as job_controller
+from core.principal import CurrentUser
+from db_connection import SessionLocal, engine
+from models import Job, User
+from queries import job as job_queries
+from schemas import JobInSchema
+
+WORDS = ["Python", "PostgreSQL", "FastAPI", "Kafka", "удаленно", "офис", "финтех"]
+
+
+def build_jobs(rows: int) -> List[JobInSchema]:
+    jobs = []
+    for n in range(rows):
+        salary_from = random.randrange(0, 200000, 1000)
+        jobs.append(
+            JobInSchema(
+                title=f"{random.choice(WORDS)} developer {n}",
+                description=" ".join(random.choices(WORDS, k=8)),
+                salary_from=salary_from,
+                salary_to=salary_from + random.randrange(0, 100000, 1000),
+            )
+        )
+    return jobs
+
+
+def to_csv(jobs: List[JobInSchema]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["title", "description", "salary_from", "salary_to"])
+    for job in jobs:
+        writer.writerow([job.title, job.description, job.salary_from, job.salary_to])
+    return buffer.getvalue().encode()
+
+
+async def iter_chunks(data: bytes, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def bench_orm(jobs: List[JobInSchema], company: CurrentUser) -> float:
+    async with SessionLocal() as db:
+        started = time.perf_counter()
+        for job in jobs:
+            await job_queries.create_job(db=db, job_schema=job, user_id=company.id)
+        return len(jobs) / (time.perf_counter() - started)
+
+
+async def bench_copy(data: bytes, company: CurrentUser) -> float:
+    async with SessionLocal() as db:
+        started = time.perf_counter()
+        report = await job_controller.import_jobs(
+            chunks=iter_chunks(data), db=db, current_user=company
+        )
+        return report.imported / (time.perf_counter() - started)
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"bench-import-{uuid.uuid4().hex}@example.com",
+            name="bench import",
+            hashed_password="not a bcrypt hash",
+            is_company=True,
+        )
+        db.add(user)
+        await db.commit()
+        company = CurrentUser.from_user(user, db)
+
+    try:
+        jobs = build_jobs(args.rows)
+        orm_rate = await bench_orm(jobs[: args.orm_rows], company)
+        print(f"  orm   {args.orm_rows:>8} rows  {orm_rate:10.0f} rows/s")
+        copy_rate = await bench_copy(to_csv(jobs), company)
+        print(f"  copy  {args.rows:>8} rows  {copy_rate:10.0f} rows/s")
+        print(f"  speedup x{copy_rate / orm_rate:.1f}")
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(delete(Job).where(Job.user_id == company.id))
+            await db.execute(delete(User).where(User.id == company.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--orm-rows", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
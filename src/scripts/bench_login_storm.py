@@ -0,0 +1,120 @@
+"""
+Бенчмарк: задержка GET /jobs во время шторма логинов.
+
+Запуск из каталога src:
+    python -m scripts.bench_login_storm --logins 200 --concurrency 50
+
+С флагом --blocking проверка пароля выполняется прямо в event loop,
+как было до переноса bcrypt в пул, — для сравнения p99.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+from httpx import AsyncClient
+
+from controllers import auth as auth_controller
+from core.security import password_hashing_pool, verify_password
+from db_connection import get_pool_stats
+from main import app
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def measure_jobs(
+    client: AsyncClient, token: str, stop: asyncio.Event
+) -> List[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/jobs", headers={"Authorization": f"Bearer {token}"})
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login_storm(
+    client: AsyncClient, credentials: dict, logins: int, concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await client.post("/auth", json=credentials)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def run_phase(
+    client: AsyncClient, token: str, credentials: dict, logins: int, concurrency: int
+) -> List[float]:
+    stop = asyncio.Event()
+    measuring = asyncio.create_task(measure_jobs(client, token, stop))
+    if logins:
+        await login_storm(client, credentials, logins, concurrency)
+    else:
+        await asyncio.sleep(2)
+    stop.set()
+    return await measuring
+
+
+def report(name: str, latencies: List[float]) -> None:
+    print(
+        f"{name:<12} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):8.2f}ms "
+        f"p99={percentile(latencies, 99):8.2f}ms "
+        f"max={max(latencies):8.2f}ms"
+    )
+
+
+async def main(logins: int, concurrency: int, blocking: bool) -> None:
+    if blocking:
+
+        async def verify_password_blocking(password: str, hash: str) -> bool:
+            return verify_password(password, hash)
+
+        auth_controller.verify_password_async = verify_password_blocking
+
+    credentials = {
+        "email": f"bench-{uuid.uuid4().hex[:8]}@example.com",
+        "password": "benchmarkpassword",
+    }
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        await client.post(
+            "/users",
+            json={
+                "name": "bench",
+                "email": credentials["email"],
+                "password": credentials["password"],
+                "password2": credentials["password"],
+                "is_company": False,
+            },
+        )
+        tokens = await client.post("/auth", json=credentials)
+        token = tokens.json()["access_token"]
+
+        report("idle", await run_phase(client, token, credentials, 0, concurrency))
+        report(
+            "login storm",
+            await run_phase(client, token, credentials, logins, concurrency),
+        )
+
+    print("password_hashing:", password_hashing_pool.stats())
+    print("database_pool:", get_pool_stats())
+    password_hashing_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency, args.blocking))
@@ -0,0 +1,133 @@
+"""
+Бенчмарк TF-IDF индекса рекомендаций вакансий (GET /jobs/recommended).
+
+Для каждого размера индекс строится из первых N вакансий базы так же,
+как при первом запросе рекомендаций: пачками через серверный курсор.
+Замеряются время сборки, память матрицы на вакансию, время подбора
+по профилю из --profile случайных вакансий и время переиндексации
+пачки измененных вакансий. Если вакансий в базе меньше, база сначала
+дополняется через scripts.seed.
+
+Запуск из каталога src:
+    python -m scripts.bench_recommendations --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+from sqlalchemy import func, select
+
+from config import recommendation_settings
+from core.tfidf import TfidfIndex
+from db_connection import engine
+from models import Job
+from queries.recommendation import job_text
+from scripts.bench_login_storm import percentile
+from scripts.seed import seed
+
+
+async def load_index(size: int) -> Tuple[TfidfIndex, List[str], float, float]:
+    """
+    Возвращает индекс, тексты вакансий для профилей, время чтения
+    из базы и время вычислений (разбор текстов и сборка матрицы)
+    """
+    chunk_size = recommendation_settings.build_chunk_size
+    index = TfidfIndex(compact_after=recommendation_settings.compact_after)
+    parts, texts = [], []
+    fetch_seconds = compute_seconds = 0.0
+    async with engine.connect() as connection:
+        result = await connection.stream(
+            select(Job.id, Job.title, Job.description)
+            .order_by(Job.id)
+            .limit(size)
+            .execution_options(yield_per=chunk_size)
+        )
+        started = time.perf_counter()
+        async for rows in result.partitions(chunk_size):
+            fetched = time.perf_counter()
+            fetch_seconds += fetched - started
+            documents = [(row.id, job_text(row.title, row.description)) for row in rows]
+            texts.extend(text for _, text in random.sample(documents, 10))
+            parts.append(index.count_terms(documents))
+            started = time.perf_counter()
+            compute_seconds += started - fetched
+    started = time.perf_counter()
+    index.build(parts)
+    compute_seconds += time.perf_counter() - started
+    return index, texts, fetch_seconds, compute_seconds
+
+
+def vocabulary_bytes(index: TfidfIndex) -> int:
+    # словарь - обычный dict строк, в stats() индекса он не входит
+    return sys.getsizeof(index.vocabulary) + sum(
+        sys.getsizeof(term) + sys.getsizeof(id) for term, id in index.vocabulary.items()
+    )
+
+
+def measure_queries(
+    index: TfidfIndex, texts: List[str], args: argparse.Namespace
+) -> List[float]:
+    latencies = []
+    for _ in range(args.repeat):
+        profile = random.sample(texts, args.profile)
+        started = time.perf_counter()
+        index.similar(profile, args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def measure_updates(index: TfidfIndex, texts: List[str], batch: int) -> float:
+    ids = random.sample(index.snapshot.segments[0].ids.tolist(), batch)
+    documents = list(zip(ids, random.choices(texts, k=batch)))
+    started = time.perf_counter()
+    index.upsert(*index.count_terms(documents))
+    return (time.perf_counter() - started) * 1000
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.begin() as connection:
+        jobs = (await connection.execute(select(func.count(Job.id)))).scalar()
+        if jobs < max(args.sizes):
+            print(f"seeding {max(args.sizes) - jobs} jobs...")
+            await seed(
+                connection,
+                companies=1000,
+                applicants=1000,
+                jobs=max(args.sizes) - jobs,
+                responses=0,
+            )
+
+    for size in args.sizes:
+        index, texts, fetch_seconds, compute_seconds = await load_index(size)
+        stats = index.stats()
+        latencies = measure_queries(index, texts, args)
+        print(
+            f"{stats['documents']} jobs, {stats['terms']} terms:"
+            f" build {compute_seconds:.1f} s (+{fetch_seconds:.1f} s reading),"
+            f" {stats['bytes'] / stats['documents']:.0f} bytes/job"
+            f" ({stats['bytes'] / 2**20:.0f} MiB)"
+            f" + vocabulary {vocabulary_bytes(index) / 2**20:.0f} MiB"
+        )
+        print(
+            f"  query    p50={statistics.median(latencies):8.2f} ms"
+            f"  p99={percentile(latencies, 99):8.2f} ms"
+        )
+        print(
+            f"  update of {args.update_batch} jobs:"
+            f" {measure_updates(index, texts, args.update_batch):.2f} ms"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--profile", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--update-batch", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
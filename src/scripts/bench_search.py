@@ -0,0 +1,128 @@
+"""
+Бенчмарк полнотекстового поиска вакансий.
+
+Сравнивает первую страницу queries.job.search_available_jobs (GIN-индекс
+по search_vector) с тем, что доступно без поиска: ILIKE по названию и
+описанию. Если вакансий в базе меньше --jobs, база сначала дополняется
+через scripts.seed.
+
+Запуск из каталога src:
+    python -m scripts.bench_search --jobs 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_connection import SessionLocal, engine
+from models import Job
+from queries import job as job_queries
+from scripts.bench_login_storm import percentile
+from scripts.seed import seed
+
+# от редких совпадений к частым: GIN-индекс выигрывает на избирательных
+# запросах, на запросах "обо всем" ранжирование требует читать почти всю таблицу
+DEFAULT_QUERIES = [
+    "стажировка поиск",
+    "платежи",
+    '"ClickHouse" -офис',
+    "python developer",
+    "developer",
+]
+
+
+async def ilike_first_page(db: AsyncSession, search_query: str, limit: int) -> List:
+    pattern = f"%{search_query}%"
+    query = (
+        select(Job)
+        .where(
+            Job.is_active,
+            or_(Job.title.ilike(pattern), Job.description.ilike(pattern)),
+        )
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(limit)
+    )
+    return (await db.execute(query)).scalars().all()
+
+
+async def measure(
+    run: Callable[[AsyncSession], Awaitable[List]], repeat: int
+) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            await run(db)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    print(
+        f"  {name:<8} p50={statistics.median(latencies):9.2f} ms"
+        f"  p99={percentile(latencies, 99):9.2f} ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.begin() as connection:
+        jobs = (await connection.execute(select(func.count(Job.id)))).scalar()
+        if jobs < args.jobs:
+            print(f"seeding {args.jobs - jobs} jobs...")
+            await seed(
+                connection,
+                companies=1000,
+                applicants=1000,
+                jobs=args.jobs - jobs,
+                responses=0,
+            )
+        await connection.execute(text("ANALYZE jobs"))
+
+    for search_query in args.queries:
+        async with SessionLocal() as db:
+            found = await job_queries.search_available_jobs(
+                db=db, search_query=search_query, limit=args.limit
+            )
+            matches = (
+                await db.execute(
+                    select(func.count(Job.id)).where(
+                        Job.is_active,
+                        Job.search_vector.op("@@")(
+                            job_queries.build_ts_query(search_query)
+                        ),
+                    )
+                )
+            ).scalar()
+        print(f"{search_query!r}: {matches} matches, first page {len(found)}")
+        report(
+            "search",
+            await measure(
+                lambda db: job_queries.search_available_jobs(
+                    db=db, search_query=search_query, limit=args.limit
+                ),
+                args.repeat,
+            ),
+        )
+        if not args.skip_ilike:
+            report(
+                "ilike",
+                await measure(
+                    lambda db: ilike_first_page(db, search_query, args.limit),
+                    args.repeat,
+                ),
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-ilike", action="store_true")
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    asyncio.run(main(parser.parse_args()))
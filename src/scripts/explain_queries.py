@@ -0,0 +1,152 @@
+"""
+Печатает планы выполнения (EXPLAIN) запросов из пакета queries.
+
+Каждая функция выполняется в транзакции, которая затем откатывается,
+поэтому скрипт можно запускать на рабочей копии базы. SELECT-запросы
+показываются с ANALYZE, изменяющие данные - только с оценками планировщика.
+
+Запуск из каталога src (база должна быть наполнена, см. scripts.seed):
+    python -m scripts.explain_queries
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from db_connection import engine
+from queries import job as job_queries
+from queries import response as response_queries
+from queries import user as user_queries
+from schemas import JobInSchema, ResponseInSchema
+
+QueryFactory = Callable[[AsyncSession], Awaitable]
+
+SAMPLE_IDS_SQL = text(
+    """
+    SELECT
+        (SELECT user_id FROM jobs GROUP BY user_id ORDER BY count(*) DESC LIMIT 1),
+        (SELECT id FROM users WHERE NOT is_company LIMIT 1),
+        (SELECT id FROM jobs WHERE is_active ORDER BY id DESC LIMIT 1),
+        (SELECT email FROM users ORDER BY id DESC LIMIT 1)
+    """
+)
+
+
+def build_queries(
+    company_id: int, applicant_id: int, job_id: int, email: str
+) -> List[Tuple[str, QueryFactory]]:
+    new_job = JobInSchema(title="Explain", description="Explain", is_active=True)
+    return [
+        (
+            "job.get_all_available_jobs_for_user",
+            lambda db: job_queries.get_all_available_jobs_for_user(db=db),
+        ),
+        (
+            "job.get_all_available_jobs_for_company",
+            lambda db: job_queries.get_all_available_jobs_for_company(
+                db=db, user_id=company_id
+            ),
+        ),
+        (
+            "job.search_available_jobs",
+            lambda db: job_queries.search_available_jobs(
+                db=db, search_query="python developer", limit=20
+            ),
+        ),
+        (
+            "job.get_available_job_by_id_for_user",
+            lambda db: job_queries.get_available_job_by_id_for_user(
+                db=db, job_id=job_id
+            ),
+        ),
+        (
+            "job.get_available_job_by_id_for_company",
+            lambda db: job_queries.get_available_job_by_id_for_company(
+                db=db, job_id=job_id, user_id=company_id
+            ),
+        ),
+        (
+            "job.create_job",
+            lambda db: job_queries.create_job(
+                db=db, job_schema=new_job, user_id=company_id
+            ),
+        ),
+        (
+            "job.update_job",
+            lambda db: job_queries.update_job(
+                db=db, job_id=job_id, user_id=company_id, values={"title": "Explain"}
+            ),
+        ),
+        (
+            "response.get_responses_by_job_id",
+            lambda db: response_queries.get_responses_by_job_id(
+                db=db, job_id=job_id, user_id=company_id
+            ),
+        ),
+        (
+            "response.create_response",
+            lambda db: response_queries.create_response(
+                db=db,
+                response_schema=ResponseInSchema(job_id=job_id, message="Explain"),
+                user_id=applicant_id,
+            ),
+        ),
+        ("user.get_all", lambda db: user_queries.get_all(db=db)),
+        (
+            "user.get_by_id",
+            lambda db: user_queries.get_by_id(db=db, user_id=applicant_id),
+        ),
+        ("user.get_by_email", lambda db: user_queries.get_by_email(db=db, email=email)),
+    ]
+
+
+async def explain(connection: AsyncConnection, name: str, factory: QueryFactory):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    sync_connection = connection.sync_connection
+    transaction = await connection.begin()
+    session = AsyncSession(bind=connection, expire_on_commit=False)
+    # функции запросов сами делают commit, здесь он не должен ничего фиксировать
+    session.commit = session.flush
+
+    event.listen(sync_connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        user_queries.invalidate_user_cache(None)
+        await factory(session)
+    finally:
+        event.remove(sync_connection, "before_cursor_execute", before_cursor_execute)
+
+    print(f"==== {name}")
+    for statement, parameters in statements:
+        options = "ANALYZE, BUFFERS" if statement.lstrip().startswith("SELECT") else ""
+        prefix = f"EXPLAIN ({options}) " if options else "EXPLAIN "
+        print(statement.strip())
+        plan = await connection.exec_driver_sql(prefix + statement, parameters)
+        for (line,) in plan:
+            print("    " + line)
+        print()
+
+    await session.close()
+    await transaction.rollback()
+
+
+async def main() -> None:
+    async with engine.connect() as connection:
+        company_id, applicant_id, job_id, email = (
+            await connection.execute(SAMPLE_IDS_SQL)
+        ).one()
+        await connection.rollback()
+        if job_id is None:
+            raise SystemExit("База пуста, сначала запустите python -m scripts.seed")
+
+        for name, factory in build_queries(company_id, applicant_id, job_id, email):
+            await explain(connection, name, factory)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Импорт вакансий компании из CSV-файла через COPY, как POST /jobs/import.
+
+Ход импорта пишется в лог после каждого пакета, итоговый отчет
+(число загруженных и отклоненных строк, ошибки) выводится в конце.
+
+Запуск из каталога src:
+    python -m scripts.import_jobs --company-id 42 jobs.csv
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import AsyncIterator
+
+from controllers import job as job_controller
+from core.principal import CurrentUser
+from db_connection import SessionLocal, engine
+from queries import user as user_queries
+
+CHUNK_BYTES = 1 << 20
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_BYTES):
+            yield chunk
+
+
+async def main(args: argparse.Namespace) -> int:
+    async with SessionLocal() as db:
+        company = await user_queries.get_by_id(db=db, user_id=args.company_id)
+        if company is None or not company.is_company:
+            print(f"company {args.company_id} not found", file=sys.stderr)
+            return 1
+        report = await job_controller.import_jobs(
+            chunks=read_chunks(args.path),
+            db=db,
+            current_user=CurrentUser.from_user(company, db),
+        )
+    await engine.dispose()
+
+    print(f"imported {report.imported}, rejected {report.rejected}")
+    for error in report.errors:
+        print(f"  row {error.row}: {error.message}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--company-id", type=int, required=True)
+    parser.add_argument("path")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    sys.exit(asyncio.run(main(parser.parse_args())))
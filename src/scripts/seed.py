@@ -0,0 +1,130 @@
+"""
+Наполнение базы тестовыми данными для бенчмарков и EXPLAIN.
+
+Запуск из каталога src:
+    python -m scripts.seed --companies 1000 --applicants 10000 --jobs 100000 --responses 300000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from db_connection import engine
+
+SEED_USERS_SQL = text(
+    """
+    INSERT INTO users (email, name, hashed_password, is_company, created_at)
+    SELECT
+        'seed-' || :prefix || '-' || n || '@example.com',
+        'seed user ' || n,
+        'not a bcrypt hash',
+        :is_company,
+        now() - random() * interval '365 days'
+    FROM generate_series(1, :count) AS n
+    """
+)
+
+SEED_JOBS_SQL = text(
+    """
+    WITH companies AS (
+        SELECT array_agg(id) AS ids FROM users WHERE is_company
+    ), words AS (
+        -- слова из начала списка встречаются часто, из конца - редко
+        SELECT ARRAY[
+            'PostgreSQL', 'Django', 'FastAPI', 'Kubernetes', 'Docker', 'Kafka',
+            'Redis', 'React', 'TypeScript', 'Spark', 'Airflow', 'ClickHouse',
+            'Terraform', 'Linux', 'микросервисы', 'аналитика', 'тестирование',
+            'автоматизация', 'мониторинг', 'безопасность', 'финтех', 'ритейл',
+            'логистика', 'медицина', 'удаленно', 'офис', 'наставничество',
+            'стажировка', 'архитектура', 'нагрузка', 'платежи', 'поиск'
+        ] AS list
+    ), salaries AS (
+        SELECT n, round((random() * 200000)::numeric, -3) AS salary_from
+        FROM generate_series(1, :count) AS n
+    )
+    INSERT INTO jobs (
+        user_id, title, description, salary_from, salary_to, is_active, created_at
+    )
+    SELECT
+        companies.ids[1 + floor(random() * array_length(companies.ids, 1))::int],
+        (ARRAY['Python', 'Go', 'Java', 'Frontend', 'Data', 'QA', 'DevOps'])
+            [1 + floor(random() * 7)::int] || ' developer ' || n,
+        (
+            SELECT string_agg(
+                words.list[
+                    1 + floor(power(random(), 3) * array_length(words.list, 1))::int
+                ],
+                ' '
+            )
+            FROM generate_series(1, 8), words
+            WHERE n > 0
+        ) || '. ' || repeat('Разработка сервисов и поддержка продукта. ', 10),
+        salary_from,
+        salary_from + round((random() * 100000)::numeric, -3),
+        random() < :active_share,
+        now() - random() * interval '365 days'
+    FROM salaries, companies
+    """
+)
+
+SEED_RESPONSES_SQL = text(
+    """
+    WITH applicants AS (
+        SELECT array_agg(id) AS ids FROM users WHERE NOT is_company
+    ), jobs_range AS (
+        SELECT min(id) AS min_id, max(id) AS max_id FROM jobs
+    )
+    INSERT INTO responses (user_id, job_id, message)
+    SELECT
+        applicants.ids[1 + floor(random() * array_length(applicants.ids, 1))::int],
+        min_id + floor(random() * (max_id - min_id + 1))::int,
+        repeat('Хочу у вас работать. ', 10)
+    FROM generate_series(1, :count), applicants, jobs_range
+    ON CONFLICT DO NOTHING
+    """
+)
+
+
+async def seed(
+    connection: AsyncConnection,
+    companies: int,
+    applicants: int,
+    jobs: int,
+    responses: int,
+    active_share: float = 0.8,
+) -> None:
+    prefix = str(int(asyncio.get_running_loop().time() * 1000))
+    await connection.execute(
+        SEED_USERS_SQL, {"prefix": prefix + "c", "is_company": True, "count": companies}
+    )
+    await connection.execute(
+        SEED_USERS_SQL,
+        {"prefix": prefix + "a", "is_company": False, "count": applicants},
+    )
+    await connection.execute(
+        SEED_JOBS_SQL, {"count": jobs, "active_share": active_share}
+    )
+    await connection.execute(SEED_RESPONSES_SQL, {"count": responses})
+    await connection.execute(text("ANALYZE users, jobs, responses"))
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.begin() as connection:
+        await seed(
+            connection,
+            companies=args.companies,
+            applicants=args.applicants,
+            jobs=args.jobs,
+            responses=args.responses,
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=1000)
+    parser.add_argument("--applicants", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--responses", type=int, default=300000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,37 @@
+"""
+Назначает пользователя администратором или снимает с него эти права.
+Через API флаг не меняется.
+
+Запуск из каталога src:
+    python -m scripts.set_admin admin@example.com
+    python -m scripts.set_admin --revoke admin@example.com
+"""
+import argparse
+import asyncio
+import sys
+
+from db_connection import SessionLocal, engine
+from queries import user as user_queries
+
+
+async def main(args: argparse.Namespace) -> int:
+    async with SessionLocal() as db:
+        user = await user_queries.get_by_email(db=db, email=args.email)
+        if user is not None:
+            user = await user_queries.update_user(
+                db=db, user_id=user.id, values={"is_admin": not args.revoke}
+            )
+    await engine.dispose()
+
+    if user is None:
+        print(f"user {args.email} not found", file=sys.stderr)
+        return 1
+    print(f"{user.email}: is_admin={user.is_admin}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revoke", action="store_true")
+    parser.add_argument("email")
+    sys.exit(asyncio.run(main(parser.parse_args())))
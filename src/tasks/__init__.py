@@ -0,0 +1,11 @@
+from config import scheduler_settings
+from core.scheduler import Scheduler
+from .jobs import expire_jobs, archive_jobs, build_job_index, build_duplicate_index
+
+scheduler = Scheduler(
+    lock_key=scheduler_settings.lock_key,
+    interval=scheduler_settings.interval,
+    max_batches=scheduler_settings.max_batches,
+)
+scheduler.add("expire_jobs", expire_jobs)
+scheduler.add("archive_jobs", archive_jobs)
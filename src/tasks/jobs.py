@@ -0,0 +1,32 @@
+import datetime
+from config import scheduler_settings
+from db_connection import SessionLocal
+from queries import job as job_queries
+from queries import recommendation as recommendation_queries
+from queries import duplicate as duplicate_queries
+
+
+async def expire_jobs() -> int:
+    async with SessionLocal() as db:
+        return await job_queries.expire_jobs(
+            db=db, batch_size=scheduler_settings.expiry_batch_size
+        )
+
+
+async def archive_jobs() -> int:
+    async with SessionLocal() as db:
+        return await job_queries.archive_jobs(
+            db=db,
+            inactive_for=datetime.timedelta(days=scheduler_settings.archive_after_days),
+            batch_size=scheduler_settings.archive_batch_size,
+        )
+
+
+async def build_job_index() -> None:
+    async with SessionLocal() as db:
+        await recommendation_queries.refresh_job_index(db)
+
+
+async def build_duplicate_index() -> None:
+    async with SessionLocal() as db:
+        await duplicate_queries.refresh_duplicate_index(db)
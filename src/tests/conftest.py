@@ -1,6 +1,7 @@
 import asyncio
+from typing import List
 
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from models import User
@@ -14,7 +15,11 @@ import pytest_asyncio
 from unittest.mock import MagicMock
 from db_connection import SQLALCHEMY_DATABASE_URL
 from schemas import AccessTokenSchema
-from core.security import create_token
+from core.security import create_token, create_user_claims
+from queries.user import invalidate_user_cache
+from queries.job import invalidate_job_list_cache
+from queries.recommendation import job_index_state
+from queries.duplicate import duplicate_index_state
 from dependencies import get_db
 from httpx import AsyncClient
 
@@ -58,6 +63,31 @@ async def sa_session():
         await engine.dispose()
 
 
+@pytest.fixture()
+def sql_statements(sa_session: AsyncSession) -> List[str]:
+    """
+    Список SQL-запросов, отправленных в БД через тестовую сессию
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    connection = sa_session.bind.sync_connection
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+# каждый тест откатывает свою транзакцию, поэтому кеши тоже сбрасываются
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    invalidate_user_cache(None)
+    invalidate_job_list_cache(None)
+    job_index_state.reset()
+    duplicate_index_state.reset()
+
+
 # регистрация фабрик
 @pytest_asyncio.fixture(autouse=True)
 def setup_factories(sa_session: AsyncSession) -> None:
@@ -102,7 +132,15 @@ async def mock_another_company(sa_session: AsyncSession) -> User:
 @pytest_asyncio.fixture()
 async def mock_access_token_user(mock_user: User):
     token = AccessTokenSchema(
-        access_token=create_token({"sub": mock_user.email}), token_type="Bearer"
+        access_token=create_token(
+            create_user_claims(
+                mock_user.id,
+                mock_user.email,
+                mock_user.is_company,
+                mock_user.token_version,
+            )
+        ),
+        token_type="Bearer",
     )
     return token
 
@@ -110,7 +148,14 @@ async def mock_access_token_user(mock_user: User):
 @pytest_asyncio.fixture()
 async def mock_access_token_company(mock_own_company: User):
     token = AccessTokenSchema(
-        access_token=create_token({"sub": mock_own_company.email}),
+        access_token=create_token(
+            create_user_claims(
+                mock_own_company.id,
+                mock_own_company.email,
+                mock_own_company.is_company,
+                mock_own_company.token_version,
+            )
+        ),
         token_type="Bearer",
     )
     return token
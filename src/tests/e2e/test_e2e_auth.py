@@ -0,0 +1,135 @@
+import pytest
+from fastapi import status
+from core import security
+from models import User
+from queries import user as user_queries
+from schemas import UserInSchema, LoginSchema
+
+
+@pytest.mark.asyncio
+async def test_login(mock_app_unauthorized_user):
+    user = UserInSchema(
+        name="user",
+        email="login@mail.ru",
+        password="stringgg",
+        password2="stringgg",
+        is_company=False,
+    )
+    await mock_app_unauthorized_user.post(url="/users", json=user.dict())
+
+    login = LoginSchema(email=user.email, password=user.password)
+    tokens = await mock_app_unauthorized_user.post(url="/auth", json=login.dict())
+
+    assert tokens.status_code == status.HTTP_200_OK
+    claims = security.decode_token(tokens.json()["access_token"])
+    assert claims["sub"] == user.email
+    assert claims["role"] == "applicant"
+    assert claims["ver"] == security.TOKEN_VERSION
+
+
+@pytest.mark.asyncio
+async def test_login_with_wrong_password(mock_app_unauthorized_user):
+    user = UserInSchema(
+        name="user",
+        email="login@mail.ru",
+        password="stringgg",
+        password2="stringgg",
+        is_company=False,
+    )
+    await mock_app_unauthorized_user.post(url="/users", json=user.dict())
+
+    login = LoginSchema(email=user.email, password="wrongpassword")
+    tokens = await mock_app_unauthorized_user.post(url="/auth", json=login.dict())
+
+    assert tokens.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_token_signature_verified_once(mock_app_user, monkeypatch):
+    security.verified_token_cache.clear()
+    decoded_tokens = []
+    decode_token = security.decode_token
+
+    def counting_decode_token(token: str):
+        decoded_tokens.append(token)
+        return decode_token(token)
+
+    monkeypatch.setattr(security, "decode_token", counting_decode_token)
+
+    for _ in range(3):
+        response = await mock_app_user.get(url="/jobs")
+        assert response.status_code == status.HTTP_200_OK
+
+    assert len(decoded_tokens) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_token(mock_app_unauthorized_user):
+    response = await mock_app_unauthorized_user.get(
+        url="/jobs", headers={"Authorization": "Bearer not.a.token"}
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_authorization_from_user_cache(mock_app_company):
+    await mock_app_company.get(url="/jobs")
+    misses = user_queries.user_cache.misses
+
+    response = await mock_app_company.get(url="/jobs")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries.user_cache.misses == misses
+
+
+@pytest.mark.asyncio
+async def test_token_revoked_by_role_change(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    await user_queries.update_user(sa_session, mock_own_company.id, {"name": "ООО"})
+    renamed = await mock_app_company.get(url="/responses?job_id=1")
+    await user_queries.update_user(
+        sa_session, mock_own_company.id, {"is_company": False}
+    )
+
+    response = await mock_app_company.get(url="/jobs")
+
+    assert renamed.status_code == status.HTTP_200_OK
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_authorization_with_legacy_token(
+    mock_app_unauthorized_user, mock_own_company: User
+):
+    token = security.create_token({"sub": mock_own_company.email})
+
+    response = await mock_app_unauthorized_user.get(
+        url="/responses?job_id=1", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reloads_user(
+    sa_session, mock_app_unauthorized_user, mock_user: User, mock_access_token_user
+):
+    await user_queries.update_user(
+        sa_session, mock_user.id, {"email": "refreshed@mail.ru", "is_company": True}
+    )
+
+    tokens = await mock_app_unauthorized_user.post(
+        url="/auth/refresh_token",
+        params={"refresh_token": mock_access_token_user.access_token},
+    )
+    invalid = await mock_app_unauthorized_user.post(
+        url="/auth/refresh_token", params={"refresh_token": "invalid"}
+    )
+
+    assert tokens.status_code == status.HTTP_200_OK
+    claims = security.decode_token(tokens.json()["refresh_token"])
+    assert claims["sub"] == "refreshed@mail.ru"
+    assert claims["role"] == "company"
+    assert invalid.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,9 +1,16 @@
+import datetime
 import pytest
 from fastapi import status
 from pydantic import ValidationError
 from fixtures.jobs import JobFactory
+from fixtures.responses import ResponseFactory
 from schemas import JobInSchema, JobUpdateSchema
 from models import User
+from queries import job as job_query
+from queries import user as user_query
+from queries import recommendation as recommendation_query
+from queries import duplicate as duplicate_query
+from config import batch_settings, duplicate_settings
 
 
 @pytest.mark.asyncio
@@ -51,6 +58,76 @@ async def test_get_available_jobs_for_user(
     assert len(responses.json()) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_cached_jobs_page_for_user(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.flush()
+
+    first = await mock_app_user.get(url="/jobs", params={"limit": 1})
+    hits = job_query.job_list_cache.stats()["hits"]
+    second = await mock_app_user.get(url="/jobs", params={"limit": 1})
+
+    assert job_query.job_list_cache.stats()["hits"] == hits + 1
+    assert second.content == first.content
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    new_job = await job_query.create_job(
+        sa_session,
+        job_schema=JobInSchema(title="Galera tech", description="точно не галера"),
+        user_id=mock_own_company.id,
+    )
+    third = await mock_app_user.get(url="/jobs", params={"limit": 1})
+
+    assert third.json()[0]["id"] == new_job.id
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_with_fields(sa_session, mock_app_user, mock_own_company: User):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.flush()
+
+    default = await mock_app_user.get(url="/jobs")
+    selected = await mock_app_user.get(url="/jobs", params={"fields": "id,description"})
+    unknown = await mock_app_user.get(url="/jobs", params={"fields": "id,password"})
+
+    assert "description" not in default.json()[0]
+    assert "title" in default.json()[0]
+    assert selected.json() == [{"id": job.id, "description": job.description}]
+    assert selected.headers["ETag"] != default.headers["ETag"]
+    assert unknown.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_recommended_jobs(
+    sa_session, mock_app_user, mock_app_company, mock_user: User, mock_own_company
+):
+    python_job, cook_job, applied_job = [
+        JobFactory.build(
+            user_id=mock_own_company.id, is_active=True, title=title, description=""
+        )
+        for title in ["Python разработчик", "Повар", "Python стажер"]
+    ]
+    sa_session.add_all([python_job, cook_job, applied_job])
+    await sa_session.flush()
+    await recommendation_query.refresh_job_index(sa_session)
+
+    newest = await mock_app_user.get(url="/jobs/recommended")
+    sa_session.add(ResponseFactory.build(user_id=mock_user.id, job_id=applied_job.id))
+    await sa_session.flush()
+    recommended = await mock_app_user.get(
+        url="/jobs/recommended", params={"fields": "id,title"}
+    )
+    for_company = await mock_app_company.get(url="/jobs/recommended")
+
+    assert len(newest.json()) == 3
+    assert recommended.json() == [{"id": python_job.id, "title": python_job.title}]
+    assert for_company.status_code == status.HTTP_403_FORBIDDEN
+
+
 @pytest.mark.asyncio
 async def test_get_null_list_jobs_for_user(mock_app_user):
     responses = await mock_app_user.get(url="/jobs")
@@ -59,6 +136,124 @@ async def test_get_null_list_jobs_for_user(mock_app_user):
     assert len(responses.json()) == 0
 
 
+@pytest.mark.asyncio
+async def test_get_jobs_by_cursor(sa_session, mock_app_user, mock_own_company: User):
+    for _ in range(5):
+        job = JobFactory.build()
+        job.user_id = mock_own_company.id
+        job.is_active = True
+        sa_session.add(job)
+    sa_session.flush()
+
+    first_page = await mock_app_user.get(url="/jobs", params={"limit": 3})
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = await mock_app_user.get(
+        url="/jobs", params={"limit": 3, "cursor": cursor}
+    )
+
+    assert second_page.status_code == status.HTTP_200_OK
+    assert "X-Next-Cursor" not in second_page.headers
+    ids = [job["id"] for job in first_page.json() + second_page.json()]
+    assert len(ids) == len(set(ids)) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_by_skip_newest_first(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    now = datetime.datetime.utcnow()
+    jobs = [
+        JobFactory.build(
+            user_id=mock_own_company.id,
+            is_active=True,
+            created_at=now - datetime.timedelta(minutes=minutes),
+        )
+        for minutes in [2, 0, 1]
+    ]
+    sa_session.add_all(jobs)
+    sa_session.flush()
+
+    first_page = await mock_app_user.get(url="/jobs", params={"limit": 2})
+    second_page = await mock_app_user.get(url="/jobs", params={"limit": 2, "skip": 2})
+
+    assert [job["id"] for job in first_page.json() + second_page.json()] == [
+        jobs[1].id,
+        jobs[2].id,
+        jobs[0].id,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_with_tampered_cursor(mock_app_user):
+    responses = await mock_app_user.get(url="/jobs", params={"cursor": "abc.def"})
+
+    assert responses.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_by_salary(sa_session, mock_app_user, mock_own_company: User):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.salary_from = 1000
+    job.salary_to = 2000
+    job.is_active = True
+    sa_session.add(job)
+    sa_session.flush()
+
+    matching = await mock_app_user.get(
+        url="/jobs", params={"salary_min": 1500, "salary_max": 5000}
+    )
+    not_matching = await mock_app_user.get(url="/jobs", params={"salary_min": 2500})
+
+    assert [job["id"] for job in matching.json()] == [job.id]
+    assert not_matching.json() == []
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_by_salary_without_salary(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    jobs = JobFactory.build_batch(2, user_id=mock_own_company.id, is_active=True)
+    jobs[0].salary_from, jobs[0].salary_to = None, None
+    jobs[1].salary_from, jobs[1].salary_to = 3000, None
+    sa_session.add_all(jobs)
+    sa_session.flush()
+
+    matching = await mock_app_user.get(url="/jobs", params={"salary_min": 2500})
+    not_matching = await mock_app_user.get(url="/jobs", params={"salary_max": 2000})
+
+    assert [job["id"] for job in matching.json()] == [jobs[1].id]
+    assert not_matching.json() == []
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_with_wrong_salary_filter(mock_app_user):
+    responses = await mock_app_user.get(
+        url="/jobs", params={"salary_min": 5000, "salary_max": 1000}
+    )
+
+    assert responses.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_search_jobs_for_company(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    own_inactive_job = JobFactory.build()
+    own_inactive_job.user_id = mock_own_company.id
+    own_inactive_job.title = "Аналитик данных"
+    own_inactive_job.is_active = False
+    sa_session.add(own_inactive_job)
+    sa_session.flush()
+
+    responses = await mock_app_company.get(
+        url="/jobs/search", params={"q": "аналитика"}
+    )
+
+    assert responses.status_code == status.HTTP_200_OK
+    assert [job["id"] for job in responses.json()] == [own_inactive_job.id]
+
+
 @pytest.mark.asyncio
 async def test_get_available_job_by_id_for_company(
     sa_session, mock_app_company, mock_own_company: User
@@ -90,6 +285,50 @@ async def test_get_available_job_by_id_for_user(
     assert response.json()["id"] == available_job.id
 
 
+@pytest.mark.asyncio
+async def test_get_job_by_id_not_modified(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id)
+    sa_session.add(job)
+    sa_session.flush()
+
+    response = await mock_app_company.get(url=f"/jobs/by_id?job_id={job.id}")
+    etag = response.headers["ETag"]
+    not_modified = await mock_app_company.get(
+        url=f"/jobs/by_id?job_id={job.id}", headers={"If-None-Match": etag}
+    )
+    await mock_app_company.put(
+        url=f"/jobs?job_id={job.id}",
+        json=JobUpdateSchema(title="Galera tech", salary_from=1, salary_to=2).dict(),
+    )
+    modified = await mock_app_company.get(
+        url=f"/jobs/by_id?job_id={job.id}", headers={"If-None-Match": etag}
+    )
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+    assert modified.status_code == status.HTTP_200_OK
+    assert modified.headers["ETag"] != etag
+    assert modified.json()["updated_at"] > response.json()["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_get_cached_jobs_page_not_modified(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.flush()
+
+    response = await mock_app_user.get(url="/jobs")
+    not_modified = await mock_app_user.get(
+        url="/jobs", headers={"If-None-Match": f'W/{response.headers["ETag"]}'}
+    )
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 @pytest.mark.asyncio
 async def test_get_non_exist_job_by_id(mock_app_user):
     response = await mock_app_user.get(url="/jobs/by_id?job_id=10")
@@ -113,6 +352,155 @@ async def test_create_job_by_company(mock_app_company):
     assert response.json()["title"] == "Galera tech"
 
 
+DUPLICATE_DESCRIPTION = (
+    "Ищем бэкенд разработчика в команду платежей. Вы будете проектировать "
+    "и писать сервисы на FastAPI и Postgres, разбирать очереди задач, "
+    "проводить ревью кода коллег, участвовать в дежурствах и разборе "
+    "инцидентов, улучшать мониторинг и помогать аналитикам с выгрузками. "
+    "Мы предлагаем удаленную работу, гибкий график, ДМС со стоматологией, "
+    "компенсацию обучения и конференций, современное железо и спокойные "
+    "релизы без авралов по выходным"
+)
+
+
+@pytest.mark.asyncio
+async def test_create_duplicate_job_by_company(
+    sa_session, mock_app_company, monkeypatch
+):
+    job = JobInSchema(
+        title="Python разработчик", description=DUPLICATE_DESCRIPTION, is_active=True
+    )
+
+    # пока индекс не построен, проверка пропускается, а не ждет сборки
+    first = await mock_app_company.post(url="/jobs", json=job.dict())
+    await duplicate_query.refresh_duplicate_index(sa_session)
+    second = await mock_app_company.post(url="/jobs", json=job.dict())
+    monkeypatch.setattr(duplicate_settings, "policy", "reject")
+    rejected = await mock_app_company.post(url="/jobs", json=job.dict())
+
+    assert first.status_code == status.HTTP_200_OK
+    assert "X-Duplicate-Of" not in first.headers
+    assert second.status_code == status.HTTP_200_OK
+    assert second.headers["X-Duplicate-Of"] == str(first.json()["id"])
+    assert rejected.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_get_duplicate_jobs_by_admin(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    jobs = [
+        JobFactory.build(
+            user_id=mock_own_company.id,
+            is_active=True,
+            title="Python разработчик",
+            description=description,
+        )
+        for description in [
+            DUPLICATE_DESCRIPTION,
+            DUPLICATE_DESCRIPTION + " и бонусы",
+            "Повар в ресторан",
+        ]
+    ]
+    sa_session.add_all(jobs)
+    await sa_session.flush()
+
+    forbidden = await mock_app_company.get(url="/admin/jobs/duplicates")
+    await user_query.update_user(sa_session, mock_own_company.id, {"is_admin": True})
+    response = await mock_app_company.get(
+        url="/admin/jobs/duplicates", params={"company_id": mock_own_company.id}
+    )
+
+    assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"user_id": mock_own_company.id, "job_ids": [jobs[0].id, jobs[1].id]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_jobs_batch_by_company(mock_app_company):
+    jobs = [
+        JobInSchema(
+            title=f"Galera tech {i}",
+            description="точно не галера",
+            salary_from=10000,
+            salary_to=35000,
+        ).dict()
+        for i in range(3)
+    ]
+
+    response = await mock_app_company.post(url="/jobs/batch", json=jobs)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status"] for item in response.json()] == ["created"] * 3
+    assert [item["job"]["title"] for item in response.json()] == [
+        job["title"] for job in jobs
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_too_large_jobs_batch(mock_app_company):
+    jobs = [{"title": "Galera tech", "description": ""}] * 1000
+
+    response = await mock_app_company.post(url="/jobs/batch", json=jobs)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_import_jobs_by_company(mock_app_company):
+    content = (
+        "title,description,salary_from,salary_to\r\n"
+        'Galera tech,"точно не галера, честно",10000,35000\r\n'
+        ",без названия,,\r\n"
+        "Ne galera tech,описание,50000,100\r\n"
+        'Backend,"многострочное\nописание",,\r\n'
+    )
+
+    response = await mock_app_company.post(
+        url="/jobs/import",
+        content=content.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 2
+    assert response.json()["rejected"] == 2
+    assert [error["row"] for error in response.json()["errors"]] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_import_jobs_with_broken_quotes(mock_app_company, monkeypatch):
+    monkeypatch.setattr(batch_settings, "import_max_record_size", 100)
+    content = (
+        "title,description\n"
+        'Монитор 27",экран 5" с подставкой\n'
+        '"Незакрытая кавычка,' + "длинное описание " * 10 + "\n"
+        "Backend,описание\n"
+    )
+
+    response = await mock_app_company.post(
+        url="/jobs/import",
+        content=content.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["imported"] == 2
+    assert response.json()["rejected"] == 1
+    assert response.json()["errors"][0]["row"] == 2
+
+
+@pytest.mark.asyncio
+async def test_import_jobs_without_required_columns(mock_app_company):
+    response = await mock_app_company.post(
+        url="/jobs/import", content="title\nGalera tech\n".encode()
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.asyncio
 async def test_create_job_by_company_with_wrong_salary_param(mock_app_company):
     with pytest.raises(ValidationError):
@@ -193,6 +581,56 @@ async def test_update_job_by_company_with_wrong_salary_param(
         )
 
 
+@pytest.mark.asyncio
+async def test_update_jobs_batch_by_company(
+    sa_session, mock_app_company, mock_own_company: User, mock_another_company: User
+):
+    own_job = JobFactory.build(user_id=mock_own_company.id)
+    another_job = JobFactory.build(user_id=mock_another_company.id)
+    sa_session.add_all([own_job, another_job])
+    sa_session.flush()
+
+    jobs = [
+        {"id": another_job.id, "title": "Galera tech"},
+        {"id": own_job.id, "title": "Galera tech"},
+    ]
+
+    response = await mock_app_company.put(url="/jobs/batch", json=jobs)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status"] for item in response.json()] == ["not_found", "updated"]
+    assert response.json()[1]["job"]["title"] == "Galera tech"
+
+
+@pytest.mark.asyncio
+async def test_update_jobs_batch_with_repeated_job(mock_app_company):
+    jobs = [{"id": 1, "title": "Galera tech"}, {"id": 1, "title": "Ne galera"}]
+
+    response = await mock_app_company.put(url="/jobs/batch", json=jobs)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_deactivate_jobs_batch_by_company(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.flush()
+
+    response = await mock_app_company.post(
+        url="/jobs/batch/deactivate", json=[job.id, job.id + 1000]
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status"] for item in response.json()] == [
+        "deactivated",
+        "not_found",
+    ]
+    assert response.json()[0]["job"]["is_active"] is False
+
+
 @pytest.mark.asyncio
 async def test_update_job_by_user(mock_app_user):
     update_job = JobUpdateSchema(
@@ -238,6 +676,34 @@ async def test_delete_job_by_company(
     assert response.json()["id"] == job.id
 
 
+@pytest.mark.asyncio
+async def test_get_archived_jobs_by_company(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    job = JobFactory.build(
+        user_id=mock_own_company.id,
+        is_active=False,
+        updated_at=datetime.datetime.utcnow() - datetime.timedelta(days=30),
+    )
+    sa_session.add(job)
+    await sa_session.flush()
+    await job_query.archive_jobs(
+        sa_session, inactive_for=datetime.timedelta(days=7), batch_size=10
+    )
+
+    archived_jobs = await mock_app_company.get(url="/jobs/archive")
+    archived_responses = await mock_app_company.get(
+        url="/responses/archive", params={"job_id": job.id}
+    )
+    job_by_id = await mock_app_company.get(url=f"/jobs/by_id?job_id={job.id}")
+
+    assert archived_jobs.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in archived_jobs.json()] == [job.id]
+    assert archived_jobs.json()[0]["archived_at"]
+    assert archived_responses.status_code == status.HTTP_200_OK
+    assert job_by_id.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.asyncio
 async def test_delete_job_by_company_with_non_exist_key(mock_app_company):
     response = await mock_app_company.delete(url="/jobs?job_id=10")
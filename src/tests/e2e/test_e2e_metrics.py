@@ -0,0 +1,36 @@
+import pytest
+from fastapi import status
+from dependencies import get_db
+from models import User
+from queries import user as user_query
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(sa_session, mock_app_company, mock_own_company: User):
+    await user_query.update_user(sa_session, mock_own_company.id, {"is_admin": True})
+    metrics = await mock_app_company.get(url="/metrics")
+
+    assert metrics.status_code == status.HTTP_200_OK
+    assert "checked_out" in metrics.json()["database_pool"]["primary"]
+    assert "queue_depth" in metrics.json()["password_hashing"]
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_forbidden(mock_app_unauthorized_user, mock_app_company):
+    unauthorized = await mock_app_unauthorized_user.get(url="/metrics")
+    forbidden = await mock_app_company.get(url="/metrics")
+
+    assert unauthorized.status_code == status.HTTP_403_FORBIDDEN
+    assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_get_db_session_per_request():
+    first_request, second_request = get_db(), get_db()
+    first_session = await first_request.__anext__()
+    second_session = await second_request.__anext__()
+
+    assert first_session is not second_session
+
+    await first_request.aclose()
+    await second_request.aclose()
@@ -1,7 +1,10 @@
+import datetime
 import pytest
 from fastapi import status
 from fixtures.responses import ResponseFactory
 from fixtures.jobs import JobFactory
+from fixtures.users import UserFactory
+from core.pagination import encode_keyset_cursor
 from models import User
 from schemas import ResponseInSchema
 
@@ -27,6 +30,25 @@ async def test_get_responses_by_job_id_for_company(
     assert len(responses.json()) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_responses_by_job_id_with_message(
+    sa_session, mock_app_company, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id)
+    sa_session.add(job)
+    job_response = ResponseFactory.build(job_id=job.id, user_id=mock_user.id)
+    sa_session.add(job_response)
+    sa_session.flush()
+
+    default = await mock_app_company.get("/responses", params={"job_id": job.id})
+    with_message = await mock_app_company.get(
+        "/responses", params={"job_id": job.id, "fields": "*"}
+    )
+
+    assert "message" not in default.json()[0]
+    assert with_message.json()[0]["message"] == job_response.message
+
+
 @pytest.mark.asyncio
 async def test_get_responses_by_job_id_for_user(
     sa_session, mock_app_user, mock_own_company: User
@@ -41,6 +63,179 @@ async def test_get_responses_by_job_id_for_user(
     assert responses.status_code == status.HTTP_403_FORBIDDEN
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_responses_by_job_id_for_company(
+    sa_session, mock_app_company, mock_own_company: User, export_format: str
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    sa_session.add(job)
+
+    applicants = UserFactory.build_batch(3, is_company=False)
+    sa_session.add_all(applicants)
+    for applicant in applicants:
+        job_response = ResponseFactory.build()
+        job_response.job_id = job.id
+        job_response.user_id = applicant.id
+        sa_session.add(job_response)
+
+    sa_session.flush()
+
+    responses = await mock_app_company.get(
+        url="/responses/export", params={"job_id": job.id, "format": export_format}
+    )
+
+    assert responses.status_code == status.HTTP_200_OK
+    lines = responses.text.splitlines()
+    if export_format == "csv":
+        assert lines[0] == "id,user_id,job_id,message,created_at"
+        lines = lines[1:]
+    assert len(lines) == 3
+
+
+@pytest.mark.asyncio
+async def test_export_responses_to_csv_escapes_formulas(
+    sa_session, mock_app_company, mock_own_company: User, mock_user: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id)
+    sa_session.add(job)
+    sa_session.add(
+        ResponseFactory.build(
+            job_id=job.id, user_id=mock_user.id, message='=HYPERLINK("http://x")'
+        )
+    )
+    await sa_session.flush()
+
+    responses = await mock_app_company.get(
+        url="/responses/export", params={"job_id": job.id, "format": "csv"}
+    )
+
+    assert ',"\'=HYPERLINK(""http://x"")",' in responses.text.splitlines()[1]
+
+
+@pytest.mark.asyncio
+async def test_export_responses_by_another_company_job(
+    sa_session, mock_app_company, mock_another_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_another_company.id
+    sa_session.add(job)
+    sa_session.flush()
+
+    responses = await mock_app_company.get(
+        url="/responses/export", params={"job_id": job.id}
+    )
+
+    assert responses.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_get_company_responses_since(
+    sa_session,
+    mock_app_company,
+    mock_user: User,
+    mock_own_company: User,
+    mock_another_company: User,
+):
+    own_jobs = JobFactory.build_batch(2, user_id=mock_own_company.id)
+    another_job = JobFactory.build(user_id=mock_another_company.id)
+    sa_session.add_all(own_jobs + [another_job])
+    sa_session.add_all(
+        [
+            ResponseFactory.build(user_id=mock_user.id, job_id=job.id)
+            for job in own_jobs + [another_job]
+        ]
+    )
+    sa_session.flush()
+
+    first_poll = await mock_app_company.get(url="/responses/company")
+    since = first_poll.headers["X-Since-Cursor"]
+
+    applicant = UserFactory.build(is_company=False)
+    sa_session.add(applicant)
+    new_response = ResponseFactory.build(user_id=applicant.id, job_id=own_jobs[0].id)
+    sa_session.add(new_response)
+    sa_session.flush()
+
+    second_poll = await mock_app_company.get(
+        url="/responses/company", params={"since": since}
+    )
+
+    assert first_poll.status_code == status.HTTP_200_OK
+    assert {item["job_id"] for item in first_poll.json()} == {
+        job.id for job in own_jobs
+    }
+    # отклики последней минуты приходят повторно, новый - последним
+    assert second_poll.json()[-1]["id"] == new_response.id
+    assert {item["id"] for item in second_poll.json()} == {
+        item["id"] for item in first_poll.json()
+    } | {new_response.id}
+
+
+@pytest.mark.asyncio
+async def test_get_company_responses_since_late_commit(
+    sa_session, mock_app_company, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id)
+    sa_session.add(job)
+    applicants = UserFactory.build_batch(2, is_company=False)
+    sa_session.add_all(applicants)
+    sa_session.add(ResponseFactory.build(user_id=applicants[0].id, job_id=job.id))
+    sa_session.flush()
+
+    first_poll = await mock_app_company.get(url="/responses/company")
+    since = first_poll.headers["X-Since-Cursor"]
+
+    # отклик вставлен раньше уже прочитанного, а зафиксирован позже
+    late_response = ResponseFactory.build(
+        user_id=applicants[1].id,
+        job_id=job.id,
+        created_at=datetime.datetime.utcnow() - datetime.timedelta(seconds=10),
+    )
+    sa_session.add(late_response)
+    sa_session.flush()
+
+    second_poll = await mock_app_company.get(
+        url="/responses/company", params={"since": since}
+    )
+
+    assert second_poll.status_code == status.HTTP_200_OK
+    assert late_response.id in {item["id"] for item in second_poll.json()}
+
+
+@pytest.mark.asyncio
+async def test_get_company_responses_since_with_cursor(mock_app_company):
+    cursor = encode_keyset_cursor(datetime.datetime.utcnow(), 1)
+
+    responses = await mock_app_company.get(
+        url="/responses/company", params={"since": cursor, "cursor": cursor}
+    )
+
+    assert responses.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_get_my_responses_by_user(
+    sa_session, mock_app_user, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    sa_session.add(job)
+
+    job_response = ResponseFactory.build()
+    job_response.job_id = job.id
+    job_response.user_id = mock_user.id
+    sa_session.add(job_response)
+
+    sa_session.flush()
+
+    responses = await mock_app_user.get(url="/responses/mine")
+
+    assert responses.status_code == status.HTTP_200_OK
+    assert [item["job"]["title"] for item in responses.json()] == [job.title]
+
+
 @pytest.mark.asyncio
 async def test_post_response_by_user(sa_session, mock_app_user, mock_own_company: User):
     job = JobFactory.build()
@@ -57,6 +252,59 @@ async def test_post_response_by_user(sa_session, mock_app_user, mock_own_company
     assert response.json()["job_id"] == job.id
 
 
+@pytest.mark.asyncio
+async def test_post_response_twice_by_user(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.is_active = True
+    sa_session.add(job)
+    sa_session.flush()
+
+    job_response = ResponseInSchema(job_id=job.id, message="Тестовое сообщение")
+
+    await mock_app_user.post(url="/responses", json=job_response.dict())
+    response = await mock_app_user.post(url="/responses", json=job_response.dict())
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_post_responses_batch_by_user(
+    sa_session, mock_app_user, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.is_active = True
+    sa_session.add(job)
+    sa_session.flush()
+
+    batch = [
+        ResponseInSchema(job_id=job.id, message="Тестовое сообщение").dict(),
+        ResponseInSchema(job_id=job.id, message="Еще раз").dict(),
+        ResponseInSchema(job_id=job.id + 1000, message="Нет такой").dict(),
+    ]
+
+    response = await mock_app_user.post(url="/responses/batch", json=batch)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["status"] for item in response.json()] == [
+        "created",
+        "duplicate",
+        "not_found",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_post_too_large_responses_batch(mock_app_user):
+    batch = [ResponseInSchema(job_id=1, message="").dict()] * 1000
+
+    response = await mock_app_user.post(url="/responses/batch", json=batch)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_post_response_by_company(
     sa_session, mock_app_company, mock_own_company: User
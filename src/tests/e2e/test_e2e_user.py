@@ -78,6 +78,53 @@ async def test_get_users(mock_app_user):
     assert users.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_get_users_with_fields(mock_app_user, mock_user: User):
+    users = await mock_app_user.get("/users", params={"fields": "id,name"})
+
+    assert users.status_code == status.HTTP_200_OK
+    assert {"id": mock_user.id, "name": mock_user.name} in users.json()
+    assert all(user.keys() == {"id", "name"} for user in users.json())
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_not_modified(mock_app_user, mock_user: User):
+    user = await mock_app_user.get("/users/by_id", params={"user_id": mock_user.id})
+    etag = user.headers["ETag"]
+
+    by_etag = await mock_app_user.get(
+        "/users/by_id",
+        params={"user_id": mock_user.id},
+        headers={"If-None-Match": etag},
+    )
+    by_date = await mock_app_user.get(
+        "/users/by_id",
+        params={"user_id": mock_user.id},
+        headers={"If-Modified-Since": user.headers["Last-Modified"]},
+    )
+
+    assert user.status_code == status.HTTP_200_OK
+    assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+    assert by_etag.headers["ETag"] == etag
+    assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_get_users_modified_after_update(mock_app_user, mock_user: User):
+    users = await mock_app_user.get("/users")
+    await mock_app_user.put(
+        url=f"/users?user_id={mock_user.id}",
+        json=UserUpdateSchema(name="user2").dict(),
+    )
+
+    updated_users = await mock_app_user.get(
+        "/users", headers={"If-None-Match": users.headers["ETag"]}
+    )
+
+    assert updated_users.status_code == status.HTTP_200_OK
+    assert updated_users.headers["ETag"] != users.headers["ETag"]
+
+
 @pytest.mark.asyncio
 async def test_update_user(mock_app_user, mock_user: User):
     updated_test_user = UserUpdateSchema(
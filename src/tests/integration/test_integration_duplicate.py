@@ -0,0 +1,93 @@
+import pytest
+from core.minhash import MinHashIndex
+from models import User
+from queries import job as job_query
+from queries import duplicate as duplicate_query
+from fixtures.jobs import JobFactory
+
+DESCRIPTION = (
+    "Ищем бэкенд разработчика в команду платежей. Вы будете проектировать "
+    "и писать сервисы на FastAPI и Postgres, разбирать очереди задач, "
+    "проводить ревью кода коллег, участвовать в дежурствах и разборе "
+    "инцидентов, улучшать мониторинг и помогать аналитикам с выгрузками. "
+    "Мы предлагаем удаленную работу, гибкий график, ДМС со стоматологией, "
+    "компенсацию обучения и конференций, современное железо и спокойные "
+    "релизы без авралов по выходным"
+)
+
+
+def test_minhash_index_updates_match_rebuild():
+    index = MinHashIndex(
+        num_perm=32, bands=8, threshold=0.8, shingle_size=3, compact_after=100
+    )
+    index.build(
+        [
+            index.signatures(
+                [
+                    (1, 10, DESCRIPTION),
+                    (2, 10, "Повар в ресторан, горячий цех"),
+                    (3, 20, DESCRIPTION),
+                    (4, 10, ""),
+                ]
+            )
+        ]
+    )
+    index.add(index.signatures([(5, 10, DESCRIPTION + " и бонусы")]))
+
+    assert len(index) == 4
+    assert [id for id, _ in index.find_text(10, DESCRIPTION)] == [1, 5]
+    assert [id for id, _ in index.find_text(20, DESCRIPTION)] == [3]
+
+    index.remove([1])
+    index.compact()
+
+    assert index.stats()["pending"] == 0
+    assert [id for id, _ in index.find_text(10, DESCRIPTION)] == [5]
+    assert index.clusters() == []
+
+    index.add(index.signatures([(6, 10, DESCRIPTION)]))
+    index.compact()
+
+    assert index.clusters() == [(10, [5, 6])]
+    assert index.clusters(owner=20) == []
+
+
+@pytest.mark.asyncio
+async def test_find_duplicate_job_ids(
+    sa_session, mock_own_company: User, mock_another_company: User
+):
+    jobs = [
+        JobFactory.build(
+            user_id=user_id,
+            is_active=True,
+            title="Python разработчик",
+            description=text,
+        )
+        for user_id, text in [
+            (mock_own_company.id, DESCRIPTION),
+            (mock_own_company.id, "Повар в ресторан, горячий цех"),
+            (mock_another_company.id, DESCRIPTION),
+        ]
+    ]
+    sa_session.add_all(jobs)
+    await sa_session.flush()
+
+    job_ids = await duplicate_query.find_duplicate_job_ids(
+        sa_session, mock_own_company.id, "Python разработчик", DESCRIPTION
+    )
+    assert job_ids is None
+
+    await duplicate_query.refresh_duplicate_index(sa_session)
+    job_ids = await duplicate_query.find_duplicate_job_ids(
+        sa_session, mock_own_company.id, "Python разработчик", DESCRIPTION
+    )
+    assert job_ids == [jobs[0].id]
+
+    await job_query.deactivate_jobs(
+        sa_session, job_ids=[jobs[0].id], user_id=mock_own_company.id
+    )
+    job_ids = await duplicate_query.find_duplicate_job_ids(
+        sa_session, mock_own_company.id, "Python разработчик", DESCRIPTION
+    )
+    assert job_ids == []
+    assert duplicate_query.duplicate_index.stats()["documents"] == 2
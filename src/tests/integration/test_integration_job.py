@@ -1,8 +1,15 @@
+import asyncio
+import datetime
 import pytest
+from sqlalchemy import text
+from core.notifications import NotificationHub
+from db_connection import ASYNCPG_DSN
 from models import User
 from queries import job as job_query
+from queries import response as response_query
 from fixtures.jobs import JobFactory
-from schemas import JobInSchema
+from fixtures.responses import ResponseFactory
+from schemas import JobInSchema, JobFilterSchema, JobBatchUpdateSchema
 
 
 @pytest.mark.asyncio
@@ -62,6 +69,103 @@ async def test_get_null_list_jobs_for_user(sa_session):
     assert null_list_jobs == []
 
 
+@pytest.mark.asyncio
+async def test_get_all_available_jobs_for_user_by_salary(
+    sa_session, mock_own_company: User
+):
+    cheap_job = JobFactory.build(
+        user_id=mock_own_company.id, salary_from=10, salary_to=20, is_active=True
+    )
+    overlapping_job = JobFactory.build(
+        user_id=mock_own_company.id, salary_from=40, salary_to=60, is_active=True
+    )
+    open_ended_job = JobFactory.build(
+        user_id=mock_own_company.id, salary_from=70, salary_to=None, is_active=True
+    )
+    sa_session.add_all([cheap_job, overlapping_job, open_ended_job])
+    sa_session.flush()
+
+    found = await job_query.get_all_available_jobs_for_user(
+        db=sa_session, filters=JobFilterSchema(salary_min=50, salary_max=80)
+    )
+
+    assert set(found) == {overlapping_job, open_ended_job}
+
+
+@pytest.mark.asyncio
+async def test_get_all_available_jobs_for_user_by_company_and_date(
+    sa_session, mock_own_company: User, mock_another_company: User
+):
+    old_job = JobFactory.build(
+        user_id=mock_own_company.id,
+        created_at=datetime.datetime(2020, 1, 1),
+        is_active=True,
+    )
+    new_job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    another_company_job = JobFactory.build(
+        user_id=mock_another_company.id, is_active=True
+    )
+    sa_session.add_all([old_job, new_job, another_company_job])
+    sa_session.flush()
+
+    found = await job_query.get_all_available_jobs_for_user(
+        db=sa_session,
+        filters=JobFilterSchema(
+            posted_since=datetime.datetime(2021, 1, 1),
+            company_id=mock_own_company.id,
+        ),
+    )
+
+    assert found == [new_job]
+
+
+@pytest.mark.asyncio
+async def test_search_available_jobs(
+    sa_session, mock_own_company: User, mock_another_company: User
+):
+    title_match = JobFactory.build(
+        user_id=mock_own_company.id, title="Python разработчик", is_active=True
+    )
+    description_match = JobFactory.build(
+        user_id=mock_own_company.id,
+        title="Инженер",
+        description="Пишем сервисы на Python",
+        is_active=True,
+    )
+    hidden_match = JobFactory.build(
+        user_id=mock_another_company.id, title="Python", is_active=False
+    )
+    sa_session.add_all([title_match, description_match, hidden_match])
+    sa_session.flush()
+
+    found = await job_query.search_available_jobs(db=sa_session, search_query="python")
+
+    assert [job for job, _ in found] == [title_match, description_match]
+
+
+@pytest.mark.asyncio
+async def test_search_available_jobs_by_cursor(sa_session, mock_own_company: User):
+    jobs = JobFactory.build_batch(
+        3, user_id=mock_own_company.id, title="Go разработчик", is_active=True
+    )
+    sa_session.add_all(jobs)
+    sa_session.flush()
+
+    first_page = await job_query.search_available_jobs(
+        db=sa_session, search_query="разработчики", limit=2
+    )
+    last_job, last_rank = first_page[-1]
+    second_page = await job_query.search_available_jobs(
+        db=sa_session,
+        search_query="разработчики",
+        limit=2,
+        cursor=(last_rank, last_job.id),
+    )
+
+    found_ids = [job.id for job, _ in first_page + second_page]
+    assert sorted(found_ids) == sorted(job.id for job in jobs)
+
+
 @pytest.mark.asyncio
 async def test_get_available_job_by_id_for_user(sa_session, mock_own_company: User):
     available_job = JobFactory.build()
@@ -210,6 +314,89 @@ async def test_create_job(sa_session, mock_own_company: User):
     assert new_job.user_id == mock_own_company.id
 
 
+@pytest.mark.asyncio
+async def test_get_jobs_reads_only_requested_columns(
+    sa_session, sql_statements, mock_own_company: User
+):
+    sa_session.add(JobFactory.build(user_id=mock_own_company.id, is_active=True))
+    await sa_session.flush()
+    sql_statements.clear()
+
+    jobs = await job_query.get_all_available_jobs_for_user(sa_session, fields={"title"})
+
+    assert len(jobs) == 1
+    assert "jobs.title" in sql_statements[0]
+    assert "jobs.created_at" in sql_statements[0]
+    assert "jobs.description" not in sql_statements[0]
+
+
+@pytest.mark.asyncio
+async def test_create_job_in_one_statement(
+    sa_session, sql_statements, mock_own_company: User
+):
+    job = JobInSchema(title="Galera tech", description="точно не галера")
+    await sa_session.flush()
+    sql_statements.clear()
+
+    new_job = await job_query.create_job(
+        sa_session, job_schema=job, user_id=mock_own_company.id
+    )
+    assert len(sql_statements) == 1
+    assert new_job.is_active is True
+
+
+@pytest.mark.asyncio
+async def test_create_jobs_in_one_statement(
+    sa_session, sql_statements, mock_own_company: User
+):
+    jobs = [
+        JobInSchema(title=f"Galera tech {i}", description="точно не галера")
+        for i in range(3)
+    ]
+    await sa_session.flush()
+    sql_statements.clear()
+
+    new_jobs = await job_query.create_jobs(
+        sa_session, job_schemas=jobs, user_id=mock_own_company.id
+    )
+    assert len(sql_statements) == 1
+    assert [job.title for job in new_jobs] == [job.title for job in jobs]
+    assert all(job.is_active for job in new_jobs)
+
+
+@pytest.mark.asyncio
+async def test_copy_jobs(sa_session, mock_own_company: User):
+    jobs = [
+        JobInSchema(title="Galera tech", description="точно не галера"),
+        JobInSchema(
+            title="Ne galera tech",
+            description="точно не галера",
+            salary_from=10000,
+            salary_to=35000,
+            is_active=False,
+        ),
+    ]
+
+    # время создания пишется в UTC при любом часовом поясе сессии
+    await sa_session.execute(text("SET LOCAL TIME ZONE 'Asia/Vladivostok'"))
+
+    imported = await job_query.copy_jobs(
+        sa_session, job_schemas=jobs, user_id=mock_own_company.id
+    )
+    company_jobs = await job_query.get_all_available_jobs_for_company(
+        db=sa_session, user_id=mock_own_company.id
+    )
+    assert imported == 2
+    assert all(
+        abs(job.created_at - datetime.datetime.utcnow()) < datetime.timedelta(minutes=1)
+        for job in company_jobs
+    )
+    assert sorted((job.title, job.is_active) for job in company_jobs) == [
+        ("Galera tech", True),
+        ("Ne galera tech", False),
+    ]
+
+
 @pytest.mark.asyncio
 async def test_update_job(sa_session, mock_own_company: User):
     job = JobFactory.build()
@@ -217,10 +404,79 @@ async def test_update_job(sa_session, mock_own_company: User):
     sa_session.add(job)
     sa_session.flush()
 
-    job.name = "Ne galera tech"
-    updated_job = await job_query.update_job(sa_session, job=job)
+    updated_job = await job_query.update_job(
+        sa_session,
+        job_id=job.id,
+        user_id=mock_own_company.id,
+        values={"title": "Ne galera tech"},
+    )
     assert job.id == updated_job.id
-    assert updated_job.name == job.name
+    assert updated_job.title == "Ne galera tech"
+
+
+@pytest.mark.asyncio
+async def test_update_job_in_one_statement(
+    sa_session, sql_statements, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    sa_session.add(job)
+    await sa_session.flush()
+    sql_statements.clear()
+
+    await job_query.update_job(
+        sa_session,
+        job_id=job.id,
+        user_id=mock_own_company.id,
+        values={"title": "Ne galera tech"},
+    )
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_another_company_job(
+    sa_session, mock_own_company: User, mock_another_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_another_company.id
+    sa_session.add(job)
+    sa_session.flush()
+
+    updated_job = await job_query.update_job(
+        sa_session,
+        job_id=job.id,
+        user_id=mock_own_company.id,
+        values={"title": "Ne galera tech"},
+    )
+    assert updated_job is None
+
+
+@pytest.mark.asyncio
+async def test_expire_jobs(sa_session, mock_own_company: User):
+    now = datetime.datetime.utcnow()
+    expired_jobs = JobFactory.build_batch(
+        3,
+        user_id=mock_own_company.id,
+        is_active=True,
+        expires_at=now - datetime.timedelta(days=1),
+    )
+    future_job = JobFactory.build(
+        user_id=mock_own_company.id,
+        is_active=True,
+        expires_at=now + datetime.timedelta(days=1),
+    )
+    endless_job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add_all(expired_jobs + [future_job, endless_job])
+    sa_session.flush()
+    version = job_query.job_list_cache.version
+
+    assert await job_query.expire_jobs(sa_session, batch_size=2) == 2
+    assert await job_query.expire_jobs(sa_session, batch_size=2) == 1
+    assert await job_query.expire_jobs(sa_session, batch_size=2) == 0
+    assert job_query.job_list_cache.version > version
+
+    active_jobs = await job_query.get_all_available_jobs_for_user(db=sa_session)
+    assert {job.id for job in active_jobs} == {future_job.id, endless_job.id}
 
 
 @pytest.mark.asyncio
@@ -230,5 +486,137 @@ async def test_delete_job(sa_session, mock_own_company: User):
     sa_session.add(job)
     sa_session.flush()
 
-    deleted_job = await job_query.delete_job(sa_session, job=job)
+    deleted_job = await job_query.delete_job(
+        sa_session, job_id=job.id, user_id=mock_own_company.id
+    )
     assert job.id == deleted_job.id
+
+
+@pytest.mark.asyncio
+async def test_update_jobs_in_one_statement(
+    sa_session, sql_statements, mock_own_company: User, mock_another_company: User
+):
+    own_job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    another_job = JobFactory.build(user_id=mock_another_company.id)
+    sa_session.add_all([own_job, another_job])
+    await sa_session.flush()
+    sql_statements.clear()
+
+    updated_jobs = await job_query.update_jobs(
+        sa_session,
+        job_schemas=[
+            JobBatchUpdateSchema(
+                id=own_job.id, title="Ne galera tech", salary_from=1e4, salary_to=5e4
+            ),
+            JobBatchUpdateSchema(id=another_job.id, title="Ne galera tech"),
+        ],
+        user_id=mock_own_company.id,
+    )
+    assert len(sql_statements) == 1
+    assert [job.id for job in updated_jobs] == [own_job.id]
+    assert updated_jobs[0].title == "Ne galera tech"
+    assert updated_jobs[0].salary_to == 50000
+    assert updated_jobs[0].description == own_job.description
+    assert updated_jobs[0].is_active is True
+
+
+@pytest.mark.asyncio
+async def test_deactivate_jobs(
+    sa_session, mock_own_company: User, mock_another_company: User
+):
+    own_job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    another_job = JobFactory.build(user_id=mock_another_company.id, is_active=True)
+    sa_session.add_all([own_job, another_job])
+    sa_session.flush()
+
+    deactivated_jobs = await job_query.deactivate_jobs(
+        sa_session, job_ids=[own_job.id, another_job.id], user_id=mock_own_company.id
+    )
+    assert [job.id for job in deactivated_jobs] == [own_job.id]
+    assert deactivated_jobs[0].is_active is False
+
+
+@pytest.mark.asyncio
+async def test_job_list_cache_invalidated_by_notification():
+    job_query.job_list_cache.set(
+        job_query.job_list_cache.version, "page", (b"[]", None)
+    )
+
+    listener = NotificationHub()
+    listener.subscribe(
+        job_query.JOB_LIST_CACHE_CHANNEL, job_query.invalidate_job_list_cache
+    )
+    publisher = NotificationHub()
+    await listener.start(ASYNCPG_DSN)
+    await publisher.start(ASYNCPG_DSN)
+    try:
+        publisher.publish(job_query.JOB_LIST_CACHE_CHANNEL, "")
+        for _ in range(50):
+            if job_query.job_list_cache.get("page") is None:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await publisher.stop()
+        await listener.stop()
+
+    assert listener.received == 1
+    assert job_query.job_list_cache.get("page") is None
+
+
+@pytest.mark.asyncio
+async def test_deleted_job_is_hidden_from_company(
+    sa_session, mock_own_company: User, mock_user: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.add(ResponseFactory.build(user_id=mock_user.id, job_id=job.id))
+    sa_session.flush()
+
+    deleted_job = await job_query.delete_job(
+        sa_session, job_id=job.id, user_id=mock_own_company.id
+    )
+
+    assert deleted_job.deleted_at is not None
+    assert deleted_job.is_active is False
+    assert not await job_query.get_all_available_jobs_for_company(
+        db=sa_session, user_id=mock_own_company.id
+    )
+    assert (
+        await job_query.delete_job(
+            sa_session, job_id=job.id, user_id=mock_own_company.id
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_archive_jobs(sa_session, mock_own_company: User, mock_user: User):
+    long_ago = datetime.datetime.utcnow() - datetime.timedelta(days=30)
+    old_job = JobFactory.build(
+        user_id=mock_own_company.id, is_active=False, updated_at=long_ago
+    )
+    recent_job = JobFactory.build(user_id=mock_own_company.id, is_active=False)
+    active_job = JobFactory.build(
+        user_id=mock_own_company.id, is_active=True, updated_at=long_ago
+    )
+    sa_session.add_all([old_job, recent_job, active_job])
+    sa_session.add(ResponseFactory.build(user_id=mock_user.id, job_id=old_job.id))
+    await sa_session.flush()
+
+    archived = await job_query.archive_jobs(
+        sa_session, inactive_for=datetime.timedelta(days=7), batch_size=10
+    )
+    archived_jobs = await job_query.get_archived_jobs_for_company(
+        db=sa_session, user_id=mock_own_company.id
+    )
+    archived_responses = await response_query.get_archived_responses_by_job_id(
+        db=sa_session, job_id=old_job.id, user_id=mock_own_company.id
+    )
+    company_jobs = await job_query.get_all_available_jobs_for_company(
+        db=sa_session, user_id=mock_own_company.id
+    )
+
+    assert archived == 1
+    assert [job.id for job in archived_jobs] == [old_job.id]
+    assert [response.user_id for response in archived_responses] == [mock_user.id]
+    assert {job.id for job in company_jobs} == {recent_job.id, active_job.id}
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from core.tfidf import TfidfIndex
+from models import User
+from queries import job as job_query
+from queries import recommendation as recommendation_query
+from fixtures.jobs import JobFactory
+from fixtures.responses import ResponseFactory
+
+DOCUMENTS = [
+    (1, "Python разработчик backend"),
+    (2, "Повар в ресторан"),
+    (3, "Java разработчик"),
+    (4, "Бармен в ночной ресторан"),
+]
+
+
+def test_tfidf_index_updates_match_rebuild():
+    index = TfidfIndex(compact_after=100)
+    index.build([index.count_terms(DOCUMENTS)])
+    index.upsert(*index.count_terms([(5, "Go разработчик"), (2, "Официант кафе")]))
+    index.remove([1])
+
+    assert index.stats()["pending"] == 2
+    assert [id for id, _ in index.similar(["разработчик"], 10)] == [3, 5]
+    assert [id for id, _ in index.similar(["ресторан"], 10)] == [4]
+
+    index.compact_after = 0
+    index.remove([4])
+
+    assert index.stats()["pending"] == 0
+    assert index.stats()["documents"] == 3
+    assert [id for id, _ in index.similar(["разработчик"], 10)] == [3, 5]
+    assert index.similar(["ресторан"], 10) == []
+
+
+@pytest.mark.asyncio
+async def test_get_recommended_job_ids(
+    sa_session, mock_user: User, mock_own_company: User
+):
+    jobs = [
+        JobFactory.build(
+            user_id=mock_own_company.id, is_active=True, title=title, description=text
+        )
+        for title, text in [
+            ("Python разработчик", "Бэкенд на FastAPI"),
+            ("Python разработчик", "Сервисы на FastAPI и Postgres"),
+            ("Senior Python разработчик", "Postgres"),
+            ("Повар", "Горячий цех"),
+        ]
+    ]
+    sa_session.add_all(jobs)
+    sa_session.add(ResponseFactory.build(user_id=mock_user.id, job_id=jobs[0].id))
+    await sa_session.flush()
+    await recommendation_query.refresh_job_index(sa_session)
+
+    job_ids = await recommendation_query.get_recommended_job_ids(
+        sa_session, user_id=mock_user.id, limit=10
+    )
+    assert job_ids == [jobs[1].id, jobs[2].id]
+
+    await job_query.deactivate_jobs(
+        sa_session, job_ids=[jobs[1].id], user_id=mock_own_company.id
+    )
+    job_ids = await recommendation_query.get_recommended_job_ids(
+        sa_session, user_id=mock_user.id, limit=10
+    )
+    assert job_ids == [jobs[2].id]
+    assert recommendation_query.job_index.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_recommended_job_ids_without_responses(sa_session, mock_user: User):
+    await recommendation_query.refresh_job_index(sa_session)
+    job_ids = await recommendation_query.get_recommended_job_ids(
+        sa_session, user_id=mock_user.id, limit=10
+    )
+    assert job_ids is None
+
+
+@pytest.mark.asyncio
+async def test_get_recommended_job_ids_before_build(
+    sa_session, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build(user_id=mock_own_company.id, is_active=True)
+    sa_session.add(job)
+    sa_session.add(ResponseFactory.build(user_id=mock_user.id, job_id=job.id))
+    await sa_session.flush()
+
+    job_ids = await recommendation_query.get_recommended_job_ids(
+        sa_session, user_id=mock_user.id, limit=10
+    )
+    # индекс строится в фоне, запрос его не ждет
+    assert job_ids is None
+    assert not recommendation_query.job_index_state.built
+    assert recommendation_query.build_tasks
+
+    await asyncio.gather(*recommendation_query.build_tasks)
+    assert recommendation_query.job_index_state.built
@@ -0,0 +1,66 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+import db_connection
+from core.replica import ReplicaRouter
+from models import Job
+
+
+@pytest_asyncio.fixture()
+async def replica_engine(monkeypatch):
+    replica = create_async_engine(db_connection.SQLALCHEMY_DATABASE_URL)
+    router = ReplicaRouter(max_lag=5, sticky_window=5, check_interval=1)
+    router.healthy = True
+    monkeypatch.setattr(db_connection, "replica_engine", replica)
+    monkeypatch.setattr(db_connection, "replica_router", router)
+    try:
+        yield replica
+    finally:
+        await replica.dispose()
+
+
+@pytest_asyncio.fixture()
+async def routing_session(replica_engine):
+    session = db_connection.SessionLocal()
+    try:
+        yield session.sync_session
+    finally:
+        await session.close()
+
+
+def test_listing_query_routed_to_replica(routing_session, replica_engine):
+    query = select(Job).execution_options(read_replica=True)
+
+    assert routing_session.get_bind(clause=query) is replica_engine.sync_engine
+
+
+def test_query_without_option_routed_to_primary(routing_session):
+    query = select(Job)
+
+    assert routing_session.get_bind(clause=query) is db_connection.engine.sync_engine
+
+
+def test_read_your_writes(routing_session):
+    routing_session.info["user_id"] = 7
+    db_connection.replica_router.record_write(7)
+    query = select(Job).execution_options(read_replica=True)
+
+    assert routing_session.get_bind(clause=query) is db_connection.engine.sync_engine
+
+
+def test_lagging_replica_routed_to_primary(routing_session):
+    db_connection.replica_router.healthy = False
+    query = select(Job).execution_options(read_replica=True)
+
+    assert routing_session.get_bind(clause=query) is db_connection.engine.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_check_replica_lag(replica_engine):
+    router = ReplicaRouter(max_lag=5, sticky_window=5, check_interval=1)
+
+    await router.check_lag(replica_engine)
+
+    assert router.lag == 0
+    assert router.healthy
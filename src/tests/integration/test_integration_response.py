@@ -12,6 +12,7 @@ async def test_create_response_by_user(
 ):
     job = JobFactory.build()
     job.user_id = mock_own_company.id
+    job.is_active = True
     sa_session.add(job)
     sa_session.flush()
 
@@ -28,6 +29,127 @@ async def test_create_response_by_user(
     assert new_response.user_id == mock_user.id
 
 
+@pytest.mark.asyncio
+async def test_create_response_in_one_statement(
+    sa_session, sql_statements, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.is_active = True
+    sa_session.add(job)
+    await sa_session.flush()
+    sql_statements.clear()
+
+    response = ResponseInSchema(job_id=job.id, message="Пожожда, возьмите")
+    await response_query.create_response(
+        sa_session, response_schema=response, user_id=mock_user.id
+    )
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_response_twice(
+    sa_session, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.is_active = True
+    sa_session.add(job)
+    sa_session.flush()
+
+    response = ResponseInSchema(job_id=job.id, message="Пожожда, возьмите")
+    first = await response_query.create_response(
+        sa_session, response_schema=response, user_id=mock_user.id
+    )
+    second = await response_query.create_response(
+        sa_session, response_schema=response, user_id=mock_user.id
+    )
+    assert first is not None
+    assert second is None
+
+
+@pytest.mark.asyncio
+async def test_create_response_to_inactive_job(
+    sa_session, mock_user: User, mock_own_company: User
+):
+    job = JobFactory.build()
+    job.user_id = mock_own_company.id
+    job.is_active = False
+    sa_session.add(job)
+    sa_session.flush()
+
+    response = ResponseInSchema(job_id=job.id, message="Пожожда, возьмите")
+    new_response = await response_query.create_response(
+        sa_session, response_schema=response, user_id=mock_user.id
+    )
+    assert new_response is None
+
+
+@pytest.mark.asyncio
+async def test_create_responses_in_two_statements(
+    sa_session, sql_statements, mock_user: User, mock_own_company: User
+):
+    jobs = JobFactory.build_batch(3, user_id=mock_own_company.id, is_active=True)
+    inactive_job = JobFactory.build(user_id=mock_own_company.id, is_active=False)
+    sa_session.add_all(jobs + [inactive_job])
+    await sa_session.flush()
+    sql_statements.clear()
+
+    available_job_ids, responses = await response_query.create_responses(
+        sa_session,
+        response_schemas=[
+            ResponseInSchema(job_id=job.id, message="Пожожда, возьмите")
+            for job in jobs + [inactive_job]
+        ],
+        user_id=mock_user.id,
+    )
+    assert available_job_ids == {job.id for job in jobs}
+    assert {response.job_id for response in responses} == available_job_ids
+    assert len(sql_statements) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 5])
+async def test_get_responses_by_user_id_in_one_statement(
+    sa_session, sql_statements, mock_user: User, mock_own_company: User, limit: int
+):
+    jobs = JobFactory.build_batch(5, user_id=mock_own_company.id)
+    sa_session.add_all(jobs)
+    sa_session.add_all(
+        [ResponseFactory.build(user_id=mock_user.id, job_id=job.id) for job in jobs]
+    )
+    await sa_session.flush()
+    sa_session.expunge_all()
+    sql_statements.clear()
+
+    responses = await response_query.get_responses_by_user_id(
+        sa_session, user_id=mock_user.id, limit=limit
+    )
+    titles = [response.job.title for response in responses]
+
+    assert len(titles) == limit
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_responses_for_company_by_job_id(
+    sa_session, mock_user: User, mock_own_company: User
+):
+    jobs = JobFactory.build_batch(2, user_id=mock_own_company.id)
+    sa_session.add_all(jobs)
+    sa_session.add_all(
+        [ResponseFactory.build(user_id=mock_user.id, job_id=job.id) for job in jobs]
+    )
+    sa_session.flush()
+
+    responses = await response_query.get_responses_for_company(
+        sa_session, user_id=mock_own_company.id, job_id=jobs[1].id
+    )
+
+    assert [response.job_id for response in responses] == [jobs[1].id]
+    assert responses[0].job is jobs[1]
+
+
 @pytest.mark.asyncio
 async def test_get_all_available_responses_by_job_id_for_company(
     sa_session, mock_user: User, mock_own_company: User
@@ -0,0 +1,39 @@
+import pytest
+from core.scheduler import Scheduler
+from db_connection import ASYNCPG_DSN
+
+LOCK_KEY = 424242
+
+
+@pytest.mark.asyncio
+async def test_only_one_scheduler_is_leader():
+    first = Scheduler(lock_key=LOCK_KEY, interval=60, max_batches=10)
+    second = Scheduler(lock_key=LOCK_KEY, interval=60, max_batches=10)
+    try:
+        first.start(ASYNCPG_DSN)
+        assert await first.ensure_leadership() is True
+        second.start(ASYNCPG_DSN)
+        assert await second.ensure_leadership() is False
+
+        await first.stop()
+        assert await second.ensure_leadership() is True
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_task_in_batches():
+    batches = [3, 3, 1, 0]
+
+    async def step() -> int:
+        return batches.pop(0)
+
+    scheduler = Scheduler(lock_key=LOCK_KEY, interval=60, max_batches=10)
+    scheduler.add("step", step)
+
+    assert await scheduler.run_task("step") == 7
+    stats = scheduler.stats()["tasks"]["step"]
+    assert stats["batches"] == 4
+    assert stats["rows"] == 7
+    assert stats["last_batch_ms"] is not None
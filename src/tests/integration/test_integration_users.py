@@ -1,4 +1,8 @@
+import asyncio
+import json
 import pytest
+from core.notifications import NotificationHub
+from db_connection import ASYNCPG_DSN
 from queries import user as user_query
 from fixtures.users import UserFactory
 from schemas import UserInSchema
@@ -74,7 +78,100 @@ async def test_update(sa_session):
     sa_session.add(user)
     sa_session.flush()
 
-    user.name = "updated_name"
-    updated_user = await user_query.update_user(sa_session, user=user)
+    updated_user = await user_query.update_user(
+        sa_session, user_id=user.id, values={"name": "updated_name"}
+    )
     assert user.id == updated_user.id
     assert updated_user.name == "updated_name"
+
+
+@pytest.mark.asyncio
+async def test_update_with_taken_email(sa_session):
+    user = UserFactory.build()
+    another_user = UserFactory.build()
+    sa_session.add_all([user, another_user])
+    sa_session.flush()
+
+    updated_user = await user_query.update_user(
+        sa_session, user_id=user.id, values={"email": another_user.email}
+    )
+    assert updated_user is None
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_from_cache(sa_session):
+    user = UserFactory.build()
+    sa_session.add(user)
+    sa_session.flush()
+
+    await user_query.get_by_id(sa_session, user.id)
+    hits = user_query.user_cache.hits
+    cached_user = await user_query.get_by_id(sa_session, user.id)
+
+    assert user_query.user_cache.hits == hits + 1
+    assert cached_user.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_skips_cache_after_invalidation(sa_session, monkeypatch):
+    user = UserFactory.build()
+    sa_session.add(user)
+    sa_session.flush()
+
+    execute = sa_session.execute
+
+    async def execute_and_invalidate(*args, **kwargs):
+        # строка прочитана, а уведомление об ее изменении пришло до записи в кеш
+        result = await execute(*args, **kwargs)
+        user_query.invalidate_user_cache(json.dumps({"id": user.id}))
+        return result
+
+    monkeypatch.setattr(sa_session, "execute", execute_and_invalidate)
+    loaded_user = await user_query.get_by_id(sa_session, user.id)
+
+    assert loaded_user.id == user.id
+    assert user_query.user_cache.get(user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_get_by_email_after_update(sa_session):
+    user = UserFactory.build()
+    sa_session.add(user)
+    sa_session.flush()
+
+    old_email = user.email
+    await user_query.get_by_email(sa_session, old_email)
+
+    await user_query.update_user(
+        sa_session, user_id=user.id, values={"email": "changed@example.com"}
+    )
+
+    assert await user_query.get_by_email(sa_session, old_email) is None
+    current_user = await user_query.get_by_email(sa_session, "changed@example.com")
+    assert current_user.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_by_notification(sa_session):
+    user = UserFactory.build()
+    sa_session.add(user)
+    sa_session.flush()
+    await user_query.get_by_id(sa_session, user.id)
+
+    listener = NotificationHub()
+    listener.subscribe(user_query.USER_CACHE_CHANNEL, user_query.invalidate_user_cache)
+    publisher = NotificationHub()
+    await listener.start(ASYNCPG_DSN)
+    await publisher.start(ASYNCPG_DSN)
+    try:
+        publisher.publish(user_query.USER_CACHE_CHANNEL, json.dumps({"id": user.id}))
+        for _ in range(50):
+            if user_query.user_cache.get(user.id) is None:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await publisher.stop()
+        await listener.stop()
+
+    assert listener.received == 1
+    assert user_query.user_cache.get(user.id) is None